@@ -74,6 +74,9 @@ class PlcDataItem(db.Model):
     unit = db.Column('unit', db.String(20), comment='단위 (예: ℃, %, RPM 등)')
     min_value = db.Column('min_value', db.Numeric(10, 2), comment='최소값')
     max_value = db.Column('max_value', db.Numeric(10, 2), comment='최대값')
+    deadband = db.Column('deadband', db.Numeric(15, 4), comment='불감대 (NULL이면 수집기 기본값)')
+    deadband_type = db.Column('deadband_type', db.String(10), nullable=False, default='absolute', comment='absolute(절대값) 또는 percent(min~max 범위의 %)')
+    scan_class_ms = db.Column('scan_class_ms', db.Integer, comment='스캔 등급 (수집 주기 ms, NULL이면 수집기 기본 주기)')
     is_active = db.Column('is_active', db.Boolean, default=True, comment='활성화 상태')
     action_item = db.Column('action_item', db.Boolean, default=False, comment='액션 항목 (Item3 클릭 효과용)')
     line_number = db.Column('line_number', db.Integer, comment='PRG 파일의 라인 번호')
@@ -104,6 +107,9 @@ class PlcDataItem(db.Model):
             "unit": self.unit,
             "min_value": float(self.min_value) if self.min_value else None,
             "max_value": float(self.max_value) if self.max_value else None,
+            "deadband": float(self.deadband) if self.deadband is not None else None,
+            "deadband_type": self.deadband_type,
+            "scan_class_ms": self.scan_class_ms,
             "is_active": self.is_active,
             "action_item": self.action_item,
             "line_number": self.line_number,
@@ -128,7 +134,7 @@ class PlcRealTimeData(db.Model):
     
     # 인덱스 설정
     __table_args__ = (
-        Index('idx_real_time_data_item', 'data_item_id'),
+        Index('uk_real_time_data_item', 'data_item_id', unique=True),
         Index('idx_real_time_data_timestamp', 'timestamp'),
     )
     
@@ -163,6 +169,7 @@ class PlcQueryMemory(db.Model):
     id = db.Column('id', db.Integer, primary_key=True, autoincrement=True)
     item_name = db.Column('item_name', db.String(100), nullable=False, comment='항목이름')
     memory_address = db.Column('memory_address', db.String(50), nullable=False, comment='메모리 주소')
+    scan_class_ms = db.Column('scan_class_ms', db.Integer, comment='스캔 등급 (수집 주기 ms, NULL이면 plc_data_items 설정)')
     description = db.Column('description', db.Text, comment='설명')
     is_active = db.Column('is_active', db.Boolean, default=True, comment='활성화 상태')
     created_at = db.Column('created_at', db.TIMESTAMP, default=datetime.utcnow, nullable=False)
@@ -179,6 +186,7 @@ class PlcQueryMemory(db.Model):
             "id": self.id,
             "item_name": self.item_name,
             "memory_address": self.memory_address,
+            "scan_class_ms": self.scan_class_ms,
             "description": self.description,
             "is_active": self.is_active,
             "created_at": self.created_at.isoformat() if self.created_at else None,
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLC 수집 파이프라인 성능 측정 (읽기 → 계획 → 저장)
+
+로컬 XGT 시뮬레이터를 대상으로 XG5000Client.batch_read_plc_data와
+save_real_time_data를 반복 실행하고, 결과를 JSON으로 출력합니다.
+"""
+
+import json
+import logging
+import os
+import platform
+import random
+import re
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from xg5000_client import XG5000Client
+from xgt_session import close_all_sessions
+from xgt_simulator import XGTSimulator
+from database_config import DatabaseConfig
+
+# MariaDB 측정 시 생성하는 임시 장치/항목 ID (실데이터와 겹치지 않도록 큰 값 사용)
+BENCH_DEVICE_ID = 900000
+BENCH_ITEM_ID_BASE = 900000
+
+DEFAULT_TAG_COUNTS = [10, 100, 1000, 10000]
+DEFAULT_READ_MODES = ["1", "all"]
+DEFAULT_STORAGE_MODES = ["none", "sqlite"]
+
+
+class SQLiteConnection:
+    """pymysql 연결처럼 사용할 수 있는 SQLite 연결 (측정용 대체 저장소)
+
+    XG5000Client가 사용하는 cursor()/commit()/rollback()/close()만 제공하며
+    %s 플레이스홀더를 SQLite의 ?로, ON DUPLICATE KEY UPDATE 업서트를
+    ON CONFLICT(data_item_id) DO UPDATE로 바꿔서 실행합니다.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS plc_real_time_data (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                data_item_id INTEGER,
+                value REAL,
+                quality TEXT DEFAULT 'good',
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS uk_real_time_data_item ON plc_real_time_data(data_item_id)')
+        self.conn.commit()
+
+    @staticmethod
+    def translate(sql: str) -> str:
+        sql = re.sub(r'%s', '?', sql)
+        sql = re.sub(r'ON DUPLICATE KEY UPDATE', 'ON CONFLICT(data_item_id) DO UPDATE SET', sql)
+        return re.sub(r'VALUES\((\w+)\)', r'excluded.\1', sql)
+
+    def cursor(self, *args):
+        return _SQLiteCursor(self)
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.close()
+
+
+class _SQLiteCursor:
+    def __init__(self, owner: SQLiteConnection):
+        self.owner = owner
+        self.cursor = owner.conn.cursor()
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cursor.close()
+
+    def execute(self, sql: str, params=()):
+        self.cursor.execute(self.owner.translate(sql), params)
+        self.rowcount = self.cursor.rowcount
+        return self.rowcount
+
+    def executemany(self, sql: str, seq_params):
+        self.cursor.executemany(self.owner.translate(sql), seq_params)
+        self.rowcount = self.cursor.rowcount
+        return self.rowcount
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """최근접 순위 방식 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def make_items(tag_count: int, density: float = 0.5, seed: int = 1) -> List[Dict]:
+    """측정용 태그 목록 생성 (D영역 90%, M영역 10%, 주소 밀도 density)"""
+    rng = random.Random(seed)
+    d_count = tag_count - tag_count // 10
+    m_count = tag_count // 10
+
+    items = []
+    for item_type, count in (('D', d_count), ('M', m_count)):
+        span = max(count, int(count / max(density, 0.01)))
+        for address in sorted(rng.sample(range(span), count)):
+            items.append({
+                'id': BENCH_ITEM_ID_BASE + len(items),
+                'item_name': f"{item_type}{address}",
+                'item_type': item_type,
+                'modbus_address': address
+            })
+    return items
+
+
+def open_storage(storage: str, workdir: str):
+    """저장 방식별 연결 생성 (none이면 None)"""
+    if storage == "none":
+        return None
+    if storage == "sqlite":
+        return SQLiteConnection(os.path.join(workdir, "benchmark.db"))
+    if storage == "mariadb":
+        connection = DatabaseConfig.create_connection()
+        if connection is None:
+            raise RuntimeError("MariaDB 연결 실패")
+        return connection
+    raise ValueError(f"지원하지 않는 저장 방식: {storage}")
+
+
+def prepare_mariadb(connection, items: List[Dict]):
+    """MariaDB 측정용 임시 장치/항목 생성 (외래키 충족)"""
+    with connection.cursor() as cursor:
+        cursor.execute('''
+            INSERT IGNORE INTO plc_devices (id, name, ip_address, port, protocol, description)
+            VALUES (%s, 'benchmark', '127.0.0.1', 2004, 'XGT', '성능 측정용 임시 장치')
+        ''', (BENCH_DEVICE_ID,))
+        cursor.executemany('''
+            INSERT IGNORE INTO plc_data_items (id, plc_device_id, item_name, item_type, address, modbus_address)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        ''', [(item['id'], BENCH_DEVICE_ID, item['item_name'], item['item_type'],
+               f"%{item['item_type']}W{item['modbus_address']}", item['modbus_address']) for item in items])
+    connection.commit()
+
+
+def cleanup_mariadb(connection):
+    """MariaDB 측정용 임시 데이터 삭제 (CASCADE로 항목/실시간 데이터 함께 삭제)"""
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM plc_devices WHERE id = %s', (BENCH_DEVICE_ID,))
+    connection.commit()
+
+
+def run_scenario(simulator: XGTSimulator, tag_count: int, read_mode: str, storage: str,
+                 scans: int, workdir: str, gap_budget: Optional[int] = None) -> Dict:
+    """시나리오 1개 실행 (첫 스캔은 워밍업으로 제외)"""
+    client = XG5000Client(read_count_mode=read_mode, plc_ip=simulator.host, plc_port=simulator.port,
+                          **({'gap_budget': gap_budget} if gap_budget is not None else {}))
+    for handler in client.logger.logger.handlers:
+        handler.setLevel(logging.WARNING)
+
+    items = make_items(tag_count)
+    client.connection = open_storage(storage, workdir)
+    if storage == "mariadb":
+        prepare_mariadb(client.connection, items)
+
+    requests_before = simulator.stats['requests']
+    read_times, store_times, scan_times = [], [], []
+    good = 0
+    try:
+        for scan in range(scans + 1):
+            scan_start = time.perf_counter()
+            collected = client.batch_read_plc_data(items)
+            read_end = time.perf_counter()
+            if client.connection is not None:
+                client.save_real_time_data(collected)
+            scan_end = time.perf_counter()
+
+            if scan == 0:
+                requests_before = simulator.stats['requests']
+                continue
+            read_times.append(read_end - scan_start)
+            store_times.append(scan_end - read_end)
+            scan_times.append(scan_end - scan_start)
+            good += sum(1 for data in collected if data['quality'] == 'good')
+    finally:
+        if storage == "mariadb":
+            cleanup_mariadb(client.connection)
+        if client.connection is not None:
+            client.connection.close()
+        close_all_sessions()
+
+    total_scan = sum(scan_times)
+    total_store = sum(store_times)
+    return {
+        'tag_count': tag_count,
+        'read_mode': read_mode,
+        'storage': storage,
+        'scans': scans,
+        'scan_p50_ms': round(percentile(scan_times, 50) * 1000, 3),
+        'scan_p99_ms': round(percentile(scan_times, 99) * 1000, 3),
+        'read_p50_ms': round(percentile(read_times, 50) * 1000, 3),
+        'read_p99_ms': round(percentile(read_times, 99) * 1000, 3),
+        'store_p50_ms': round(percentile(store_times, 50) * 1000, 3),
+        'store_p99_ms': round(percentile(store_times, 99) * 1000, 3),
+        'tags_per_sec': round(tag_count * scans / total_scan, 1) if total_scan else 0.0,
+        'db_rows_per_sec': round(tag_count * scans / total_store, 1) if storage != "none" and total_store else 0.0,
+        'plc_requests_per_scan': round((simulator.stats['requests'] - requests_before) / scans, 2),
+        'good_ratio': round(good / (tag_count * scans), 4)
+    }
+
+
+def run_benchmark(tag_counts: List[int], read_modes: List[str], storage_modes: List[str],
+                  scans: int = 20, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                  gap_budget: Optional[int] = None) -> Dict:
+    """전체 시나리오 실행 후 결과 반환"""
+    simulator = XGTSimulator(latency=latency_ms / 1000.0, jitter=jitter_ms / 1000.0, seed=1)
+    simulator.fill_random()
+    simulator.start()
+
+    scenarios = []
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for tag_count in tag_counts:
+                for read_mode in read_modes:
+                    for storage in storage_modes:
+                        result = run_scenario(simulator, tag_count, read_mode, storage, scans, workdir, gap_budget)
+                        scenarios.append(result)
+                        print(f"[{len(scenarios)}] 태그 {tag_count}개, 모드 {read_mode}, 저장 {storage}: "
+                              f"p50 {result['scan_p50_ms']}ms, p99 {result['scan_p99_ms']}ms, "
+                              f"{result['tags_per_sec']} tags/s")
+    finally:
+        simulator.stop()
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'simulator': {'latency_ms': latency_ms, 'jitter_ms': jitter_ms},
+        'scenarios': scenarios
+    }
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='PLC 수집 파이프라인 성능 측정 (XGT 시뮬레이터 사용)')
+    parser.add_argument('--tags', default=','.join(map(str, DEFAULT_TAG_COUNTS)),
+                        help='태그 수 목록 (기본값: 10,100,1000,10000)')
+    parser.add_argument('--modes', default=','.join(DEFAULT_READ_MODES), help='읽기 모드 목록 (기본값: 1,all)')
+    parser.add_argument('--storage', default=','.join(DEFAULT_STORAGE_MODES),
+                        help='저장 방식 목록: none, sqlite, mariadb (기본값: none,sqlite)')
+    parser.add_argument('--scans', type=int, default=20, help='시나리오별 측정 스캔 수 (기본값: 20)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='시뮬레이터 응답 지연 (밀리초)')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='시뮬레이터 응답 지연 편차 (밀리초)')
+    parser.add_argument('--gap-budget', type=int, help='배치 읽기 갭 허용 WORD 수')
+    parser.add_argument('--output', help='결과 JSON 파일 경로 (지정하지 않으면 표준출력)')
+
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        tag_counts=[int(v) for v in args.tags.split(',') if v],
+        read_modes=[v for v in args.modes.split(',') if v],
+        storage_modes=[v for v in args.storage.split(',') if v],
+        scans=args.scans,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        gap_budget=args.gap_budget
+    )
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"결과 저장: {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
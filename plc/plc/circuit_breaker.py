@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLC 연결 차단기(circuit breaker) - 응답 없는 PLC는 읽기를 건너뛰고 지수 백오프로만 재시도
+"""
+
+import time
+from typing import Optional
+
+STATE_CLOSED = "closed"        # 정상: 모든 읽기 시도
+STATE_OPEN = "open"            # 차단: 재시도 시각 전까지 읽기를 시도하지 않음
+STATE_HALF_OPEN = "half_open"  # 시험: 재시도 시각이 되어 요청 1번으로 복구 여부 확인
+
+DEFAULT_FAILURE_THRESHOLD = 3   # 연속 실패 횟수가 이 값에 도달하면 차단
+DEFAULT_BACKOFF_MIN = 1.0       # 첫 재시도 대기 (초)
+DEFAULT_BACKOFF_MAX = 60.0      # 최대 재시도 대기 (초)
+
+
+class CircuitOpenError(ConnectionError):
+    """차단 중인 PLC에 요청하려 할 때 (통신 없이 바로 발생)"""
+
+
+class Backoff:
+    """실패가 이어질수록 대기 시간을 2배씩 늘리는 재시도 간격 (성공하면 reset)"""
+
+    def __init__(self, minimum: float = DEFAULT_BACKOFF_MIN, maximum: float = DEFAULT_BACKOFF_MAX):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.delay = minimum
+
+    def next(self) -> float:
+        """이번 대기 시간 반환 후 다음 대기 시간을 2배로"""
+        delay = self.delay
+        self.delay = min(self.delay * 2, self.maximum)
+        return delay
+
+    def reset(self):
+        self.delay = self.minimum
+
+
+class CircuitBreaker:
+    """PLC 1대의 연결 상태 머신
+
+    - closed: 연속 실패가 failure_threshold회가 되면 open으로 전환
+    - open: allow()가 False를 반환 (연결/읽기 시도 없이 바로 건너뜀).
+      backoff초가 지나면 half_open으로 전환
+    - half_open: 시험 요청 1번만 허용. 성공하면 closed(백오프 초기화),
+      실패하면 다시 open(백오프 2배, 최대 backoff_max)
+    한 스레드(또는 이벤트 루프)에서만 사용하므로 잠금은 두지 않습니다.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 backoff_min: float = DEFAULT_BACKOFF_MIN, backoff_max: float = DEFAULT_BACKOFF_MAX):
+        self.failure_threshold = max(1, failure_threshold)
+        self.backoff_min = backoff_min
+        self.backoff_max = max(backoff_min, backoff_max)
+        self.state = STATE_CLOSED
+        self.failures = 0                  # 연속 실패 횟수
+        self.backoff = backoff_min         # 다음 open 시 대기 시간
+        self.retry_at = 0.0                # open 상태에서 시험 요청을 허용할 시각 (monotonic)
+        self.last_success: Optional[float] = None  # 마지막 성공 시각 (epoch)
+        self.stats = {
+            'opened': 0,
+            'probes': 0,
+            'short_circuited': 0,
+            'failures': 0
+        }
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """이번 요청을 시도해도 되는지 (open이면 재시도 시각이 지났을 때 half_open으로 1번 허용)"""
+        if self.state == STATE_CLOSED:
+            return True
+        now = now if now is not None else time.monotonic()
+        if self.state == STATE_OPEN and now >= self.retry_at:
+            self.state = STATE_HALF_OPEN
+            self.stats['probes'] += 1
+            return True
+        self.stats['short_circuited'] += 1
+        return False
+
+    def is_ready(self, now: Optional[float] = None) -> bool:
+        """allow()가 True를 반환할 상태인지 (상태를 바꾸지 않음, 스캔 전체를 건너뛸지 판단용)"""
+        if self.state == STATE_CLOSED:
+            return True
+        now = now if now is not None else time.monotonic()
+        return self.state == STATE_OPEN and now >= self.retry_at
+
+    def record_success(self) -> bool:
+        """요청 성공 기록 (차단/시험 상태에서 복구되었으면 True)"""
+        recovered = self.state != STATE_CLOSED
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.backoff = self.backoff_min
+        self.last_success = time.time()
+        return recovered
+
+    def record_failure(self, now: Optional[float] = None) -> bool:
+        """요청 실패 기록 (이번 실패로 open이 되었으면 True)"""
+        now = now if now is not None else time.monotonic()
+        self.failures += 1
+        self.stats['failures'] += 1
+        if self.state == STATE_HALF_OPEN:
+            # 시험 요청 실패: 대기 시간을 늘려 다시 차단
+            self.backoff = min(self.backoff * 2, self.backoff_max)
+        elif self.state == STATE_OPEN or self.failures < self.failure_threshold:
+            return False
+        opened = self.state == STATE_CLOSED
+        self.state = STATE_OPEN
+        self.retry_at = now + self.backoff
+        if opened:
+            self.stats['opened'] += 1
+        return opened
+
+    def retry_in(self, now: Optional[float] = None) -> float:
+        """다음 시험 요청까지 남은 시간 (초, 차단 중이 아니면 0)"""
+        if self.state != STATE_OPEN:
+            return 0.0
+        now = now if now is not None else time.monotonic()
+        return max(0.0, self.retry_at - now)
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != STATE_CLOSED
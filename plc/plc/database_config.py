@@ -5,8 +5,16 @@ MariaDB 데이터베이스 연결 설정
 """
 
 import pymysql
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from collections import deque
+from contextlib import contextmanager
 import os
+import threading
+import time
+
+# 다시 시도해도 같은 결과인 데이터 오류 (외래키/유니크 위반, 값 범위/형식 오류) - 연결 오류와 구분
+DATA_ERRORS = (pymysql.IntegrityError, pymysql.DataError)
 
 class DatabaseConfig:
     """데이터베이스 연결 설정 클래스"""
@@ -56,6 +64,40 @@ class DatabaseConfig:
             print(f"MariaDB 연결 실패: {e}")
             return None
     
+    # 연결 풀 설정 (환경변수 DB_POOL_MIN, DB_POOL_MAX, DB_POOL_MAX_LIFETIME으로 오버라이드 가능)
+    DEFAULT_POOL_MIN = 1
+    DEFAULT_POOL_MAX = 8
+    DEFAULT_POOL_MAX_LIFETIME = 3600.0   # 초
+    
+    _pool = None
+    _pool_lock = threading.Lock()
+    
+    @classmethod
+    def get_pool(cls) -> 'ConnectionPool':
+        """프로세스 공용 연결 풀 반환 (처음 호출 시 생성)"""
+        if cls._pool is None:
+            with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = ConnectionPool(
+                        connect_func=cls.create_connection,
+                        min_size=int(os.getenv('DB_POOL_MIN', cls.DEFAULT_POOL_MIN)),
+                        max_size=int(os.getenv('DB_POOL_MAX', cls.DEFAULT_POOL_MAX)),
+                        max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', cls.DEFAULT_POOL_MAX_LIFETIME))
+                    )
+                    cls._pool.fill()
+        return cls._pool
+    
+    @classmethod
+    def acquire_connection(cls, timeout: Optional[float] = None) -> Optional[pymysql.Connection]:
+        """연결 풀에서 연결 빌리기 (실패 시 None) - 사용 후 release_connection으로 반납"""
+        return cls.get_pool().acquire(timeout)
+    
+    @classmethod
+    def release_connection(cls, connection, discard: bool = False):
+        """빌린 연결 반납 (discard=True면 닫고 버림 - 오류가 난 연결)"""
+        if connection is not None:
+            cls.get_pool().release(connection, discard)
+    
     @classmethod
     def test_connection(cls) -> bool:
         """데이터베이스 연결 테스트"""
@@ -89,6 +131,12 @@ class DatabaseConfig:
                 ''')
                 
                 connection.commit()
+                if not cls.migrate_schema(connection):
+                    print("데이터베이스 스키마 마이그레이션 실패")
+                    return False
+                
+                # 이력/집계 테이블 일별 파티션 생성 (파티션 없는 기존 테이블은 여기서 변환)
+                PartitionManager(connection=connection).run_maintenance(convert=True)
                 print("MariaDB 데이터베이스 초기화 완료")
                 return True
                 
@@ -99,9 +147,196 @@ class DatabaseConfig:
             if connection:
                 connection.close()
     
+    @classmethod
+    def migrate_schema(cls, connection) -> bool:
+        """기존 DB에 수집기가 필요로 하는 키/인덱스/테이블/컬럼 추가
+        
+        단계마다 따로 실행하므로 한 단계가 실패해도 나머지 단계는 진행하며,
+        하나라도 실패하면 False를 반환합니다. (호출하는 쪽은 수집을 시작하지 않아야 함)
+        """
+        steps = [
+            cls.ensure_real_time_unique_key,
+            cls.ensure_history_index,
+            cls.ensure_rollup_tables,
+            cls.ensure_deadband_columns,
+            cls.ensure_scan_class_columns
+        ]
+        failed = [step.__name__ for step in steps if not step(connection)]
+        if failed:
+            print(f"스키마 마이그레이션 실패 단계: {', '.join(failed)}")
+        return not failed
+    
+    @classmethod
+    def ensure_deadband_columns(cls, connection) -> bool:
+        """plc_data_items에 항목별 불감대 설정 컬럼 추가 (없을 때만)"""
+        try:
+            with connection.cursor() as cursor:
+                if (cls._column_exists(cursor, 'plc_data_items', 'deadband')
+                        and cls._column_exists(cursor, 'plc_data_items', 'deadband_type')):
+                    return True
+                
+                cursor.execute('''
+                    ALTER TABLE plc_data_items
+                    ADD COLUMN IF NOT EXISTS deadband DECIMAL(15,4) NULL AFTER max_value,
+                    ADD COLUMN IF NOT EXISTS deadband_type VARCHAR(10) NOT NULL DEFAULT 'absolute' AFTER deadband
+                ''')
+            connection.commit()
+            print("plc_data_items 불감대 컬럼 추가 완료")
+            return True
+        except Exception as e:
+            print(f"plc_data_items 불감대 컬럼 추가 오류: {e}")
+            return False
+    
+    @classmethod
+    def ensure_scan_class_columns(cls, connection) -> bool:
+        """plc_data_items/plc_query_memory에 항목별 스캔 등급(수집 주기) 컬럼 추가 (없을 때만)"""
+        try:
+            with connection.cursor() as cursor:
+                added = []
+                if not cls._column_exists(cursor, 'plc_data_items', 'scan_class_ms'):
+                    cursor.execute('''
+                        ALTER TABLE plc_data_items
+                        ADD COLUMN IF NOT EXISTS scan_class_ms INT NULL AFTER deadband_type
+                    ''')
+                    added.append('plc_data_items')
+                # plc_query_memory는 백엔드가 생성하므로 있을 때만 추가
+                if (cls._table_exists(cursor, 'plc_query_memory')
+                        and not cls._column_exists(cursor, 'plc_query_memory', 'scan_class_ms')):
+                    cursor.execute('''
+                        ALTER TABLE plc_query_memory
+                        ADD COLUMN IF NOT EXISTS scan_class_ms INT NULL AFTER memory_address
+                    ''')
+                    added.append('plc_query_memory')
+            connection.commit()
+            if added:
+                print(f"스캔 등급 컬럼 추가 완료: {', '.join(added)}")
+            return True
+        except Exception as e:
+            print(f"스캔 등급 컬럼 추가 오류: {e}")
+            return False
+    
+    @classmethod
+    def ensure_rollup_tables(cls, connection) -> bool:
+        """1분/1시간 집계 테이블 생성 (없을 때만, 기존 테이블에는 last_ts 컬럼 추가)"""
+        try:
+            with connection.cursor() as cursor:
+                for table in ('plc_data_rollup_1m', 'plc_data_rollup_1h'):
+                    if not cls._table_exists(cursor, table):
+                        cursor.execute(cls._get_rollup_table_sql(table))
+                    elif not cls._column_exists(cursor, table, 'last_ts'):
+                        cursor.execute(f'''
+                            ALTER TABLE {table}
+                            ADD COLUMN IF NOT EXISTS last_ts TIMESTAMP(3) NULL DEFAULT NULL AFTER last_value
+                        ''')
+                        print(f"{table} last_ts 컬럼 추가 완료")
+            connection.commit()
+            return True
+        except Exception as e:
+            print(f"집계 테이블 생성 오류: {e}")
+            return False
+    
+    @staticmethod
+    def _get_rollup_table_sql(table: str) -> str:
+        """집계 테이블 생성 SQL (구간 시작 시각 기준 일별 파티션)"""
+        return f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                data_item_id INT NOT NULL,
+                timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                min_value DECIMAL(15,4),
+                max_value DECIMAL(15,4),
+                sum_value DOUBLE,
+                sample_count INT NOT NULL DEFAULT 0,
+                avg_value DOUBLE AS (sum_value / sample_count) VIRTUAL,
+                last_value DECIMAL(15,4),
+                last_ts TIMESTAMP(3) NULL DEFAULT NULL,
+                PRIMARY KEY (data_item_id, timestamp)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+                PARTITION pmax VALUES LESS THAN MAXVALUE
+            );
+        '''
+    
+    @classmethod
+    def _table_exists(cls, cursor, table: str) -> bool:
+        cursor.execute('''
+            SELECT COUNT(*) FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name = %s
+        ''', (table,))
+        return cursor.fetchone()[0] > 0
+    
+    @classmethod
+    def _column_exists(cls, cursor, table: str, column: str) -> bool:
+        cursor.execute('''
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        ''', (table, column))
+        return cursor.fetchone()[0] > 0
+    
+    @classmethod
+    def _index_exists(cls, cursor, table: str, index: str) -> bool:
+        cursor.execute('''
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        ''', (table, index))
+        return cursor.fetchone()[0] > 0
+    
+    @classmethod
+    def ensure_history_index(cls, connection) -> bool:
+        """plc_data_history에 (data_item_id, timestamp, value) 복합 인덱스 보장
+        
+        항목별 기간 조회가 인덱스 범위 스캔만으로 끝나도록 하며,
+        앞부분이 겹치는 data_item_id 단일 인덱스는 제거합니다.
+        """
+        try:
+            with connection.cursor() as cursor:
+                if cls._index_exists(cursor, 'plc_data_history', 'idx_data_history_item_time'):
+                    return True
+                
+                cursor.execute('''
+                    ALTER TABLE plc_data_history
+                    ADD INDEX idx_data_history_item_time (data_item_id, timestamp, value)
+                ''')
+                if cls._index_exists(cursor, 'plc_data_history', 'idx_data_history_item'):
+                    cursor.execute('ALTER TABLE plc_data_history DROP INDEX idx_data_history_item')
+            connection.commit()
+            print("plc_data_history 복합 인덱스 추가 완료")
+            return True
+        except Exception as e:
+            print(f"plc_data_history 인덱스 추가 오류: {e}")
+            return False
+    
+    @classmethod
+    def ensure_real_time_unique_key(cls, connection) -> bool:
+        """plc_real_time_data에 data_item_id 유니크 키 보장 (기존 DB 마이그레이션)
+        
+        유니크 키가 없으면 항목별 최신 행만 남기고 중복을 지운 뒤 키를 추가합니다.
+        """
+        try:
+            with connection.cursor() as cursor:
+                if cls._index_exists(cursor, 'plc_real_time_data', 'uk_real_time_data_item'):
+                    return True
+                
+                cursor.execute('''
+                    DELETE t1 FROM plc_real_time_data t1
+                    JOIN plc_real_time_data t2
+                      ON t1.data_item_id = t2.data_item_id AND t1.id < t2.id
+                ''')
+                cursor.execute('''
+                    ALTER TABLE plc_real_time_data
+                    ADD UNIQUE KEY uk_real_time_data_item (data_item_id)
+                ''')
+            connection.commit()
+            print("plc_real_time_data 유니크 키 추가 완료")
+            return True
+        except Exception as e:
+            print(f"plc_real_time_data 유니크 키 추가 오류: {e}")
+            return False
+    
     @classmethod
     def _get_create_tables_sql(cls) -> str:
         """테이블 생성 SQL 반환"""
+        rollup_tables_sql = "".join(cls._get_rollup_table_sql(table)
+                                    for table in ('plc_data_rollup_1m', 'plc_data_rollup_1h'))
         return '''
             CREATE TABLE IF NOT EXISTS plc_devices (
                 id INT AUTO_INCREMENT PRIMARY KEY,
@@ -128,6 +363,9 @@ class DatabaseConfig:
                 unit VARCHAR(20),
                 min_value DECIMAL(10,2),
                 max_value DECIMAL(10,2),
+                deadband DECIMAL(15,4) NULL,
+                deadband_type VARCHAR(10) NOT NULL DEFAULT 'absolute',
+                scan_class_ms INT NULL,
                 is_active BOOLEAN DEFAULT TRUE,
                 line_number INT,
                 source_line TEXT,
@@ -142,18 +380,24 @@ class DatabaseConfig:
                 value DECIMAL(15,4),
                 quality VARCHAR(20) DEFAULT 'good',
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE KEY uk_real_time_data_item (data_item_id),
                 FOREIGN KEY (data_item_id) REFERENCES plc_data_items(id) ON DELETE CASCADE
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
             
             CREATE TABLE IF NOT EXISTS plc_data_history (
-                id INT AUTO_INCREMENT PRIMARY KEY,
+                id INT AUTO_INCREMENT,
                 data_item_id INT,
                 value DECIMAL(15,4),
                 quality VARCHAR(20),
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (data_item_id) REFERENCES plc_data_items(id) ON DELETE CASCADE
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
-            
+                timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id, timestamp),
+                INDEX idx_data_history_item_time (data_item_id, timestamp, value),
+                INDEX idx_data_history_timestamp (timestamp)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+                PARTITION pmax VALUES LESS THAN MAXVALUE
+            );
+            ''' + rollup_tables_sql + '''
             CREATE TABLE IF NOT EXISTS data_collection_config (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 plc_device_id INT,
@@ -167,13 +411,401 @@ class DatabaseConfig:
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
         '''
 
+class ConnectionPool:
+    """스레드 안전 pymysql 연결 풀
+    
+    - 처음에 min_size개를 미리 연결하고, 동시에 열 수 있는 연결은 최대 max_size개
+    - 빌려줄 때 ping으로 상태를 확인하고, 끊긴 연결은 버리고 새로 연결
+    - 생성 후 max_lifetime초가 지난 연결은 반납/대여 시 닫음 (서버 wait_timeout 대비)
+    - 모두 사용 중이면 timeout초까지 대기 (도착 순서대로 넘겨받음) 하며 대기 시간을 통계로 기록
+    - 새 연결은 잠금 밖에서 생성하므로 느린 재연결이 다른 스레드의 대여/반납을 막지 않음
+    """
+    
+    DEFAULT_TIMEOUT = 30.0
+    
+    def __init__(self, connect_func, min_size: int = 1, max_size: int = 8,
+                 max_lifetime: float = 3600.0, timeout: float = DEFAULT_TIMEOUT):
+        self.connect_func = connect_func
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self._idle: List[Tuple[object, float]] = []  # (연결, 생성 시각)
+        self._created_at: Dict[int, float] = {}      # id(연결 또는 예약) -> 생성 시각 (사용 중 포함)
+        self._waiting = deque()                      # 대기 중인 대여 요청 (넘겨받을 항목 슬롯)
+        self._cond = threading.Condition()
+        self.stats = {
+            'created': 0,
+            'closed': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+            'ping_failures': 0,
+            'connect_failures': 0
+        }
+    
+    @property
+    def size(self) -> int:
+        """현재 열린(또는 여는 중인) 연결 수"""
+        return len(self._created_at)
+    
+    @property
+    def in_use(self) -> int:
+        return len(self._created_at) - len(self._idle)
+    
+    # 아래 _로 시작하는 메서드는 _cond 잠금 안에서 호출
+    
+    def _reserve(self) -> Tuple[None, object]:
+        """새 연결 자리 예약 (실제 연결은 잠금 밖에서)"""
+        token = object()
+        self._created_at[id(token)] = time.time()
+        return None, token
+    
+    def _give(self, entry: tuple):
+        """대기 중인 요청이 있으면 먼저 온 요청에 넘기고, 없으면 유휴 목록에 추가"""
+        if self._waiting:
+            self._waiting.popleft()['entry'] = entry
+            self._cond.notify_all()
+        elif entry[0] is None:
+            self._created_at.pop(id(entry[1]), None)
+        else:
+            self._idle.append(entry)
+    
+    def _close(self, connection):
+        """연결을 닫고, 빈 자리는 대기 중인 요청에 예약으로 넘김"""
+        self._created_at.pop(id(connection), None)
+        self.stats['closed'] += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+        if self._waiting:
+            self._give(self._reserve())
+    
+    def _wait(self, start: float, timeout: float) -> Optional[tuple]:
+        slot = {'entry': None}
+        self._waiting.append(slot)
+        while slot['entry'] is None:
+            remaining = timeout - (time.time() - start)
+            if remaining <= 0:
+                self._waiting.remove(slot)
+                self.stats['timeouts'] += 1
+                return None
+            self._cond.wait(remaining)
+        return slot['entry']
+    
+    def _record_wait(self, start: float):
+        wait_time = time.time() - start
+        self.stats['waits'] += 1
+        self.stats['wait_time_total'] += wait_time
+        self.stats['wait_time_max'] = max(self.stats['wait_time_max'], wait_time)
+    
+    def acquire(self, timeout: Optional[float] = None) -> Optional[object]:
+        """연결 빌리기 (연결 실패 또는 대기 시간 초과 시 None)"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.time()
+        with self._cond:
+            if self._idle and not self._waiting:
+                entry = self._idle.pop()
+            elif self.size < self.max_size and not self._waiting:
+                entry = self._reserve()
+            else:
+                entry = self._wait(start, timeout)
+                self._record_wait(start)
+                if entry is None:
+                    return None
+        
+        while True:
+            connection, created_at = entry
+            if connection is None:
+                connection = self.connect_func()
+                with self._cond:
+                    self._created_at.pop(id(created_at), None)
+                    if connection is None:
+                        self.stats['connect_failures'] += 1
+                        if self._waiting:
+                            self._give(self._reserve())
+                        return None
+                    self._created_at[id(connection)] = time.time()
+                    self.stats['created'] += 1
+                    self.stats['checkouts'] += 1
+                return connection
+            
+            # 수명 초과/끊긴 연결은 닫고 그 자리에 새로 연결
+            if time.time() - created_at < self.max_lifetime and self._ping(connection):
+                with self._cond:
+                    self.stats['checkouts'] += 1
+                return connection
+            with self._cond:
+                self._created_at.pop(id(connection), None)
+                self.stats['closed'] += 1
+                entry = self._reserve()
+            try:
+                connection.close()
+            except Exception:
+                pass
+    
+    def _ping(self, connection) -> bool:
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            with self._cond:
+                self.stats['ping_failures'] += 1
+            return False
+    
+    def release(self, connection, discard: bool = False):
+        """연결 반납 (discard=True이거나 수명이 지났으면 닫음)"""
+        with self._cond:
+            created_at = self._created_at.get(id(connection))
+            if created_at is None:
+                # 풀에서 빌리지 않은 연결
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+                return
+            if discard or time.time() - created_at >= self.max_lifetime:
+                self._close(connection)
+            else:
+                self._give((connection, created_at))
+    
+    def fill(self):
+        """연결을 min_size개까지 미리 생성"""
+        while True:
+            with self._cond:
+                if self.size >= self.min_size:
+                    return
+                _, token = self._reserve()
+            connection = self.connect_func()
+            with self._cond:
+                self._created_at.pop(id(token), None)
+                if connection is None:
+                    self.stats['connect_failures'] += 1
+                    return
+                created_at = time.time()
+                self._created_at[id(connection)] = created_at
+                self.stats['created'] += 1
+                self._give((connection, created_at))
+    
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """with 블록 동안 연결 빌리기 (예외 발생 시 연결을 버림, 연결 실패 시 None)"""
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        except Exception:
+            if connection is not None:
+                self.release(connection, discard=True)
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                self.release(connection)
+    
+    def close(self):
+        """유휴 연결 모두 닫기 (사용 중인 연결은 반납 시 풀에 남음)"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            for connection, _ in idle:
+                self._close(connection)
+    
+    def get_stats(self) -> Dict:
+        """통계 (평균 대기 시간, 현재 연결 수 포함)"""
+        with self._cond:
+            stats = dict(self.stats)
+            stats['size'] = self.size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self.in_use
+            stats['waiting'] = len(self._waiting)
+            stats['wait_time_avg'] = stats['wait_time_total'] / stats['waits'] if stats['waits'] else 0.0
+            return stats
+
+
+class PartitionManager:
+    """이력 테이블 일별 RANGE 파티션 관리
+    
+    - 파티션 p{YYYYMMDD}는 그날의 행을 담고, 마지막 pmax(MAXVALUE)가 미래 행을 받음
+    - days_ahead일 뒤까지 파티션을 미리 만들어 pmax가 비어 있는 상태를 유지
+      (빈 pmax를 나누는 REORGANIZE는 데이터 이동이 없음)
+    - 보존 기간이 지난 파티션은 DROP PARTITION으로 삭제 (DELETE와 달리 테이블 잠금/언두 없음)
+    - 파티션 없는 기존 테이블의 변환은 테이블 전체를 다시 쓰므로 주기 관리에서는 하지 않고
+      초기화/`database_config.py --partition`에서만 실행 (수집 중지 후)
+    """
+    
+    # 테이블별 보존 일수 (DB_HISTORY_RETENTION_DAYS로 plc_data_history 보존 일수 지정)
+    DEFAULT_RETENTION = {
+        'plc_data_history': 90,
+        'plc_data_rollup_1m': 400,
+        'plc_data_rollup_1h': 1830
+    }
+    DEFAULT_DAYS_AHEAD = 7
+    MAX_PARTITION = 'pmax'
+    
+    def __init__(self, retention: Dict[str, int] = None, days_ahead: int = DEFAULT_DAYS_AHEAD,
+                 connection=None):
+        self.retention = dict(retention or self.DEFAULT_RETENTION)
+        if retention is None and os.getenv('DB_HISTORY_RETENTION_DAYS'):
+            self.retention['plc_data_history'] = int(os.getenv('DB_HISTORY_RETENTION_DAYS'))
+        self.days_ahead = days_ahead
+        self.connection = connection
+    
+    @staticmethod
+    def partition_name(day: date) -> str:
+        return f"p{day:%Y%m%d}"
+    
+    @staticmethod
+    def _partition_def(day: date) -> str:
+        """day 하루치 행을 담는 파티션 정의 (다음 날 0시 미만)"""
+        upper = day + timedelta(days=1)
+        return (f"PARTITION {PartitionManager.partition_name(day)} "
+                f"VALUES LESS THAN (UNIX_TIMESTAMP('{upper:%Y-%m-%d} 00:00:00'))")
+    
+    def get_partitions(self, cursor, table: str) -> List[Tuple[str, str]]:
+        """(파티션명, LESS THAN 값) 목록 (순서대로, 파티션 없는 테이블은 빈 목록)"""
+        cursor.execute('''
+            SELECT partition_name, partition_description
+            FROM information_schema.partitions
+            WHERE table_schema = DATABASE() AND table_name = %s AND partition_name IS NOT NULL
+            ORDER BY partition_ordinal_position
+        ''', (table,))
+        return [(row[0], row[1]) for row in cursor.fetchall()]
+    
+    def partition_table(self, cursor, table: str):
+        """파티션이 없는 기존 테이블을 일별 파티션 테이블로 변환 (테이블 재작성)
+        
+        MariaDB 파티션 테이블은 외래키를 지원하지 않고 모든 유니크 키에
+        파티션 컬럼이 포함되어야 하므로 외래키를 제거하고 PK를 (id, timestamp)로 바꿉니다.
+        """
+        cursor.execute('''
+            SELECT constraint_name FROM information_schema.referential_constraints
+            WHERE constraint_schema = DATABASE() AND table_name = %s
+        ''', (table,))
+        for (constraint_name,) in cursor.fetchall():
+            cursor.execute(f"ALTER TABLE {table} DROP FOREIGN KEY {constraint_name}")
+        
+        cursor.execute(f'''
+            ALTER TABLE {table}
+            MODIFY timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (id, timestamp)
+        ''')
+        
+        cursor.execute(f"SELECT MIN(timestamp) FROM {table}")
+        oldest = cursor.fetchone()[0]
+        first_day = oldest.date() if oldest else date.today()
+        days = [first_day + timedelta(days=i) for i in range((date.today() - first_day).days + 1)]
+        definitions = ",\n".join([self._partition_def(day) for day in days]
+                                 + [f"PARTITION {self.MAX_PARTITION} VALUES LESS THAN MAXVALUE"])
+        cursor.execute(f'''
+            ALTER TABLE {table}
+            PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+                {definitions}
+            )
+        ''')
+        print(f"{table} 일별 파티션 변환 완료 ({len(days)}일)")
+    
+    def create_future_partitions(self, cursor, table: str) -> List[str]:
+        """days_ahead일 뒤까지 없는 파티션을 pmax를 나눠 생성
+        
+        pmax 앞에만 추가할 수 있으므로 마지막 일별 파티션 다음 날부터 만듭니다.
+        관리가 멈췄던 동안 pmax에 쌓인 지난 날짜의 행도 제 날짜 파티션으로 옮겨져
+        보존 기간에 맞춰 삭제됩니다. (일별 파티션이 없으면 pmax의 가장 오래된 행 날짜부터)
+        """
+        existing = {name for name, _ in self.get_partitions(cursor, table)}
+        today = date.today()
+        last_day = max((datetime.strptime(name[1:], "%Y%m%d").date()
+                        for name in existing if name != self.MAX_PARTITION), default=None)
+        if last_day is not None:
+            first_day = last_day + timedelta(days=1)
+        else:
+            cursor.execute(f"SELECT MIN(timestamp) FROM {table} PARTITION ({self.MAX_PARTITION})")
+            oldest = cursor.fetchone()[0]
+            first_day = min(oldest.date(), today) if oldest else today
+        last_new_day = today + timedelta(days=self.days_ahead)
+        new_days = [first_day + timedelta(days=i) for i in range((last_new_day - first_day).days + 1)]
+        if not new_days:
+            return []
+        
+        definitions = ",\n".join([self._partition_def(day) for day in new_days]
+                                 + [f"PARTITION {self.MAX_PARTITION} VALUES LESS THAN MAXVALUE"])
+        cursor.execute(f'''
+            ALTER TABLE {table} REORGANIZE PARTITION {self.MAX_PARTITION} INTO (
+                {definitions}
+            )
+        ''')
+        return [self.partition_name(day) for day in new_days]
+    
+    def drop_expired_partitions(self, cursor, table: str, retention_days: int) -> List[str]:
+        """보존 기간이 지난 일별 파티션 삭제"""
+        cutoff = date.today() - timedelta(days=retention_days)
+        expired = [name for name, _ in self.get_partitions(cursor, table)
+                   if name != self.MAX_PARTITION and datetime.strptime(name[1:], "%Y%m%d").date() < cutoff]
+        if expired:
+            cursor.execute(f"ALTER TABLE {table} DROP PARTITION {', '.join(expired)}")
+        return expired
+    
+    def run_maintenance(self, convert: bool = False) -> Dict[str, Dict[str, List[str]]]:
+        """모든 대상 테이블의 파티션 생성/삭제 (XG5000Client 파티션 관리 스레드에서 주기 실행)
+        
+        convert=True이면 파티션 없는 테이블을 먼저 변환하고, 아니면 건너뜁니다.
+        """
+        summary = {}
+        connection = self.connection or DatabaseConfig.acquire_connection()
+        if connection is None:
+            return summary
+        
+        try:
+            for table, retention_days in self.retention.items():
+                try:
+                    with connection.cursor() as cursor:
+                        if not self.get_partitions(cursor, table):
+                            if not convert:
+                                print(f"{table}: 파티션 없는 테이블 - 파티션 관리를 건너뜀 "
+                                      f"(수집 중지 후 'python database_config.py --partition'으로 변환)")
+                                summary[table] = {'created': [], 'dropped': []}
+                                continue
+                            self.partition_table(cursor, table)
+                        created = self.create_future_partitions(cursor, table)
+                        dropped = self.drop_expired_partitions(cursor, table, retention_days)
+                    summary[table] = {'created': created, 'dropped': dropped}
+                    print(f"{table} 파티션 관리: 생성 {len(created)}개, 삭제 {len(dropped)}개 "
+                          f"(보존 {retention_days}일)")
+                except Exception as e:
+                    print(f"{table} 파티션 관리 오류: {e}")
+        finally:
+            if self.connection is None:
+                DatabaseConfig.release_connection(connection)
+        
+        return summary
+
+
 def main():
     """메인 함수 - 연결 테스트 및 초기화"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='MariaDB 연결 테스트 및 초기화')
+    parser.add_argument('--partition', action='store_true',
+                        help='파티션 없는 이력/집계 테이블을 일별 파티션으로 변환 (테이블 재작성, 수집 중지 후 실행)')
+    args = parser.parse_args()
+    
     print("=== MariaDB 연결 테스트 ===")
     
     if DatabaseConfig.test_connection():
         print("✅ 데이터베이스 연결 성공!")
         
+        if args.partition:
+            print("\n=== 이력/집계 테이블 파티션 변환 ===")
+            connection = DatabaseConfig.create_connection()
+            if connection:
+                try:
+                    PartitionManager(connection=connection).run_maintenance(convert=True)
+                finally:
+                    connection.close()
+            return
+        
         print("\n=== 데이터베이스 초기화 ===")
         if DatabaseConfig.init_database():
             print("✅ 데이터베이스 초기화 완료!")
@@ -70,9 +70,11 @@ CREATE TABLE data_collection_config (
 -- 인덱스 생성
 CREATE INDEX idx_plc_data_items_device ON plc_data_items(plc_device_id);
 CREATE INDEX idx_plc_data_items_type ON plc_data_items(item_type);
-CREATE INDEX idx_real_time_data_item ON plc_real_time_data(data_item_id);
+-- 항목당 최신값 1건만 유지 (INSERT ... ON CONFLICT 업서트 키)
+CREATE UNIQUE INDEX uk_real_time_data_item ON plc_real_time_data(data_item_id);
 CREATE INDEX idx_real_time_data_timestamp ON plc_real_time_data(timestamp);
-CREATE INDEX idx_data_history_item ON plc_data_history(data_item_id);
+-- 항목별 추세 조회(WHERE data_item_id = ? AND timestamp BETWEEN ...)를 인덱스만으로 처리
+CREATE INDEX idx_data_history_item_time ON plc_data_history(data_item_id, timestamp, value);
 CREATE INDEX idx_data_history_timestamp ON plc_data_history(timestamp);
 
 -- 샘플 데이터 삽입
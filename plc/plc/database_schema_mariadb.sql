@@ -32,6 +32,9 @@ CREATE TABLE IF NOT EXISTS plc_data_items (
     unit VARCHAR(20) COMMENT '단위 (예: ℃, %, RPM 등)',
     min_value DECIMAL(10,2) COMMENT '최소값',
     max_value DECIMAL(10,2) COMMENT '최대값',
+    deadband DECIMAL(15,4) NULL COMMENT '불감대 (NULL이면 수집기 기본값)',
+    deadband_type VARCHAR(10) NOT NULL DEFAULT 'absolute' COMMENT 'absolute(절대값) 또는 percent(min~max 범위의 %)',
+    scan_class_ms INT NULL COMMENT '스캔 등급 (수집 주기 ms, 예: 100/1000/10000/60000, NULL이면 수집기 기본 주기)',
     is_active BOOLEAN DEFAULT TRUE,
     line_number INT COMMENT 'PRG 파일의 라인 번호',
     source_line TEXT COMMENT '원본 PRG 라인',
@@ -47,18 +50,57 @@ CREATE TABLE IF NOT EXISTS plc_real_time_data (
     value DECIMAL(15,4) COMMENT '수집된 값',
     quality VARCHAR(20) DEFAULT 'good' COMMENT 'good, bad, uncertain',
     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uk_real_time_data_item (data_item_id) COMMENT '항목당 최신값 1건 (ON DUPLICATE KEY UPDATE 업서트 키)',
     FOREIGN KEY (data_item_id) REFERENCES plc_data_items(id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
--- 4. 데이터 수집 이력 테이블 (선택사항)
+-- 4. 데이터 수집 이력 테이블 (일별 RANGE 파티션)
+-- 일별 파티션 생성/보존 기간 경과 파티션 삭제는 database_config.PartitionManager가 수행
+-- 파티션 테이블은 외래키를 지원하지 않으며, PK에 파티션 컬럼(timestamp)이 포함되어야 함
 CREATE TABLE IF NOT EXISTS plc_data_history (
-    id INT AUTO_INCREMENT PRIMARY KEY,
+    id INT AUTO_INCREMENT,
     data_item_id INT,
     value DECIMAL(15,4) COMMENT '수집된 값',
     quality VARCHAR(20) COMMENT '데이터 품질',
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (data_item_id) REFERENCES plc_data_items(id) ON DELETE CASCADE
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, timestamp)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- 4-1. 1분/1시간 집계 테이블 (수집기가 스캔 스트림에서 누적하여 저장, 일별 RANGE 파티션)
+CREATE TABLE IF NOT EXISTS plc_data_rollup_1m (
+    data_item_id INT NOT NULL,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '집계 구간 시작',
+    min_value DECIMAL(15,4) COMMENT '최소값',
+    max_value DECIMAL(15,4) COMMENT '최대값',
+    sum_value DOUBLE COMMENT '합계 (평균 계산용)',
+    sample_count INT NOT NULL DEFAULT 0 COMMENT '표본 수 (품질 good만)',
+    avg_value DOUBLE AS (sum_value / sample_count) VIRTUAL COMMENT '평균',
+    last_value DECIMAL(15,4) COMMENT '구간 마지막 값',
+    last_ts TIMESTAMP(3) NULL DEFAULT NULL COMMENT '마지막 값의 수집 시각 (병합 시 더 늦은 값 유지)',
+    PRIMARY KEY (data_item_id, timestamp)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE IF NOT EXISTS plc_data_rollup_1h (
+    data_item_id INT NOT NULL,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '집계 구간 시작',
+    min_value DECIMAL(15,4) COMMENT '최소값',
+    max_value DECIMAL(15,4) COMMENT '최대값',
+    sum_value DOUBLE COMMENT '합계 (평균 계산용)',
+    sample_count INT NOT NULL DEFAULT 0 COMMENT '표본 수 (품질 good만)',
+    avg_value DOUBLE AS (sum_value / sample_count) VIRTUAL COMMENT '평균',
+    last_value DECIMAL(15,4) COMMENT '구간 마지막 값',
+    last_ts TIMESTAMP(3) NULL DEFAULT NULL COMMENT '마지막 값의 수집 시각 (병합 시 더 늦은 값 유지)',
+    PRIMARY KEY (data_item_id, timestamp)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
 
 -- 5. 데이터 수집 설정 테이블
 CREATE TABLE IF NOT EXISTS data_collection_config (
@@ -76,9 +118,9 @@ CREATE TABLE IF NOT EXISTS data_collection_config (
 -- 인덱스 생성
 CREATE INDEX idx_plc_data_items_device ON plc_data_items(plc_device_id);
 CREATE INDEX idx_plc_data_items_type ON plc_data_items(item_type);
-CREATE INDEX idx_real_time_data_item ON plc_real_time_data(data_item_id);
 CREATE INDEX idx_real_time_data_timestamp ON plc_real_time_data(timestamp);
-CREATE INDEX idx_data_history_item ON plc_data_history(data_item_id);
+-- 항목별 추세 조회(WHERE data_item_id = ? AND timestamp BETWEEN ...)를 인덱스만으로 처리
+CREATE INDEX idx_data_history_item_time ON plc_data_history(data_item_id, timestamp, value);
 CREATE INDEX idx_data_history_timestamp ON plc_data_history(timestamp);
 
 -- 샘플 데이터 삽입
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+예외 보고(report-by-exception) 필터 - 불감대 이내로 변한 값은 저장하지 않음
+"""
+
+from typing import Dict, List, Optional
+
+DEADBAND_ABSOLUTE = "absolute"
+DEADBAND_PERCENT = "percent"
+DEADBAND_TYPES = [DEADBAND_ABSOLUTE, DEADBAND_PERCENT]
+
+DEFAULT_DEADBAND = 0.0        # 기본 불감대 (절대값, 0이면 값이 바뀔 때만 저장)
+DEFAULT_MAX_SILENCE = 60.0    # 값이 그대로여도 이 시간(초)이 지나면 다시 저장 (0이면 사용 안 함)
+
+
+class DeadbandFilter:
+    """항목별 불감대 + 최대 무보고 시간(heartbeat) 필터
+
+    plc_data_items의 설정으로 항목별 임계값을 계산합니다.
+    - deadband_type = 'absolute': 마지막 저장값과의 차이가 deadband 초과일 때 저장
+    - deadband_type = 'percent': 임계값 = (max_value - min_value) * deadband / 100
+      (min_value/max_value가 없으면 마지막 저장값 크기의 deadband %)
+    - deadband가 NULL이면 기본 불감대(절대값) 사용
+    품질이 바뀌었거나 max_silence초 동안 저장하지 않은 항목은 값과 관계없이 저장합니다.
+    마지막 저장값은 저장에 성공한 뒤 commit()으로 반영하므로, 버려지거나 저장에 실패한 스캔의 값이
+    이후 비교 기준이 되지 않습니다.
+    """
+
+    def __init__(self, default_deadband: float = DEFAULT_DEADBAND,
+                 max_silence: float = DEFAULT_MAX_SILENCE):
+        self.default_deadband = default_deadband
+        self.max_silence = max_silence
+        self._items = None
+        self._settings: Dict[int, tuple] = {}      # data_item_id -> (불감대, percent 여부, 범위)
+        self._last: Dict[int, tuple] = {}          # data_item_id -> (값, 품질, 저장 시각)
+        self.stats = {
+            'received_rows': 0,
+            'passed_rows': 0
+        }
+
+    def configure(self, items: List[Dict]):
+        """수집 항목 목록으로 항목별 불감대 설정 (같은 목록이면 다시 계산하지 않음)"""
+        if items is self._items:
+            return
+        self._items = items
+        settings = {}
+        for item in items:
+            deadband = item.get('deadband')
+            if deadband is None:
+                settings[item['id']] = (self.default_deadband, False, None)
+                continue
+            span = None
+            if item.get('min_value') is not None and item.get('max_value') is not None:
+                span = abs(float(item['max_value']) - float(item['min_value'])) or None
+            settings[item['id']] = (float(deadband), item.get('deadband_type') == DEADBAND_PERCENT, span)
+        self._settings = settings
+
+    def _threshold(self, item_id: int, last_value: float) -> float:
+        deadband, percent, span = self._settings.get(item_id, (self.default_deadband, False, None))
+        if not percent:
+            return deadband
+        return (span if span is not None else abs(last_value)) * deadband / 100.0
+
+    def filter(self, rows: List[Dict], now: float, pending: Optional[Dict[int, tuple]] = None) -> List[Dict]:
+        """저장할 행만 반환 (처음 본 항목, 품질 변경, 불감대 초과, 무보고 시간 초과)
+
+        pending을 주면 통과한 값을 마지막 저장값 대신 pending에 모아 두고(저장 성공 후 commit),
+        같은 pending으로 여러 스캔을 차례로 거르면 앞 스캔에서 통과한 값을 기준으로 비교합니다.
+        """
+        passed = []
+        last = self._last
+        target = last if pending is None else pending
+        max_silence = self.max_silence
+        for row in rows:
+            item_id = row['data_item_id']
+            value = row['value']
+            quality = row['quality']
+            previous = (pending.get(item_id) if pending else None) or last.get(item_id)
+            if (previous is None
+                    or quality != previous[1]
+                    or (max_silence > 0 and now - previous[2] >= max_silence)
+                    or abs(value - previous[0]) > self._threshold(item_id, previous[0])):
+                target[item_id] = (value, quality, now)
+                passed.append(row)
+        self.stats['received_rows'] += len(rows)
+        self.stats['passed_rows'] += len(passed)
+        return passed
+
+    def commit(self, pending: Dict[int, tuple]):
+        """저장에 성공한 값을 마지막 저장값으로 반영"""
+        self._last.update(pending)
+
+    def reset(self, item_id: Optional[int] = None):
+        """마지막 저장값 초기화 (다음 값은 무조건 저장)"""
+        if item_id is None:
+            self._last.clear()
+        else:
+            self._last.pop(item_id, None)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLC 장치별 수집 워커 - 장치마다 스레드/연결/차단기를 따로 두어 한 장치의 장애가 다른 장치의 주기에 영향을 주지 않음
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from pymodbus.client.sync import ModbusTcpClient
+
+from circuit_breaker import CircuitBreaker, STATE_HALF_OPEN
+from scan_scheduler import ScanScheduler
+
+# plc_devices.status 값
+DEVICE_ONLINE = "online"
+DEVICE_OFFLINE = "offline"
+
+
+class DevicePoller:
+    """PLC 1대 전용 수집 스레드
+
+    - 자체 ModbusTcpClient 연결과 ScanScheduler(같은 벽시계 경계)로 다른 장치와 독립적으로 폴링
+    - 연결/읽기 실패는 CircuitBreaker에 기록하고, 차단 중에는 연결을 시도하지 않고 주기만 넘김
+      (죽은 PLC의 연결 타임아웃은 이 장치의 스레드만 기다림)
+    - 스캔 결과는 sink(행 목록, 스캔 시각)로 공유 저장 큐에 넣음
+    - 연결 상태가 바뀌면 status_func(장치 ID, 상태, 마지막 연결 시각)로 plc_devices를 갱신
+    """
+
+    def __init__(self, device: Dict, items_func: Callable[[], tuple],
+                 read_func: Callable[[Any, Dict], Optional[float]],
+                 sink: Callable[[List[Dict], float], Any],
+                 status_func: Callable[[Any, str, Optional[datetime]], None],
+                 interval_ms: int, breaker: Optional[CircuitBreaker] = None):
+        self.device = device
+        self.plc_id = device['id']
+        self.items_func = items_func    # 이 장치의 현재 수집 항목 (레지스트리에서 조회)
+        self.read_func = read_func      # (클라이언트, 항목) -> 값 (실패 시 None)
+        self.sink = sink
+        self.status_func = status_func
+        self.scheduler = ScanScheduler(interval_ms)
+        self.breaker = breaker or CircuitBreaker()
+        self.client: Optional[ModbusTcpClient] = None
+        self.status: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            'scans': 0,
+            'skipped_scans': 0,
+            'connects': 0,
+            'read_rows': 0
+        }
+
+    @property
+    def name(self) -> str:
+        return f"{self.device.get('name') or self.plc_id} ({self.device['ip_address']}:{self.device['port']})"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"plc-{self.plc_id}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """수집 중지 (대기 중이면 바로 깨움, 연결 시도 중이면 타임아웃까지 기다림)"""
+        self.scheduler.stop()
+        if self._thread:
+            self._thread.join(timeout)
+        self._close()
+
+    def _run(self):
+        while True:
+            scan_time = self.scheduler.wait()
+            if scan_time is None:
+                break
+            try:
+                self._poll(scan_time)
+            except Exception as e:
+                print(f"PLC {self.name} 수집 오류: {e}")
+                self._fail()
+
+    def _poll(self, scan_time: float):
+        # 차단 중이면 연결을 시도하지 않고 이번 주기는 건너뜀 (재시도는 백오프 후 1번만)
+        if not self.breaker.allow():
+            self.stats['skipped_scans'] += 1
+            return
+        items = self.items_func()
+        if not items:
+            return
+
+        client = self._connect()
+        if client is None:
+            self._fail()
+            return
+
+        rows = []
+        for item in items:
+            value = self.read_func(client, item)
+            if value is not None:
+                rows.append({'data_item_id': item['id'], 'value': value, 'quality': 'good'})
+        self.stats['scans'] += 1
+        if not rows:
+            # 연결은 되었지만 읽은 항목이 하나도 없음 → 연결 이상으로 보고 다음 시도 때 다시 연결
+            self._close()
+            self._fail()
+            return
+
+        self.stats['read_rows'] += len(rows)
+        self.sink(rows, scan_time)
+        if self.breaker.record_success() or self.status != DEVICE_ONLINE:
+            self._set_status(DEVICE_ONLINE)
+
+    def _connect(self) -> Optional[ModbusTcpClient]:
+        if self.client is not None:
+            try:
+                if self.client.is_socket_open():
+                    return self.client
+            except Exception:
+                pass
+            self._close()
+
+        client = ModbusTcpClient(self.device['ip_address'], port=self.device['port'])
+        try:
+            connected = client.connect()
+        except Exception as e:
+            print(f"PLC 연결 오류: {self.name}: {e}")
+            connected = False
+        if not connected:
+            client.close()
+            return None
+        self.client = client
+        self.stats['connects'] += 1
+        print(f"PLC 연결 성공: {self.name}")
+        return client
+
+    def _close(self):
+        if self.client is not None:
+            try:
+                self.client.close()
+            except Exception:
+                pass
+            self.client = None
+
+    def _fail(self):
+        probing = self.breaker.state == STATE_HALF_OPEN
+        if self.breaker.record_failure() or probing:
+            print(f"PLC 응답 없음: {self.name} - {self.breaker.retry_in():.1f}초 후 재시도")
+        if self.breaker.is_open and self.status != DEVICE_OFFLINE:
+            self._set_status(DEVICE_OFFLINE)
+
+    def _set_status(self, status: str):
+        self.status = status
+        last_connection = datetime.now() if status == DEVICE_ONLINE else None
+        try:
+            self.status_func(self.plc_id, status, last_connection)
+        except Exception as e:
+            print(f"PLC 상태 갱신 오류 ({self.name}): {e}")
+
+    def summary(self) -> str:
+        """통계 요약 문자열"""
+        breaker = self.breaker.stats
+        return (f"PLC {self.name}: 스캔 {self.stats['scans']}회, 차단으로 건너뜀 {self.stats['skipped_scans']}회, "
+                f"연결 {self.stats['connects']}회, 차단 {breaker['opened']}회, 시험 연결 {breaker['probes']}회, "
+                f"상태 {self.status or '-'}")
@@ -12,11 +12,17 @@ from datetime import datetime
 import socket
 import struct
 from pymodbus.client.sync import ModbusTcpClient
+from tag_registry import TagRegistry, TAG_VERSION_SQL
+from scan_scheduler import ScanScheduler
+from sqlite_storage import SQLiteStorage, DEFAULT_CHECKPOINT_INTERVAL
+from storage_queue import WriteBehindQueue, Scan, RejectedBatchError
+from device_poller import DevicePoller
+from circuit_breaker import Backoff
 
 class PLCDataCollector:
     """PLC 데이터 수집기 클래스"""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL):
         # 기본 데이터베이스 경로 설정
         if db_path is None:
             # 현재 디렉토리와 상위 디렉토리에서 데이터베이스 파일 찾기
@@ -42,10 +48,17 @@ class PLCDataCollector:
                 db_path = 'plc_data.db'
         
         self.db_path = db_path
+        self.storage = SQLiteStorage(db_path, checkpoint_interval=checkpoint_interval)  # 공유 연결 (WAL)
         self.running = False
         self.collection_thread = None
         self.collection_interval = 1000  # 밀리초
-        self.plc_clients = {}  # PLC별 클라이언트 저장
+        self.scan_scheduler = None  # 수집 시작 시 collection_interval로 생성 (장치 워커 구성 확인 주기)
+        self.pollers = {}  # PLC 장치 ID -> 장치별 수집 워커 (자체 연결/차단기)
+        self.pollers_generation = -1  # 워커를 구성한 항목 레지스트리 세대
+        self.error_backoff = Backoff()  # 관리 스레드 오류 시 재시도 대기
+        self.tag_registry = TagRegistry(self._get_data_items, self._query_tag_version)
+        # 모든 장치 워커가 공유하는 저장 큐 (DB 잠금 등으로 저장이 실패하면 DB 파일 옆 스풀에 보관)
+        self.storage_queue = WriteBehindQueue(self._write_scans, spool_dir=f"{db_path}-spool")
         
         # 데이터베이스 초기화
         self._init_database()
@@ -86,7 +99,7 @@ class PLCDataCollector:
     def _init_database(self):
         """데이터베이스 테이블 초기화"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.storage.transaction() as conn:
                 cursor = conn.cursor()
                 
                 # 기존 테이블 확인
@@ -105,11 +118,21 @@ class PLCDataCollector:
                             protocol TEXT DEFAULT 'modbus',
                             description TEXT,
                             is_active BOOLEAN DEFAULT TRUE,
+                            status TEXT DEFAULT 'offline',
+                            last_connection TIMESTAMP,
                             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                         )
                     ''')
                     print("plc_devices 테이블 생성됨")
+                else:
+                    # 장치 워커가 갱신하는 연결 상태 컬럼 (이전 버전에서 만든 테이블에는 없음)
+                    cursor.execute("PRAGMA table_info(plc_devices)")
+                    device_columns = {row[1] for row in cursor.fetchall()}
+                    if 'status' not in device_columns:
+                        cursor.execute("ALTER TABLE plc_devices ADD COLUMN status TEXT DEFAULT 'offline'")
+                    if 'last_connection' not in device_columns:
+                        cursor.execute("ALTER TABLE plc_devices ADD COLUMN last_connection TIMESTAMP")
                 
                 # plc_data_items 테이블이 없으면 생성
                 if 'plc_data_items' not in existing_tables:
@@ -154,8 +177,30 @@ class PLCDataCollector:
                 try:
                     cursor.execute('CREATE INDEX IF NOT EXISTS idx_plc_data_items_device ON plc_data_items(plc_device_id)')
                     cursor.execute('CREATE INDEX IF NOT EXISTS idx_plc_data_items_active ON plc_data_items(is_active)')
-                    cursor.execute('CREATE INDEX IF NOT EXISTS idx_real_time_data_item ON plc_real_time_data(data_item_id)')
+                    # 항목당 최신값 1건만 유지 (기존 중복 행 정리 후 유니크 인덱스 생성)
+                    cursor.execute('''
+                        DELETE FROM plc_real_time_data
+                        WHERE id NOT IN (SELECT MAX(id) FROM plc_real_time_data GROUP BY data_item_id)
+                    ''')
+                    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS uk_real_time_data_item ON plc_real_time_data(data_item_id)')
                     cursor.execute('CREATE INDEX IF NOT EXISTS idx_real_time_data_timestamp ON plc_real_time_data(timestamp)')
+                    # 수정 시 updated_at 갱신 (수집 항목 캐시의 변경 감지용)
+                    # plc_devices는 설정 컬럼이 바뀔 때만 갱신 (장치 워커가 쓰는 status/last_connection은
+                    # 설정 변경이 아니므로 항목을 다시 조회하지 않음). 이전 버전의 트리거는 다시 만듦
+                    triggers = {
+                        'plc_devices': 'UPDATE OF name, ip_address, port, protocol, description, is_active',
+                        'plc_data_items': 'UPDATE'
+                    }
+                    for table, event in triggers.items():
+                        cursor.execute(f'DROP TRIGGER IF EXISTS trg_{table}_updated_at')
+                        cursor.execute(f'''
+                            CREATE TRIGGER trg_{table}_updated_at
+                            AFTER {event} ON {table}
+                            FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+                            BEGIN
+                                UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+                            END
+                        ''')
                 except Exception as e:
                     print(f"인덱스 생성 오류 (무시됨): {e}")
                 
@@ -170,7 +215,7 @@ class PLCDataCollector:
     def test_database_connection(self):
         """데이터베이스 연결 및 테이블 구조 테스트"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.storage.transaction() as conn:
                 cursor = conn.cursor()
                 
                 # 테이블 목록 조회
@@ -207,7 +252,7 @@ class PLCDataCollector:
     def create_sample_data(self):
         """테스트용 샘플 데이터 생성"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.storage.transaction() as conn:
                 cursor = conn.cursor()
                 
                 # PLC 장치 샘플 데이터
@@ -256,7 +301,10 @@ class PLCDataCollector:
             print("데이터 수집이 이미 실행 중입니다.")
             return
         
+        self.scan_scheduler = ScanScheduler(self.collection_interval)
+        self.pollers_generation = -1
         self.running = True
+        self.storage_queue.start()
         
         if plc_device_id is not None:
             print(f"PLC 데이터 수집 시작 (장치 ID: {plc_device_id})")
@@ -273,93 +321,106 @@ class PLCDataCollector:
     def stop_collection(self):
         """데이터 수집 중지"""
         self.running = False
+        if self.scan_scheduler:
+            self.scan_scheduler.stop()
         if self.collection_thread:
             self.collection_thread.join()
-        print("PLC 데이터 수집 중지")
+        # 대기 중인 워커를 모두 깨운 뒤 종료 대기 (연결 시도 중인 워커만 타임아웃까지 기다림)
+        for poller in self.pollers.values():
+            poller.scheduler.stop()
+        for poller in self.pollers.values():
+            poller.stop()
+        self.storage_queue.stop()
+        stats = self.storage.stats
+        self.storage.close()
+        print(f"PLC 데이터 수집 중지 (저장 {stats['rows_written']}행/{stats['transactions']}트랜잭션, "
+              f"체크포인트 {stats['checkpoints']}회)")
+        for poller in self.pollers.values():
+            print(f"  {poller.summary()}")
+        self.pollers = {}
     
     def _collection_worker(self, plc_device_id: int):
-        """데이터 수집 워커 스레드"""
+        """장치 워커 관리 스레드 (수집은 장치별 워커가 각자 주기에 맞춰 실행)"""
         while self.running:
             try:
-                # 데이터 수집 실행
-                self._collect_plc_data(plc_device_id)
+                if self.scan_scheduler.wait() is None:
+                    break
                 
-                # 대기
-                time.sleep(self.collection_interval / 1000.0)
+                # 항목/장치 구성이 바뀌었으면 워커 추가/교체/중지
+                self._sync_pollers(plc_device_id)
+                self.error_backoff.reset()
                 
             except Exception as e:
-                print(f"데이터 수집 오류: {e}")
-                time.sleep(5)  # 오류 시 5초 대기
+                # 오류가 이어질수록 재시도 대기를 늘림 (중지 시 바로 깨어남)
+                delay = self.error_backoff.next()
+                print(f"데이터 수집 오류: {e} ({delay:g}초 후 재시도)")
+                if self.scan_scheduler.sleep(delay):
+                    break
     
-    def _collect_plc_data(self, plc_device_id: int = None):
-        """PLC에서 데이터 수집 (plc_id 상관없이 모든 항목 수집)"""
-        try:
-            # 데이터 항목 조회 (plc_id 상관없이)
-            data_items = self._get_data_items(plc_device_id)
-            if not data_items:
-                print(f"데이터 항목이 없습니다.")
-                return
-            
-            # PLC 장치별로 그룹화
-            plc_groups = {}
-            for item in data_items:
-                plc_id = item['plc_device_id']
-                if plc_id not in plc_groups:
-                    plc_groups[plc_id] = []
-                plc_groups[plc_id].append(item)
-            
-            # 각 PLC 장치별로 데이터 수집
-            all_collected_data = []
-            
-            for plc_id, items in plc_groups.items():
-                try:
-                    # PLC 장치 정보 조회
-                    plc_info = self._get_plc_device_info(plc_id)
-                    if not plc_info:
-                        print(f"PLC 장치 정보를 찾을 수 없습니다: {plc_id}")
-                        continue
-                    
-                    # PLC 연결
-                    plc_client = self._get_plc_client(plc_info)
-                    if not plc_client:
-                        print(f"PLC 연결 실패: {plc_info['ip_address']}")
-                        continue
-                    
-                    # 해당 PLC의 데이터 수집
-                    for item in items:
-                        try:
-                            value = self._read_plc_value(plc_client, item)
-                            if value is not None:
-                                all_collected_data.append({
-                                    'data_item_id': item['id'],
-                                    'value': value,
-                                    'quality': 'good'
-                                })
-                        except Exception as e:
-                            print(f"데이터 읽기 오류 ({item['item_name']}): {e}")
-                            # 오류 시 bad 품질로 저장
-                            all_collected_data.append({
-                                'data_item_id': item['id'],
-                                'value': 0,
-                                'quality': 'bad'
-                            })
-                
-                except Exception as e:
-                    print(f"PLC {plc_id} 데이터 수집 오류: {e}")
-                    continue
-            
-            # 데이터베이스에 저장
-            if all_collected_data:
-                self._save_real_time_data(all_collected_data)
-                print(f"{len(all_collected_data)}개 데이터 항목 수집 완료 (PLC 장치: {len(plc_groups)}개)")
-            
-        except Exception as e:
-            print(f"PLC 데이터 수집 오류: {e}")
+    def _sync_pollers(self, plc_device_id: int = None):
+        """PLC 장치마다 수집 워커 1개 실행 (plc_device_id가 None이면 항목이 있는 모든 장치)"""
+        # 데이터 항목 (구성이 바뀌었을 때만 다시 조회, plc_id 상관없이)
+        data_items = self.tag_registry.get()
+        if self.pollers_generation == self.tag_registry.generation:
+            return
+        if not data_items:
+            print(f"데이터 항목이 없습니다.")
+        
+        plc_ids = [plc_id for plc_id in self.tag_registry.by_device
+                   if plc_device_id is None or plc_id == plc_device_id]
+        for plc_id in [plc_id for plc_id in self.pollers if plc_id not in plc_ids]:
+            self.pollers.pop(plc_id).stop()
+        
+        resolved = True
+        for plc_id in plc_ids:
+            plc_info = self._get_plc_device_info(plc_id)
+            if not plc_info:
+                print(f"PLC 장치 정보를 찾을 수 없습니다: {plc_id}")
+                resolved = False
+                continue
+            poller = self.pollers.get(plc_id)
+            if poller is not None and poller.device == plc_info:
+                continue
+            if poller is not None:
+                poller.stop()
+            poller = DevicePoller(plc_info, lambda plc_id=plc_id: self.tag_registry.by_device.get(plc_id, ()),
+                                  self._read_plc_value, self.storage_queue.put, self._update_device_status,
+                                  self.collection_interval)
+            self.pollers[plc_id] = poller
+            poller.start()
+        
+        # 장치 정보를 찾지 못한 장치가 있으면 다음 주기에 다시 확인
+        if resolved:
+            self.pollers_generation = self.tag_registry.generation
+        print(f"PLC 장치 워커 {len(self.pollers)}개 실행 중 (항목 {len(data_items)}개)")
+    
+    def _write_scans(self, batch: List[Scan]) -> bool:
+        """저장 큐의 스캔들을 한 트랜잭션으로 저장 (저장 스레드에서 호출)
+
+        plc_real_time_data는 항목당 최신값만 유지하므로 같은 항목은 마지막 스캔의 값과 수집 시각만 남깁니다.
+        (묶이거나 늦게 저장되거나 스풀에서 재저장되는 스캔도 실제 수집 시각으로 저장됨)
+        """
+        latest = {}
+        for scan_time, rows in batch:
+            # CURRENT_TIMESTAMP와 같은 형식 (UTC)
+            timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(scan_time))
+            for row in rows:
+                latest[row['data_item_id']] = dict(row, timestamp=timestamp)
+        return self._save_real_time_data(list(latest.values()))
+    
+    def _update_device_status(self, plc_id: int, status: str, last_connection: Optional[datetime]):
+        """plc_devices의 연결 상태 갱신 (장치 워커에서 상태가 바뀔 때 호출)"""
+        with self.storage.transaction() as conn:
+            if last_connection is not None:
+                conn.execute('UPDATE plc_devices SET status = ?, last_connection = ? WHERE id = ?',
+                             (status, last_connection.strftime('%Y-%m-%d %H:%M:%S'), plc_id))
+            else:
+                conn.execute('UPDATE plc_devices SET status = ? WHERE id = ?', (status, plc_id))
     
     def _get_plc_device_info(self, plc_device_id: int) -> Optional[Dict]:
         """PLC 장치 정보 조회"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.storage.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT id, name, ip_address, port, protocol, description
@@ -383,11 +444,19 @@ class PLCDataCollector:
             print(f"PLC 장치 정보 조회 오류: {e}")
             return None
     
-    def _get_data_items(self, plc_device_id: int = None) -> List[Dict]:
-        """데이터 항목 조회 (plc_id 상관없이 모든 항목 조회)"""
+    def _query_tag_version(self) -> Optional[tuple]:
+        """수집 항목 구성 버전 조회 (행 수 + 마지막 수정 시각, 실패 시 None)"""
         try:
-            print("self.db_path : ",self.db_path)
-            with sqlite3.connect(self.db_path) as conn:
+            with self.storage.transaction() as conn:
+                return tuple(conn.execute(TAG_VERSION_SQL).fetchone())
+        except Exception as e:
+            print(f"데이터 항목 버전 조회 오류: {e}")
+            return None
+    
+    def _get_data_items(self, plc_device_id: int = None) -> Optional[List[Dict]]:
+        """데이터 항목 조회 (plc_id 상관없이 모든 항목 조회, 실패 시 None)"""
+        try:
+            with self.storage.transaction() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -399,7 +468,6 @@ class PLCDataCollector:
                 ''')
             
                 rows = cursor.fetchall()
-                print(" rows :",rows)
                 return [
                     {
                         'id': row[0],
@@ -416,36 +484,6 @@ class PLCDataCollector:
                 
         except Exception as e:
             print(f"데이터 항목 조회 오류: {e}")
-            return []
-    
-    def _get_plc_client(self, plc_info: Dict) -> Optional[ModbusTcpClient]:
-        """PLC 클라이언트 생성 및 연결"""
-        try:
-            # 기존 클라이언트 확인
-            client_key = f"{plc_info['ip_address']}:{plc_info['port']}"
-            
-            if client_key in self.plc_clients:
-                client = self.plc_clients[client_key]
-                # 연결 상태 확인
-                try:
-                    if client.is_socket_open():
-                        return client
-                except:
-                    pass
-            
-            # 새 클라이언트 생성
-            client = ModbusTcpClient(plc_info['ip_address'], port=plc_info['port'])
-            
-            if client.connect():
-                self.plc_clients[client_key] = client
-                print(f"PLC 연결 성공: {plc_info['ip_address']}:{plc_info['port']}")
-                return client
-            else:
-                print(f"PLC 연결 실패: {plc_info['ip_address']}:{plc_info['port']}")
-                return None
-                
-        except Exception as e:
-            print(f"PLC 클라이언트 생성 오류: {e}")
             return None
     
     def _read_plc_value(self, client: ModbusTcpClient, item: Dict) -> Optional[float]:
@@ -485,35 +523,34 @@ class PLCDataCollector:
             print(f"PLC 값 읽기 오류 ({item['item_name']}): {e}")
             return None
     
-    def _save_real_time_data(self, data_list: List[Dict]):
-        """실시간 데이터를 데이터베이스에 저장"""
+    def _save_real_time_data(self, data_list: List[Dict]) -> bool:
+        """실시간 데이터를 데이터베이스에 저장 (INSERT ... ON CONFLICT 업서트, 1트랜잭션, 주기적 체크포인트)
+
+        행에 timestamp(수집 시각)가 없으면 현재 시각으로 저장합니다.
+        데이터 오류(외래키 위반 등)는 RejectedBatchError로 알리고, 잠금 등 일시적인 오류는 False를 반환합니다.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # 기존 실시간 데이터 삭제 (최신 데이터만 유지)
-                for data in data_list:
-                    cursor.execute('''
-                        DELETE FROM plc_real_time_data 
-                        WHERE data_item_id = ?
-                    ''', (data['data_item_id'],))
-                
-                # 새 데이터 삽입
-                for data in data_list:
-                    cursor.execute('''
-                        INSERT INTO plc_real_time_data (data_item_id, value, quality)
-                        VALUES (?, ?, ?)
-                    ''', (data['data_item_id'], data['value'], data['quality']))
-                
-                conn.commit()
+            self.storage.executemany('''
+                INSERT INTO plc_real_time_data (data_item_id, value, quality, timestamp)
+                VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+                ON CONFLICT(data_item_id) DO UPDATE SET
+                    value = excluded.value,
+                    quality = excluded.quality,
+                    timestamp = excluded.timestamp
+            ''', [(data['data_item_id'], data['value'], data['quality'], data.get('timestamp'))
+                  for data in data_list])
+            return True
                 
         except Exception as e:
             print(f"실시간 데이터 저장 오류: {e}")
+            if isinstance(e, (sqlite3.IntegrityError, sqlite3.DataError)):
+                raise RejectedBatchError(str(e)) from e
+            return False
     
     def get_real_time_data(self, plc_device_id: int = None) -> List[Dict]:
         """실시간 데이터 조회 (plc_device_id가 None이면 모든 PLC 장치의 데이터 조회)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.storage.transaction() as conn:
                 cursor = conn.cursor()
                 
                 if plc_device_id is not None:
@@ -568,10 +605,12 @@ def main():
     parser.add_argument('--interval', type=int, default=1000, help='수집 주기 (밀리초, 기본값: 1000)')
     parser.add_argument('--test-db', action='store_true', help='데이터베이스 연결 및 테이블 구조 테스트')
     parser.add_argument('--create-sample', action='store_true', help='테스트용 샘플 데이터 생성')
+    parser.add_argument('--checkpoint-interval', type=float, default=DEFAULT_CHECKPOINT_INTERVAL,
+                       help=f'WAL 체크포인트 주기 (초, 0이면 SQLite 자동 체크포인트만 사용, 기본값: {DEFAULT_CHECKPOINT_INTERVAL:g})')
     
     args = parser.parse_args()
     
-    collector = PLCDataCollector()
+    collector = PLCDataCollector(checkpoint_interval=args.checkpoint_interval)
     collector.collection_interval = args.interval
     
     if args.test_db:
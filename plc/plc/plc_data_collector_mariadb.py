@@ -4,6 +4,7 @@
 PLC에서 실시간으로 데이터를 수집하여 MariaDB에 저장하는 프로그램
 """
 
+import os
 import time
 import threading
 from typing import List, Dict, Optional
@@ -11,7 +12,13 @@ from datetime import datetime
 import socket
 import struct
 from pymodbus.client.sync import ModbusTcpClient
-from database_config import DatabaseConfig
+from database_config import DatabaseConfig, DATA_ERRORS
+from tag_registry import TagRegistry, TAG_VERSION_SQL
+from scan_scheduler import ScanScheduler
+from storage_queue import WriteBehindQueue, Scan, RejectedBatchError
+from storage_spool import DEFAULT_SPOOL_DIR
+from device_poller import DevicePoller
+from circuit_breaker import Backoff
 import pymysql
 
 class PLCDataCollector:
@@ -21,22 +28,28 @@ class PLCDataCollector:
         self.running = False
         self.collection_thread = None
         self.collection_interval = 1000  # 밀리초
-        self.plc_clients = {}  # PLC별 클라이언트 저장
+        self.scan_scheduler = None  # 수집 시작 시 collection_interval로 생성 (장치 워커 구성 확인 주기)
+        self.poller = None  # 장치 수집 워커 (자체 PLC 연결/차단기)
+        self.poller_generation = -1  # 워커를 구성한 항목 레지스트리 세대
+        self.error_backoff = Backoff()  # 관리 스레드 오류/DB 연결 실패 시 재시도 대기
         self.connection = None
+        self.tag_registry = None  # 수집 시작 시 장치별로 생성
+        # 장치 워커가 넣은 스캔을 저장 스레드가 모아서 저장 (DB 장애 시 디스크 스풀에 보관)
+        self.storage_queue = WriteBehindQueue(self._write_scans, spool_dir=os.path.join(DEFAULT_SPOOL_DIR, 'collector'))
     
     def connect_database(self) -> bool:
-        """MariaDB 연결"""
+        """MariaDB 연결 (연결 풀에서 빌림)"""
         try:
-            self.connection = DatabaseConfig.create_connection()
+            self.connection = DatabaseConfig.acquire_connection()
             return self.connection is not None
         except Exception as e:
             print(f"데이터베이스 연결 오류: {e}")
             return False
     
     def disconnect_database(self):
-        """데이터베이스 연결 해제"""
+        """데이터베이스 연결 반납"""
         if self.connection:
-            self.connection.close()
+            DatabaseConfig.release_connection(self.connection)
             self.connection = None
     
     def start_collection(self, plc_device_id: int = 1):
@@ -49,8 +62,16 @@ class PLCDataCollector:
         if not self.connect_database():
             print("데이터베이스 연결 실패")
             return
+        if not DatabaseConfig.migrate_schema(self.connection):
+            print("데이터베이스 스키마 마이그레이션 실패 - 데이터 수집을 시작하지 않습니다")
+            self.disconnect_database()
+            return
         
+        self.tag_registry = TagRegistry(lambda: self._get_data_items(plc_device_id), self._query_tag_version)
+        self.poller_generation = -1
+        self.scan_scheduler = ScanScheduler(self.collection_interval)
         self.running = True
+        self.storage_queue.start()
         self.collection_thread = threading.Thread(
             target=self._collection_worker,
             args=(plc_device_id,),
@@ -62,73 +83,112 @@ class PLCDataCollector:
     def stop_collection(self):
         """데이터 수집 중지"""
         self.running = False
+        if self.scan_scheduler:
+            self.scan_scheduler.stop()
         if self.collection_thread:
             self.collection_thread.join()
+        if self.poller:
+            self.poller.stop()
+        self.storage_queue.stop()
         self.disconnect_database()
         print("PLC 데이터 수집 중지")
+        if self.poller:
+            print(f"  {self.poller.summary()}")
+            self.poller = None
     
     def _collection_worker(self, plc_device_id: int):
-        """데이터 수집 워커 스레드"""
+        """장치 워커 관리 스레드 (수집은 장치 워커가 자체 주기에 맞춰 실행)"""
         while self.running:
             try:
-                # 데이터 수집 실행
-                self._collect_plc_data(plc_device_id)
+                if self.scan_scheduler.wait() is None:
+                    break
+                
+                # 회차마다 연결 풀에서 연결을 빌려 사용 (빌릴 때 ping으로 확인, 끊긴 연결은 새로 연결)
+                if self.connection is None:
+                    self.connection = DatabaseConfig.acquire_connection()
+                if self.connection is None:
+                    delay = self.error_backoff.next()
+                    print(f"데이터베이스 연결 실패 ({delay:g}초 후 재시도)")
+                    if self.scan_scheduler.sleep(delay):
+                        break
+                    continue
                 
-                # 대기
-                time.sleep(self.collection_interval / 1000.0)
+                # 항목/장치 구성이 바뀌었으면 워커 시작/교체
+                try:
+                    self._sync_poller(plc_device_id)
+                finally:
+                    self.disconnect_database()
+                self.error_backoff.reset()
                 
             except Exception as e:
-                print(f"데이터 수집 오류: {e}")
-                time.sleep(5)  # 오류 시 5초 대기
+                # 오류가 이어질수록 재시도 대기를 늘림 (중지 시 바로 깨어남)
+                delay = self.error_backoff.next()
+                print(f"데이터 수집 오류: {e} ({delay:g}초 후 재시도)")
+                if self.scan_scheduler.sleep(delay):
+                    break
+    
+    def _sync_poller(self, plc_device_id: int):
+        """장치 수집 워커 시작 (장치 정보가 바뀌면 새 연결로 교체)"""
+        # 데이터 항목 (구성이 바뀌었을 때만 다시 조회)
+        data_items = self.tag_registry.get()
+        if self.poller_generation == self.tag_registry.generation:
+            return
+        
+        plc_info = self._get_plc_device_info(plc_device_id)
+        if not plc_info:
+            print(f"PLC 장치 정보를 찾을 수 없습니다: {plc_device_id}")
+            return
+        if not data_items:
+            print(f"데이터 항목이 없습니다: {plc_device_id}")
+        self.poller_generation = self.tag_registry.generation
+        
+        if self.poller is not None and self.poller.device == plc_info:
+            return
+        if self.poller is not None:
+            self.poller.stop()
+        self.poller = DevicePoller(plc_info, lambda: self.tag_registry.items, self._read_plc_value,
+                                   self.storage_queue.put, self._update_device_status, self.collection_interval)
+        self.poller.start()
     
-    def _collect_plc_data(self, plc_device_id: int):
-        """PLC에서 데이터 수집"""
+    def _write_scans(self, batch: List[Scan]) -> bool:
+        """저장 큐의 스캔들을 한 트랜잭션으로 저장 (저장 스레드에서 연결 풀의 연결을 빌려 사용)
+        
+        plc_real_time_data는 항목당 최신값만 유지하므로 같은 항목은 마지막 스캔의 값과 수집 시각만 남깁니다.
+        (묶이거나 늦게 저장되거나 스풀에서 재저장되는 스캔도 실제 수집 시각으로 저장됨)
+        """
+        latest = {}
+        for scan_time, rows in batch:
+            timestamp = datetime.fromtimestamp(scan_time)
+            for row in rows:
+                latest[row['data_item_id']] = dict(row, timestamp=timestamp)
+        
+        connection = DatabaseConfig.acquire_connection()
+        if connection is None:
+            return False
+        success = self._save_real_time_data(list(latest.values()), connection)
+        DatabaseConfig.release_connection(connection, discard=not success)
+        return success
+    
+    def _update_device_status(self, plc_id: int, status: str, last_connection: Optional[datetime]):
+        """plc_devices의 연결 상태 갱신 (장치 워커에서 상태가 바뀔 때 호출)
+        
+        updated_at은 그대로 두어 수집 항목 캐시가 구성 변경으로 보지 않게 함
+        """
+        connection = DatabaseConfig.acquire_connection()
+        if connection is None:
+            return
         try:
-            # PLC 장치 정보 조회
-            plc_info = self._get_plc_device_info(plc_device_id)
-            if not plc_info:
-                print(f"PLC 장치 정보를 찾을 수 없습니다: {plc_device_id}")
-                return
-            
-            # 데이터 항목 조회
-            data_items = self._get_data_items(plc_device_id)
-            if not data_items:
-                print(f"데이터 항목이 없습니다: {plc_device_id}")
-                return
-            
-            # PLC 연결
-            plc_client = self._get_plc_client(plc_info)
-            if not plc_client:
-                print(f"PLC 연결 실패: {plc_info['ip_address']}")
-                return
-            
-            # 데이터 수집 및 저장
-            collected_data = []
-            for item in data_items:
-                try:
-                    value = self._read_plc_value(plc_client, item)
-                    if value is not None:
-                        collected_data.append({
-                            'data_item_id': item['id'],
-                            'value': value,
-                            'quality': 'good'
-                        })
-                except Exception as e:
-                    print(f"데이터 읽기 오류 ({item['item_name']}): {e}")
-                    # 오류 시 bad 품질로 저장
-                    collected_data.append({
-                        'data_item_id': item['id'],
-                        'value': 0,
-                        'quality': 'bad'
-                    })
-            
-            # 데이터베이스에 저장
-            if collected_data:
-                self._save_real_time_data(collected_data)
-                print(f"{len(collected_data)}개 데이터 항목 수집 완료")
-            
+            with connection.cursor() as cursor:
+                cursor.execute('''
+                    UPDATE plc_devices
+                    SET status = %s, last_connection = COALESCE(%s, last_connection), updated_at = updated_at
+                    WHERE id = %s
+                ''', (status, last_connection, plc_id))
+            connection.commit()
+            DatabaseConfig.release_connection(connection)
         except Exception as e:
-            print(f"PLC 데이터 수집 오류: {e}")
+            print(f"PLC 상태 갱신 오류: {e}")
+            DatabaseConfig.release_connection(connection, discard=True)
     
     def _get_plc_device_info(self, plc_device_id: int) -> Optional[Dict]:
         """PLC 장치 정보 조회"""
@@ -146,8 +206,18 @@ class PLCDataCollector:
             print(f"PLC 장치 정보 조회 오류: {e}")
             return None
     
-    def _get_data_items(self, plc_device_id: int) -> List[Dict]:
-        """데이터 항목 조회"""
+    def _query_tag_version(self) -> Optional[tuple]:
+        """수집 항목 구성 버전 조회 (행 수 + 마지막 수정 시각, 실패 시 None)"""
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(TAG_VERSION_SQL)
+                return tuple(cursor.fetchone())
+        except Exception as e:
+            print(f"데이터 항목 버전 조회 오류: {e}")
+            return None
+    
+    def _get_data_items(self, plc_device_id: int) -> Optional[List[Dict]]:
+        """데이터 항목 조회 (실패 시 None)"""
         try:
             with self.connection.cursor(pymysql.cursors.DictCursor) as cursor:
                 cursor.execute('''
@@ -162,36 +232,6 @@ class PLCDataCollector:
                 
         except Exception as e:
             print(f"데이터 항목 조회 오류: {e}")
-            return []
-    
-    def _get_plc_client(self, plc_info: Dict) -> Optional[ModbusTcpClient]:
-        """PLC 클라이언트 생성 및 연결"""
-        try:
-            # 기존 클라이언트 확인
-            client_key = f"{plc_info['ip_address']}:{plc_info['port']}"
-            
-            if client_key in self.plc_clients:
-                client = self.plc_clients[client_key]
-                # 연결 상태 확인
-                try:
-                    if client.is_socket_open():
-                        return client
-                except:
-                    pass
-            
-            # 새 클라이언트 생성
-            client = ModbusTcpClient(plc_info['ip_address'], port=plc_info['port'])
-            
-            if client.connect():
-                self.plc_clients[client_key] = client
-                print(f"PLC 연결 성공: {plc_info['ip_address']}:{plc_info['port']}")
-                return client
-            else:
-                print(f"PLC 연결 실패: {plc_info['ip_address']}:{plc_info['port']}")
-                return None
-                
-        except Exception as e:
-            print(f"PLC 클라이언트 생성 오류: {e}")
             return None
     
     def _read_plc_value(self, client: ModbusTcpClient, item: Dict) -> Optional[float]:
@@ -231,30 +271,38 @@ class PLCDataCollector:
             print(f"PLC 값 읽기 오류 ({item['item_name']}): {e}")
             return None
     
-    def _save_real_time_data(self, data_list: List[Dict]):
-        """실시간 데이터를 데이터베이스에 저장"""
+    def _save_real_time_data(self, data_list: List[Dict], connection=None) -> bool:
+        """실시간 데이터를 데이터베이스에 저장 (다중 행 업서트 1문장)
+        
+        행에 timestamp(수집 시각)가 없으면 현재 시각으로 저장합니다.
+        데이터 오류(외래키 위반 등)는 RejectedBatchError로 알리고, 연결 오류 등은 False를 반환합니다.
+        """
+        connection = connection or self.connection
         try:
-            with self.connection.cursor() as cursor:
-                # 기존 실시간 데이터 삭제 (최신 데이터만 유지)
-                for data in data_list:
-                    cursor.execute('''
-                        DELETE FROM plc_real_time_data 
-                        WHERE data_item_id = %s
-                    ''', (data['data_item_id'],))
-                
-                # 새 데이터 삽입
-                for data in data_list:
-                    cursor.execute('''
-                        INSERT INTO plc_real_time_data (data_item_id, value, quality)
-                        VALUES (%s, %s, %s)
-                    ''', (data['data_item_id'], data['value'], data['quality']))
-                
-                self.connection.commit()
+            with connection.cursor() as cursor:
+                now = datetime.now()
+                cursor.executemany('''
+                    INSERT INTO plc_real_time_data (data_item_id, value, quality, timestamp)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        value = VALUES(value),
+                        quality = VALUES(quality),
+                        timestamp = VALUES(timestamp)
+                ''', [(data['data_item_id'], data['value'], data['quality'], data.get('timestamp') or now)
+                      for data in data_list])
                 
+                connection.commit()
+                return True
+
         except Exception as e:
             print(f"실시간 데이터 저장 오류: {e}")
-            if self.connection:
-                self.connection.rollback()
+            try:
+                connection.rollback()
+            except Exception:
+                pass
+            if isinstance(e, DATA_ERRORS):
+                raise RejectedBatchError(str(e)) from e
+            return False
     
     def get_real_time_data(self, plc_device_id: int = 1) -> List[Dict]:
         """실시간 데이터 조회"""
@@ -1,5 +1,7 @@
 import socket, struct
 from typing import Tuple, List
+from xgt_codec import decode_values
+from xgt_session import XGTFrameReader
 
 XGT_IP, XGT_PORT = "192.168.1.2", 2004
 SOCK_TIMEOUT = 3.0
@@ -64,20 +66,18 @@ def recv_exact(sock: socket.socket, n: int) -> bytes:
         buf += chunk
     return buf
 
-def recv_xgt_response(sock: socket.socket) -> bytes:
-    header = recv_exact(sock, 20)
-    length = struct.unpack_from("<H", header, 16)[0]
-    if length == 0:
-        pos = header[18]; csum = header[19]
+def recv_xgt_response(sock: socket.socket, reader: XGTFrameReader = None) -> bytes:
+    frame = (reader or XGTFrameReader(sock)).read_frame()
+    if len(frame) == 20:
+        pos = frame[18]; csum = frame[19]
         raise RuntimeError(f"Header-only response (length=0). position=0x{pos:02X}, checksum=0x{csum:02X}")
-    payload = recv_exact(sock, length)
-    return header + payload
+    return frame
 
-def parse_read_variable_response(frame: bytes):
-    payload = frame[20:]
+def parse_read_variable_response(frame: bytes, signed: bool = False, as_float: bool = False):
+    payload = memoryview(frame)[20:]
     p = 0
 
-    cmd = payload[p:p+2]; p += 2
+    cmd = bytes(payload[p:p+2]); p += 2
     if cmd != b'\x55\x00':
         raise RuntimeError(f"Unexpected Command in response: {cmd.hex()}")
 
@@ -97,11 +97,8 @@ def parse_read_variable_response(frame: bytes):
     if err != 0:
         return err, []
 
-    unit = {0x0000:1, 0x0001:1, 0x0002:2, 0x0003:4, 0x0004:8}.get(dtype, 1)
-    vals = []
-    for _ in range(cnt):
-        raw = payload[p:p+unit]; p += unit
-        vals.append(int.from_bytes(raw, "little"))
+    unit = UNIT_SIZE.get(dtype, 1)
+    vals = decode_values(payload, p, min(cnt, (len(payload) - p) // unit), unit=unit, signed=signed, as_float=as_float)
     return 0, vals
 
 
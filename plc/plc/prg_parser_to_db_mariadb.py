@@ -147,18 +147,18 @@ class MariaDBManager:
         self.connection = None
     
     def connect(self) -> bool:
-        """데이터베이스 연결"""
+        """데이터베이스 연결 (연결 풀에서 빌림)"""
         try:
-            self.connection = DatabaseConfig.create_connection()
+            self.connection = DatabaseConfig.acquire_connection()
             return self.connection is not None
         except Exception as e:
             print(f"데이터베이스 연결 오류: {e}")
             return False
     
     def disconnect(self):
-        """데이터베이스 연결 해제"""
+        """데이터베이스 연결 반납"""
         if self.connection:
-            self.connection.close()
+            DatabaseConfig.release_connection(self.connection)
             self.connection = None
     
     def save_parsed_items(self, data_items: List[Dict], plc_device_id: int = 1) -> bool:
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XGT 읽기 계획 생성기 - 메모리 영역별 그룹화 및 갭 허용 범위 병합
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+# PLC 데이터 타입 → XGT 메모리 영역 문자
+XGT_AREA_MAP = {
+    'M': 'M',
+    'D': 'D',
+    'Y': 'Q',
+    'X': 'I',
+    'T': 'T',
+    'C': 'C'
+}
+
+# 연속 읽기 1프레임 최대 WORD 수 (1400 bytes)
+DEFAULT_MAX_WORDS = 700
+
+# 병합을 위해 함께 읽을 수 있는 최대 빈 WORD 수
+DEFAULT_GAP_BUDGET = 16
+
+# 음성 캐시에 등록된 주소를 계획에서 제외하는 시간 (초) - 지나면 다시 읽어 봄 (PLC 프로그램 변경 대비)
+DEFAULT_INVALID_TTL = 3600.0
+
+
+def xgt_area(item_type: str) -> str:
+    """PLC 데이터 타입을 XGT 메모리 영역 문자로 변환 (기본값: D)"""
+    return XGT_AREA_MAP.get(item_type, 'D')
+
+
+class InvalidAddressCache:
+    """PLC가 오류로 응답한 주소 목록 (음성 캐시)
+
+    같은 PLC의 읽기 계획기들이 공유하며, 등록된 (영역, WORD 주소)는 계획에서 제외되어
+    다음 스캔부터 배치 읽기 범위 전체를 실패시키지 않습니다. ttl초가 지나면 만료되어 다시 읽어 봅니다.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_INVALID_TTL):
+        self.ttl = ttl
+        self._expires: Dict[Tuple[str, int], float] = {}  # (영역, WORD 주소) -> 만료 시각 (monotonic)
+        self._next_expiry = float('inf')
+        self.version = 0  # 목록이 바뀔 때마다 증가 (계획기가 캐시된 계획을 다시 만들지 판단)
+
+    def add(self, area: str, address: int, now: Optional[float] = None) -> bool:
+        """주소 등록 (새로 등록되었으면 True)"""
+        key = (area, address)
+        if key in self._expires:
+            return False
+        now = now if now is not None else time.monotonic()
+        self._expires[key] = now + self.ttl
+        self._next_expiry = min(self._next_expiry, now + self.ttl)
+        self.version += 1
+        return True
+
+    def expire(self, now: Optional[float] = None) -> bool:
+        """만료된 주소 제거 (제거했으면 True)"""
+        now = now if now is not None else time.monotonic()
+        if now < self._next_expiry:
+            return False
+        self._expires = {key: expires for key, expires in self._expires.items() if expires > now}
+        self._next_expiry = min(self._expires.values(), default=float('inf'))
+        self.version += 1
+        return True
+
+    def addresses(self) -> List[Tuple[str, int]]:
+        return sorted(self._expires)
+
+    def __contains__(self, key: Tuple[str, int]) -> bool:
+        return key in self._expires
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+class ReadPlanner:
+    """태그 목록을 XGT 읽기 배치 목록으로 변환하는 계획기
+
+    - 메모리 영역(M/D/Q/I/T/C)별로 분리하여 다른 영역이 한 배치에 섞이지 않음
+    - 주소 사이의 빈 WORD 수가 gap_budget 이하이면 빈 구간까지 함께 읽도록 병합
+    - 하나의 배치가 max_words(1프레임 한도)를 넘지 않도록 분할
+    - 태그 구성(id, 타입, 주소)이 바뀌기 전까지 계획을 캐시하여 재사용
+      (TagRegistry가 넘겨주는 항목 튜플처럼 같은 목록 객체면 비교 없이 바로 재사용)
+    - invalid(음성 캐시)에 등록된 주소의 항목은 배치에서 빼고 excluded에 담음
+      (음성 캐시가 바뀌면 계획을 다시 만듦)
+    """
+
+    def __init__(self, gap_budget: int = DEFAULT_GAP_BUDGET, max_words: int = DEFAULT_MAX_WORDS,
+                 invalid: Optional[InvalidAddressCache] = None):
+        self.gap_budget = max(0, gap_budget)
+        self.max_words = max(1, max_words)
+        self.invalid = invalid
+        self.excluded: List[Dict] = []  # 마지막 계획에서 제외된 항목 (읽지 않고 bad 품질로 처리)
+        self._cached_key: Optional[Tuple] = None
+        self._cached_items = None
+        self._cached_version = 0
+        self._cached_plan: List[List[Dict]] = []
+        self.stats = {
+            'plans_built': 0,
+            'cache_hits': 0
+        }
+
+    def invalidate(self):
+        """캐시된 계획 폐기"""
+        self._cached_key = None
+        self._cached_items = None
+        self._cached_plan = []
+        self.excluded = []
+
+    def plan(self, items: List[Dict]) -> List[List[Dict]]:
+        """태그 목록에 대한 읽기 배치 목록 반환
+
+        각 배치는 같은 메모리 영역의 항목들을 주소 순으로 담으며,
+        배치 범위는 첫 항목 주소 ~ 마지막 항목 주소입니다.
+        주소 또는 타입 정보가 없는 항목은 단독 배치로 반환합니다.
+        """
+        version = self._invalid_version()
+        if isinstance(items, tuple) and items is self._cached_items and version == self._cached_version:
+            self.stats['cache_hits'] += 1
+            return self._cached_plan
+
+        key = tuple((item.get('id'), item.get('item_type'), item.get('modbus_address')) for item in items)
+        if key == self._cached_key and version == self._cached_version:
+            self._cached_items = items
+            self.stats['cache_hits'] += 1
+            return self._cached_plan
+
+        self._cached_plan = self._build_plan(items)
+        self._cached_key = key
+        self._cached_items = items
+        self._cached_version = version
+        self.stats['plans_built'] += 1
+        return self._cached_plan
+
+    def _invalid_version(self) -> int:
+        if self.invalid is None:
+            return 0
+        self.invalid.expire()
+        return self.invalid.version
+
+    def _build_plan(self, items: List[Dict]) -> List[List[Dict]]:
+        batches = []
+        excluded = []
+
+        # 메모리 영역별 분리
+        areas: Dict[str, List[Dict]] = {}
+        for item in items:
+            if item.get('modbus_address') is None or item.get('item_type') is None:
+                batches.append([item])
+                continue
+            areas.setdefault(xgt_area(item['item_type']), []).append(item)
+
+        for area in sorted(areas):
+            sorted_items = sorted(areas[area], key=lambda x: x['modbus_address'])
+
+            current_batch = []
+            start_address = 0
+            last_address = 0
+            for item in sorted_items:
+                address = item['modbus_address']
+                if self.invalid is not None and (area, address) in self.invalid:
+                    # 음성 캐시에 있는 주소는 읽지 않고, 그 주소를 사이에 둔 항목끼리도 병합하지 않음
+                    excluded.append(item)
+                    if current_batch:
+                        batches.append(current_batch)
+                        current_batch = []
+                    continue
+                if current_batch:
+                    gap = address - last_address - 1
+                    span = address - start_address + 1
+                    if gap <= self.gap_budget and span <= self.max_words:
+                        current_batch.append(item)
+                        last_address = max(last_address, address)
+                        continue
+                    batches.append(current_batch)
+                current_batch = [item]
+                start_address = address
+                last_address = address
+
+            if current_batch:
+                batches.append(current_batch)
+
+        self.excluded = excluded
+        return batches
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+1분/1시간 집계(rollup) - 수집 스캔 스트림에서 min/max/avg/count/last를 누적하여 저장
+"""
+
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# 집계 단위(초) → 테이블
+ROLLUP_TABLES = {
+    60: 'plc_data_rollup_1m',
+    3600: 'plc_data_rollup_1h'
+}
+RAW_TABLE = 'plc_data_history'
+
+# 집계 구간 종료 후 이만큼 지나면 닫힌 구간으로 보고 저장 (초)
+DEFAULT_CLOSE_DELAY = 2.0
+
+# 부분 집계끼리 병합하는 업서트 (재시작/스풀 재저장으로 같은 구간이 여러 번 저장되어도 누적)
+# last_value는 마지막 값의 수집 시각(last_ts)이 더 늦은 쪽을 유지 (last_ts보다 먼저 갱신해야 함)
+UPSERT_SQL = '''
+    INSERT INTO {table} (data_item_id, timestamp, min_value, max_value, sum_value, sample_count,
+                         last_value, last_ts)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        min_value = LEAST(min_value, VALUES(min_value)),
+        max_value = GREATEST(max_value, VALUES(max_value)),
+        sum_value = sum_value + VALUES(sum_value),
+        sample_count = sample_count + VALUES(sample_count),
+        last_value = IF(last_ts IS NULL OR VALUES(last_ts) >= last_ts, VALUES(last_value), last_value),
+        last_ts = IF(last_ts IS NULL OR VALUES(last_ts) >= last_ts, VALUES(last_ts), last_ts)
+'''
+
+
+class RollupAggregator:
+    """집계 단위 1개(예: 1분)의 구간별 누적기
+
+    항목/구간마다 [min, max, sum, count, last, last의 수집 시각]을 메모리에 누적하고,
+    구간이 닫히면 take_closed()로 꺼내 UPSERT_SQL로 저장합니다.
+    품질이 good인 값만 집계하며, 스캔이 순서대로 오지 않아도(스풀 재저장 등)
+    last는 수집 시각이 가장 늦은 값을 유지합니다.
+    """
+
+    def __init__(self, bucket_seconds: int, close_delay: float = DEFAULT_CLOSE_DELAY):
+        self.bucket_seconds = bucket_seconds
+        self.table = ROLLUP_TABLES[bucket_seconds]
+        self.close_delay = close_delay
+        self._buckets: Dict[Tuple[int, int], list] = {}  # (data_item_id, 구간 시작 epoch) -> 누적값
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def add(self, scan_time: float, rows: List[Dict]):
+        """스캔 1건 누적"""
+        bucket = int(scan_time // self.bucket_seconds) * self.bucket_seconds
+        buckets = self._buckets
+        for row in rows:
+            if row['quality'] != 'good':
+                continue
+            value = row['value']
+            key = (row['data_item_id'], bucket)
+            acc = buckets.get(key)
+            if acc is None:
+                buckets[key] = [value, value, value, 1, value, scan_time]
+            else:
+                if value < acc[0]:
+                    acc[0] = value
+                if value > acc[1]:
+                    acc[1] = value
+                acc[2] += value
+                acc[3] += 1
+                if scan_time >= acc[5]:
+                    acc[4] = value
+                    acc[5] = scan_time
+
+    def take_closed(self, now: Optional[float] = None, force: bool = False) -> List[tuple]:
+        """닫힌 구간(force=True면 전체)을 꺼내 저장용 행 목록으로 반환"""
+        if force:
+            closed = list(self._buckets)
+        else:
+            limit = (now if now is not None else time.time()) - self.close_delay - self.bucket_seconds
+            closed = [key for key in self._buckets if key[1] <= limit]
+        rows = []
+        for key in closed:
+            acc = self._buckets.pop(key)
+            rows.append((key[0], datetime.fromtimestamp(key[1]), acc[0], acc[1], acc[2], acc[3],
+                         acc[4], datetime.fromtimestamp(acc[5])))
+        return rows
+
+    def restore(self, rows: List[tuple]):
+        """저장 실패한 행을 다시 누적기로 되돌림 (다음 저장 때 재시도)"""
+        for item_id, timestamp, min_value, max_value, sum_value, count, last_value, last_ts in rows:
+            key = (item_id, int(timestamp.timestamp()))
+            last_time = last_ts.timestamp()
+            acc = self._buckets.get(key)
+            if acc is None:
+                self._buckets[key] = [min_value, max_value, sum_value, count, last_value, last_time]
+            else:
+                acc[0] = min(acc[0], min_value)
+                acc[1] = max(acc[1], max_value)
+                acc[2] += sum_value
+                acc[3] += count
+                if last_time > acc[5]:
+                    acc[4] = last_value
+                    acc[5] = last_time
+
+
+def select_source_table(resolution_seconds: int) -> Tuple[str, int]:
+    """요청 해상도를 만족하는 가장 작은 테이블 선택 (테이블, 집계 단위 초)
+
+    집계 단위가 요청 해상도 이하인 테이블 중 가장 큰 단위를 사용하고,
+    1분보다 촘촘한 해상도는 원본 이력(plc_data_history)을 사용합니다.
+    """
+    for bucket_seconds in sorted(ROLLUP_TABLES, reverse=True):
+        if bucket_seconds <= resolution_seconds:
+            return ROLLUP_TABLES[bucket_seconds], bucket_seconds
+    return RAW_TABLE, 0
+
+
+def query_trend(connection, data_item_id: int, start: datetime, end: datetime,
+                resolution_seconds: int) -> List[Dict]:
+    """항목 추세 조회 - 해상도에 맞는 테이블에서 (timestamp, min, max, avg, count, last) 조회"""
+    table, _ = select_source_table(resolution_seconds)
+    if table == RAW_TABLE:
+        sql = f'''
+            SELECT timestamp, value AS min_value, value AS max_value, value AS avg_value,
+                   1 AS sample_count, value AS last_value
+            FROM {RAW_TABLE}
+            WHERE data_item_id = %s AND timestamp >= %s AND timestamp < %s
+            ORDER BY timestamp
+        '''
+    else:
+        sql = f'''
+            SELECT timestamp, min_value, max_value, avg_value, sample_count, last_value
+            FROM {table}
+            WHERE data_item_id = %s AND timestamp >= %s AND timestamp < %s
+            ORDER BY timestamp
+        '''
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (data_item_id, start, end))
+        columns = ['timestamp', 'min_value', 'max_value', 'avg_value', 'sample_count', 'last_value']
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
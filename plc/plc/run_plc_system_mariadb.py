@@ -10,6 +10,7 @@ import time
 import subprocess
 import threading
 from datetime import datetime
+from database_config import DatabaseConfig
 
 def print_banner():
     """시스템 배너 출력"""
@@ -146,14 +147,12 @@ def check_system_status():
     """시스템 상태 확인"""
     print("\n=== 시스템 상태 확인 ===")
     
-    # MariaDB 연결 테스트
+    # MariaDB 연결 테스트 (연결 풀에서 빌린 연결을 4번 항목까지 사용)
     print("1. MariaDB 연결 상태:")
+    connection = None
     try:
-        result = subprocess.run([
-            sys.executable, 'database_config.py'
-        ], capture_output=True, text=True)
-        
-        if result.returncode == 0:
+        connection = DatabaseConfig.acquire_connection(timeout=10)
+        if connection:
             print("   ✅ MariaDB 연결 성공")
         else:
             print("   ❌ MariaDB 연결 실패")
@@ -187,26 +186,29 @@ def check_system_status():
     
     # 데이터베이스 내용 확인 (간단한 테스트)
     print("\n4. 데이터베이스 내용:")
-    try:
-        result = subprocess.run([
-            sys.executable, 'prg_parser_to_db_mariadb.py', '--list', '1'
-        ], capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')
-            if len(lines) > 3:  # 헤더 + 데이터가 있는 경우
+    if connection is None:
+        print("   ❌ 데이터베이스 조회 실패")
+    else:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('''
+                    SELECT COUNT(*) FROM plc_data_items
+                    WHERE plc_device_id = %s AND is_active = TRUE
+                ''', (1,))
+                count = cursor.fetchone()[0]
+            if count:
                 print("   ✅ 데이터 항목 존재")
-                # 마지막 줄에서 항목 수 추출
-                for line in lines:
-                    if line.startswith('총'):
-                        print(f"      {line}")
-                        break
+                print(f"      총 {count}개 항목")
             else:
                 print("   ⚠️ 데이터 항목 없음")
-        else:
-            print("   ❌ 데이터베이스 조회 실패")
-    except:
-        print("   ❌ 데이터베이스 상태 확인 실패")
+            DatabaseConfig.release_connection(connection)
+        except Exception:
+            print("   ❌ 데이터베이스 상태 확인 실패")
+            DatabaseConfig.release_connection(connection, discard=True)
+    
+    pool_stats = DatabaseConfig.get_pool().get_stats()
+    print(f"\n5. DB 연결 풀: 연결 {pool_stats['size']}개 (사용 중 {pool_stats['in_use']}), "
+          f"대기 {pool_stats['waits']}회 (평균 {pool_stats['wait_time_avg'] * 1000:.1f}ms)")
 
 def main():
     """메인 함수"""
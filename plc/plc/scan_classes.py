@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스캔 등급(scan class) - 항목별 수집 주기(예: 100ms/1s/10s/60s)를 하나의 수집 루프에서 교차 실행
+"""
+
+import logging
+from math import gcd
+from typing import Any, Dict, List, Optional, Tuple
+
+# 등급 주기 단위 (ms) - 모든 등급 주기를 이 배수로 맞춰 기본 주기가 이보다 짧아지지 않게 함
+# (예: 1000ms/1001ms 등급이 1ms 기본 주기로 초당 1000번 깨어나지 않도록 둘 다 1000ms로 맞춤)
+MIN_BASE_MS = 10
+
+logger = logging.getLogger('XG5000Client.scan_classes')
+
+ClassItems = Tuple[int, tuple]  # (등급 주기 ms, 항목 튜플)
+
+
+class ScanClassSchedule:
+    """항목을 스캔 등급별로 나누고 스캔마다 읽을 등급을 결정
+
+    - 항목의 scan_class_ms가 없으면 기본 주기(--interval) 등급
+    - 등급 주기는 min_base_ms의 배수로 반올림 (바뀐 주기는 경고 로그)
+    - 스케줄러의 기본 주기(base_ms)는 모든 등급 주기의 최대공약수 (min_base_ms 이상)
+    - 기본 주기 n번째 스캔(벽시계 기준 번호)에서 (n - 위상) % (등급 주기 / 기본 주기) == 0인 등급만 읽음
+    - 느린 등급일수록 위상을 한 스캔씩 밀어서 여러 등급이 같은 스캔에 몰리지 않게 교차
+      (예: 100ms/1s/10s/60s → 1s 등급은 +100ms, 10s 등급은 +200ms, 60s 등급은 +300ms 시점에 읽음)
+    등급별 항목 튜플은 항목 목록이 바뀌기 전까지 같은 객체이므로 등급별 읽기 계획을 그대로 재사용할 수 있습니다.
+    """
+
+    def __init__(self, default_interval_ms: int, min_base_ms: int = MIN_BASE_MS):
+        self.min_base_ms = max(1, int(min_base_ms))
+        self.default_interval_ms = self.round_period(default_interval_ms)
+        self.base_ms = self.default_interval_ms
+        self._items = None
+        self.classes: Dict[int, tuple] = {}                        # 등급 주기 -> 항목 튜플
+        self.by_device: Dict[int, Dict[Any, tuple]] = {}           # 등급 주기 -> {장치 ID: 항목 튜플}
+        self._slots: Dict[int, Tuple[int, int]] = {}               # 등급 주기 -> (기본 주기 배수, 위상)
+        self.stats: Dict[int, int] = {}                            # 등급 주기 -> 읽은 스캔 수
+
+    def configure(self, items) -> bool:
+        """항목 목록으로 등급 구성 (같은 목록이면 다시 계산하지 않고 False 반환)"""
+        if items is self._items:
+            return False
+        self._items = items
+        groups: Dict[int, list] = {}
+        rounded: Dict[int, int] = {}
+        for item in items:
+            period = self.class_of(item)
+            groups.setdefault(period, []).append(item)
+            requested = item.get('scan_class_ms')
+            if requested and int(requested) != period:
+                rounded[int(requested)] = period
+        for requested, period in sorted(rounded.items()):
+            logger.warning(f"scan_class_ms {requested}ms → {period}ms로 조정 ({self.min_base_ms}ms 단위)")
+        self.classes = {period: tuple(group) for period, group in sorted(groups.items())}
+
+        by_device: Dict[int, Dict[Any, list]] = {}
+        for period, group in self.classes.items():
+            devices = by_device.setdefault(period, {})
+            for item in group:
+                devices.setdefault(item.get('plc_device_id'), []).append(item)
+        self.by_device = {period: {plc_id: tuple(group) for plc_id, group in devices.items()}
+                          for period, devices in by_device.items()}
+
+        base_ms = 0
+        for period in self.classes:
+            base_ms = gcd(base_ms, period)
+        base_ms = base_ms or self.default_interval_ms
+        self._slots = {}
+        for index, period in enumerate(self.classes):
+            multiple = period // base_ms
+            self._slots[period] = (multiple, index % multiple)
+        self.base_ms = base_ms
+        return True
+
+    def round_period(self, period_ms) -> int:
+        """주기를 min_base_ms의 배수로 반올림 (최소 min_base_ms)"""
+        return max(1, int(round(int(period_ms) / self.min_base_ms))) * self.min_base_ms
+
+    def class_of(self, item) -> int:
+        """항목의 등급 주기 (ms, min_base_ms 배수)"""
+        period = item.get('scan_class_ms')
+        return self.round_period(period) if period else self.default_interval_ms
+
+    def due(self, scan_time: float) -> List[ClassItems]:
+        """예정 시각(epoch 초)의 스캔에서 읽을 등급 목록 [(등급 주기, 항목 튜플)]"""
+        tick = int(round(scan_time * 1000.0 / self.base_ms))
+        due = []
+        for period, (multiple, phase) in self._slots.items():
+            if (tick - phase) % multiple == 0:
+                due.append((period, self.classes[period]))
+                self.stats[period] = self.stats.get(period, 0) + 1
+        return due
+
+    def summary(self) -> Optional[str]:
+        """등급별 항목 수/읽은 스캔 수 요약 (등급이 없으면 None)"""
+        if not self.classes:
+            return None
+        return ", ".join(f"{period}ms {len(items)}개 항목 {self.stats.get(period, 0)}회"
+                         for period, items in self.classes.items())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스캔 스케줄러 - 수집 주기를 벽시계 경계에 맞춘 절대 마감 시각으로 실행 (누적 지연 없음)
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+# 스캔이 주기를 넘겨 다음 마감 시각을 놓쳤을 때의 처리
+OVERRUN_SKIP = "skip"          # 놓친 주기는 건너뛰고 다음 경계에 맞춰 실행
+OVERRUN_CATCH_UP = "catch_up"  # 놓친 주기를 쉬지 않고 연달아 실행해 따라잡음
+OVERRUN_POLICIES = [OVERRUN_SKIP, OVERRUN_CATCH_UP]
+
+# catch_up 정책에서 한 번에 따라잡을 최대 주기 수 (넘으면 나머지는 건너뜀)
+MAX_CATCH_UP_TICKS = 10
+
+# sleep_async()에서 stop() 여부를 확인하는 간격 (초)
+STOP_POLL_INTERVAL = 0.5
+
+
+class ScanScheduler:
+    """고정 주기 스캔 스케줄러
+
+    - 마감 시각은 time.monotonic() 기준 first + n × interval로 계산하므로
+      스캔 소요 시간이 다음 주기에 더해지지 않음 (1000ms 주기는 항상 1000ms)
+    - align=True이면 첫 마감 시각을 벽시계 주기 경계(예: 매 정초)에 맞춤 →
+      여러 수집기/PLC의 스캔 시각이 같은 경계에 정렬됨
+    - wait()는 다음 마감 시각까지 기다린 뒤 해당 주기의 예정 시각(epoch 초)을 반환
+      (수집 시각으로 사용하면 태그/PLC 간 시각이 일치)
+    - 마감 시각을 한 주기 이상 놓치면 overrun으로 집계하고 정책에 따라 건너뛰거나 따라잡음
+    """
+
+    def __init__(self, interval_ms: float, policy: str = OVERRUN_SKIP, align: bool = True):
+        if policy not in OVERRUN_POLICIES:
+            raise ValueError(f"지원하지 않는 overrun 정책: {policy}")
+        self.interval = max(interval_ms, 1) / 1000.0
+        self.policy = policy
+        self.align = align
+        self._stop = threading.Event()
+        self._origin_mono: Optional[float] = None   # 0번째 마감 시각 (monotonic)
+        self._origin_wall = 0.0                     # 0번째 마감 시각 (epoch)
+        self._tick = 0
+        self.stats = {
+            'ticks': 0,
+            'overruns': 0,
+            'skipped_ticks': 0,
+            'caught_up_ticks': 0,
+            'max_lateness': 0.0,
+            'total_lateness': 0.0
+        }
+
+    def _start(self):
+        now_mono = time.monotonic()
+        now_wall = time.time()
+        delay = (self.interval - now_wall % self.interval) % self.interval if self.align else 0.0
+        self._origin_mono = now_mono + delay
+        self._origin_wall = now_wall + delay
+        self._tick = 0
+
+    def _next(self) -> float:
+        """이번에 실행할 주기를 정하고, 그 마감 시각까지 남은 시간(초) 반환"""
+        if self._origin_mono is None:
+            self._start()
+        else:
+            self._tick += 1
+
+        now = time.monotonic()
+        deadline = self._origin_mono + self._tick * self.interval
+        late_ticks = int((now - deadline) // self.interval)
+        if late_ticks >= 1:
+            # 다음 마감 시각까지 이미 지나 있음 (이전 스캔이 주기를 넘김)
+            self.stats['overruns'] += 1
+            if self.policy == OVERRUN_CATCH_UP and late_ticks <= MAX_CATCH_UP_TICKS:
+                self.stats['caught_up_ticks'] += 1
+            else:
+                self._tick += late_ticks
+                self.stats['skipped_ticks'] += late_ticks
+                deadline = self._origin_mono + self._tick * self.interval
+        return deadline - now
+
+    def _record(self, lateness: float) -> float:
+        lateness = max(0.0, lateness)
+        self.stats['ticks'] += 1
+        self.stats['total_lateness'] += lateness
+        self.stats['max_lateness'] = max(self.stats['max_lateness'], lateness)
+        return self._origin_wall + self._tick * self.interval
+
+    def wait(self) -> Optional[float]:
+        """다음 마감 시각까지 대기 후 예정 시각(epoch 초) 반환 (stop() 호출 시 None)"""
+        remaining = self._next()
+        if remaining > 0 and self._stop.wait(remaining):
+            return None
+        if self._stop.is_set():
+            return None
+        return self._record(time.monotonic() - (self._origin_mono + self._tick * self.interval))
+
+    async def wait_async(self) -> Optional[float]:
+        """asyncio 수집 루프용 wait()"""
+        remaining = self._next()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        if self._stop.is_set():
+            return None
+        return self._record(time.monotonic() - (self._origin_mono + self._tick * self.interval))
+
+    def sleep(self, seconds: float) -> bool:
+        """오류 후 재시도 대기 (stop() 시 바로 깨어 True 반환), 다음 wait()에서 경계를 새로 맞춤"""
+        self._origin_mono = None
+        return self._stop.wait(seconds)
+
+    async def sleep_async(self, seconds: float) -> bool:
+        """asyncio 수집 루프용 sleep() (stop()을 STOP_POLL_INTERVAL초 간격으로 확인)"""
+        self._origin_mono = None
+        deadline = time.monotonic() + seconds
+        while not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(remaining, STOP_POLL_INTERVAL))
+        return self._stop.is_set()
+
+    def stop(self):
+        """대기 중인 wait()를 바로 깨워 종료"""
+        self._stop.set()
+
+    def reset(self):
+        """다시 시작할 때 호출 (다음 wait()에서 경계를 새로 맞춤)"""
+        self._stop.clear()
+        self._origin_mono = None
+
+    def set_interval(self, interval_ms: float):
+        """주기 변경 (다음 wait()에서 새 주기의 경계를 다시 맞춤)"""
+        self.interval = max(interval_ms, 1) / 1000.0
+        self._origin_mono = None
+
+    def summary(self) -> str:
+        """통계 요약 문자열"""
+        ticks = self.stats['ticks']
+        avg_lateness = self.stats['total_lateness'] / ticks if ticks else 0.0
+        return (f"스캔 {ticks}회 (주기 {self.interval * 1000:.0f}ms), 주기 초과 {self.stats['overruns']}회, "
+                f"건너뜀 {self.stats['skipped_ticks']}회, 따라잡음 {self.stats['caught_up_ticks']}회, "
+                f"시작 지연 평균 {avg_lateness * 1000:.1f}ms / 최대 {self.stats['max_lateness'] * 1000:.1f}ms")
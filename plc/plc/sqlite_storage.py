@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 저장 엔진 - 고빈도 수집용 (단일 연결, WAL, 주기적 체크포인트)
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+DEFAULT_CHECKPOINT_INTERVAL = 60.0   # 초
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+DEFAULT_CACHED_STATEMENTS = 256
+# 주기적 체크포인트가 따라가지 못할 때를 대비한 자동 체크포인트 기준 (페이지 수, 4KB 페이지 기준 약 40MB)
+WAL_AUTOCHECKPOINT_PAGES = 10000
+
+
+class SQLiteStorage:
+    """수집기용 SQLite 연결 관리
+
+    - 프로세스에서 연결 1개를 열어 두고 모든 조회/저장에 재사용 (잠금으로 스레드 간 직렬화)
+    - journal_mode=WAL, synchronous=NORMAL: 커밋마다 fsync하지 않고 읽기와 쓰기가 서로 막지 않음
+      (전원 차단 시 마지막 체크포인트 이후 일부 커밋만 유실될 수 있고 DB 파일은 손상되지 않음)
+    - 같은 SQL 문자열은 sqlite3 문장 캐시(cached_statements)에서 준비된 문장을 재사용
+    - 저장 스레드가 checkpoint_interval초마다 PASSIVE 체크포인트로 WAL을 DB 파일에 반영하고,
+      종료 시 TRUNCATE 체크포인트로 WAL 파일을 비움
+    """
+
+    def __init__(self, db_path: str, checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+                 busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS):
+        self.db_path = db_path
+        self.checkpoint_interval = checkpoint_interval
+        self.busy_timeout_ms = busy_timeout_ms
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._last_checkpoint = time.time()
+        self.stats = {
+            'transactions': 0,
+            'rows_written': 0,
+            'checkpoints': 0,
+            'checkpoint_time': 0.0,
+            'wal_pages_checkpointed': 0
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=DEFAULT_CACHED_STATEMENTS)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        conn.execute(f'PRAGMA wal_autocheckpoint={WAL_AUTOCHECKPOINT_PAGES}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """공유 연결 (닫혀 있으면 다시 엶)"""
+        if self._conn is None:
+            self._conn = self._connect()
+            self._last_checkpoint = time.time()
+        return self._conn
+
+    @contextmanager
+    def transaction(self):
+        """잠금을 잡고 공유 연결을 넘겨줌 - 정상 종료 시 커밋, 예외 시 롤백
+        (sqlite3.connect()를 with 문으로 쓰던 코드와 같은 방식, 단 연결은 닫지 않음)
+        """
+        with self._lock:
+            conn = self.connection
+            try:
+                yield conn
+                conn.commit()
+                self.stats['transactions'] += 1
+            except Exception:
+                conn.rollback()
+                raise
+
+    def executemany(self, sql: str, rows: List[tuple]) -> int:
+        """여러 행을 한 트랜잭션으로 실행 (체크포인트 주기가 되면 이어서 체크포인트)"""
+        if not rows:
+            return 0
+        with self.transaction() as conn:
+            conn.executemany(sql, rows)
+        self.stats['rows_written'] += len(rows)
+        self.maybe_checkpoint()
+        return len(rows)
+
+    def maybe_checkpoint(self):
+        """마지막 체크포인트 후 checkpoint_interval초가 지났으면 PASSIVE 체크포인트"""
+        if self.checkpoint_interval > 0 and time.time() - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def checkpoint(self, mode: str = 'PASSIVE') -> Dict:
+        """WAL 체크포인트 실행 (mode: PASSIVE, FULL, RESTART, TRUNCATE)"""
+        start = time.time()
+        with self._lock:
+            busy, log_pages, checkpointed = self.connection.execute(f'PRAGMA wal_checkpoint({mode})').fetchone()
+            self._last_checkpoint = time.time()
+        duration = time.time() - start
+        self.stats['checkpoints'] += 1
+        self.stats['checkpoint_time'] += duration
+        self.stats['wal_pages_checkpointed'] += max(0, checkpointed)
+        return {'busy': busy, 'log_pages': log_pages, 'checkpointed': checkpointed, 'duration': duration}
+
+    def close(self):
+        """WAL을 비운 뒤 연결 닫기 (다음 사용 시 다시 엶)"""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            except sqlite3.Error:
+                pass
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+수집/저장 분리용 Write-behind 큐 - PLC 스캔 주기를 DB 지연과 무관하게 유지
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from storage_spool import DiskSpool, DEFAULT_SPOOL_DIR
+
+# 큐가 가득 찼을 때의 처리 정책
+POLICY_DROP_OLDEST = "drop_oldest"  # 가장 오래된 스캔을 버리고 새 스캔 추가
+POLICY_BLOCK = "block"              # 저장 스레드가 자리를 비울 때까지 수집 스레드 대기
+POLICY_SPILL = "spill"              # 넘치는 스캔을 디스크 스풀에 기록 후 나중에 저장
+QUEUE_POLICIES = (POLICY_DROP_OLDEST, POLICY_BLOCK, POLICY_SPILL)
+
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_MAX_BATCH_SCANS = 10
+DEFAULT_REPLAY_BATCH_SCANS = 200
+
+# plc_data_history 추가 주기 (N스캔 또는 T밀리초 중 먼저 도달)
+DEFAULT_HISTORY_FLUSH_SCANS = 10
+DEFAULT_HISTORY_FLUSH_MS = 5000
+HISTORY_MAX_ROWS = 1000000  # 이력 저장이 계속 실패할 때 메모리에 보관할 최대 행 수
+
+# DB 장애 시 재시도 간격 (초, 지수 증가)
+RETRY_DELAY_MIN = 1.0
+RETRY_DELAY_MAX = 30.0
+
+logger = logging.getLogger('XG5000Client.storage')
+
+# (스캔 시각, 행 목록)
+Scan = Tuple[float, List[Dict]]
+
+
+class RejectedBatchError(Exception):
+    """DB가 배치의 데이터를 거부함 (외래키/값 오류 등 연결과 무관해 다시 시도해도 같은 결과)
+
+    write_func는 연결 오류 등 일시적인 실패에는 False를 반환하고, 데이터 오류에는 이 예외를 던집니다.
+    저장 큐는 거부된 배치를 반씩 나눠 다시 저장하고, 한 스캔만 남아도 거부되면
+    그 스캔을 격리 파일로 옮긴 뒤 다음 스캔으로 진행합니다.
+    """
+
+
+class WriteBehindQueue:
+    """수집 스레드와 저장 스레드 사이의 제한 크기 큐
+
+    - 수집 스레드는 put()으로 스캔 결과를 넣고 바로 다음 스캔으로 진행
+    - 저장 스레드는 쌓인 스캔을 최대 max_batch_scans개씩 모아 write_func를 한 번 호출
+      (write_func는 (스캔 시각, 행 목록) 목록을 한 트랜잭션으로 저장하고 성공 여부를 반환)
+    - 큐가 가득 차면 policy에 따라 오래된 스캔 삭제 / 대기 / 디스크 스풀 기록
+    - 저장에 실패하면(DB 장애) 큐의 스캔과 이후 스캔을 디스크 스풀에 기록하고,
+      DB가 돌아오면 스풀을 오래된 순서대로 replay_batch_scans개씩 묶어 다시 저장
+    - write_func가 RejectedBatchError를 던지면(데이터 오류) 배치를 나눠 거부된 스캔만 격리 파일로 옮기므로
+      잘못된 레코드 하나 때문에 재저장이 멈추거나 스풀이 계속 쌓이지 않음
+    - flush_func가 있으면 큐가 비어 있을 때와 종료 직전에 저장 스레드에서 호출
+    """
+
+    def __init__(self, write_func: Callable[[List[Scan]], bool],
+                 maxsize: int = DEFAULT_QUEUE_SIZE, policy: str = POLICY_DROP_OLDEST,
+                 max_batch_scans: int = DEFAULT_MAX_BATCH_SCANS, spool_dir: str = DEFAULT_SPOOL_DIR,
+                 replay_batch_scans: int = DEFAULT_REPLAY_BATCH_SCANS,
+                 flush_func: Optional[Callable[[bool], None]] = None):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"지원하지 않는 큐 정책: {policy} (가능: {', '.join(QUEUE_POLICIES)})")
+        self.write_func = write_func
+        self.flush_func = flush_func  # 유휴/종료 시 저장 스레드에서 호출 (인자: 강제 여부)
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.max_batch_scans = max(1, max_batch_scans)
+        self.replay_batch_scans = max(1, replay_batch_scans)
+        self.spool = DiskSpool(spool_dir)
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._running = False
+        self._spooling = False  # 스풀에 남은 스캔이 있으면 이후 스캔도 스풀로 보내 순서 유지
+        self._retry_delay = RETRY_DELAY_MIN
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            'enqueued_scans': 0,
+            'written_scans': 0,
+            'written_batches': 0,
+            'write_failures': 0,
+            'dropped_scans': 0,
+            'spooled_scans': 0,
+            'replayed_scans': 0,
+            'rejected_writes': 0,
+            'quarantined_scans': 0,
+            'blocked_time': 0.0,
+            'max_depth': 0
+        }
+
+    @property
+    def depth(self) -> int:
+        """현재 큐에 대기 중인 스캔 수"""
+        return len(self._queue)
+
+    @property
+    def spooling(self) -> bool:
+        """스풀 기록 중 여부 (DB 장애 또는 재저장 중)"""
+        return self._spooling
+
+    def start(self):
+        """저장 스레드 시작"""
+        if self._running:
+            return
+        self._running = True
+        self._stop_event.clear()
+        # 이전 실행에서 스풀에 남긴 스캔이 있으면 먼저 재저장
+        self._spooling = self.spool.has_data()
+        self._thread = threading.Thread(target=self._writer_loop, name="storage-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"저장 큐 시작 (크기: {self.maxsize}, 정책: {self.policy}, 묶음: {self.max_batch_scans}스캔, "
+                    f"스풀 재저장 대기: {'있음' if self._spooling else '없음'})")
+
+    def stop(self, timeout: float = 10.0):
+        """저장 스레드 중지 (남은 스캔은 저장하거나 스풀에 기록한 뒤 종료)"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.spool.close()
+        logger.info(f"저장 큐 중지 (남은 스캔: {self.depth}, 통계: {self.stats}, 스풀: {self.spool.stats})")
+
+    def put(self, scan: List[Dict], scan_time: Optional[float] = None) -> bool:
+        """스캔 결과 1건을 큐에 추가 (스캔을 버렸으면 False)"""
+        if not scan:
+            return True
+        entry = (scan_time if scan_time is not None else time.time(), scan)
+
+        with self._cond:
+            if self._spooling:
+                self._spool_locked([entry])
+                return True
+            if len(self._queue) >= self.maxsize:
+                if self.policy == POLICY_DROP_OLDEST:
+                    self._queue.popleft()
+                    self.stats['dropped_scans'] += 1
+                elif self.policy == POLICY_BLOCK:
+                    wait_start = time.time()
+                    while len(self._queue) >= self.maxsize and self._running and not self._spooling:
+                        self._cond.wait(0.5)
+                    self.stats['blocked_time'] += time.time() - wait_start
+                    if self._spooling:
+                        self._spool_locked([entry])
+                        return True
+                    if len(self._queue) >= self.maxsize:
+                        self.stats['dropped_scans'] += 1
+                        return False
+                else:
+                    self._spool_locked([entry])
+                    return True
+
+            self._queue.append(entry)
+            self.stats['enqueued_scans'] += 1
+            if len(self._queue) > self.stats['max_depth']:
+                self.stats['max_depth'] = len(self._queue)
+            self._cond.notify_all()
+        return True
+
+    def _spool_locked(self, scans: List[Scan]):
+        """큐에 남은 스캔을 먼저, 이어서 scans를 스풀에 기록 (self._cond 보유 상태에서 호출)"""
+        pending = list(self._queue) + scans
+        self._queue.clear()
+        try:
+            self.spool.append(pending)
+            self.stats['spooled_scans'] += len(pending)
+        except OSError as e:
+            self.stats['dropped_scans'] += len(pending)
+            logger.error(f"스풀 기록 오류: {e}")
+        if not self._spooling:
+            self._spooling = True
+            logger.warning(f"스풀 기록 시작 (대기 스캔 {len(pending)}건)")
+        self._cond.notify_all()
+
+    def _take_batch(self) -> List[Scan]:
+        """큐에서 최대 max_batch_scans개의 스캔을 꺼냄 (비어 있으면 잠시 대기)"""
+        with self._cond:
+            if not self._queue and self._running and not self._spooling:
+                self._cond.wait(0.5)
+            batch = []
+            while self._queue and len(batch) < self.max_batch_scans:
+                batch.append(self._queue.popleft())
+            if batch:
+                # block 정책으로 대기 중인 수집 스레드 깨우기
+                self._cond.notify_all()
+            return batch
+
+    def _write(self, batch: List[Scan]) -> bool:
+        """batch 저장 (일시적 실패 시 False, 데이터 오류는 RejectedBatchError로 전달)"""
+        try:
+            success = self.write_func(batch)
+        except RejectedBatchError:
+            self.stats['rejected_writes'] += 1
+            raise
+        except Exception as e:
+            logger.error(f"저장 스레드 오류: {e}")
+            success = False
+        if success:
+            self.stats['written_scans'] += len(batch)
+            self.stats['written_batches'] += 1
+            self._retry_delay = RETRY_DELAY_MIN
+        else:
+            self.stats['write_failures'] += 1
+        return success
+
+    def _write_batch(self, batch: List[Scan]) -> int:
+        """batch를 앞에서부터 저장하고 처리한(저장 또는 격리한) 스캔 수를 반환
+        
+        데이터 오류로 거부되면 반씩 나눠 다시 저장하고, 한 스캔만 남아도 거부되면 격리합니다.
+        일시적 실패(DB 장애)가 나면 그 앞까지 처리한 수를 반환합니다.
+        """
+        try:
+            return len(batch) if self._write(batch) else 0
+        except RejectedBatchError as e:
+            if len(batch) == 1:
+                try:
+                    self.spool.quarantine(batch, str(e))
+                    self.stats['quarantined_scans'] += 1
+                except OSError as spool_error:
+                    self.stats['dropped_scans'] += 1
+                    logger.error(f"격리 파일 기록 오류, 거부된 스캔 버림: {spool_error}")
+                return 1
+        
+        mid = len(batch) // 2
+        done = self._write_batch(batch[:mid])
+        if done < mid:
+            return done
+        return mid + self._write_batch(batch[mid:])
+
+    def _backoff(self):
+        """DB 재시도 대기 (종료 요청 시 즉시 해제)"""
+        self._stop_event.wait(self._retry_delay)
+        self._retry_delay = min(self._retry_delay * 2, RETRY_DELAY_MAX)
+
+    def _writer_loop(self):
+        while True:
+            batch = self._take_batch()
+            if batch:
+                done = self._write_batch(batch)
+                if done < len(batch):
+                    # DB 장애: 실패한 스캔과 큐의 나머지를 스풀로 옮기고 이후 스캔도 스풀에 기록
+                    with self._cond:
+                        self._queue.extendleft(reversed(batch[done:]))
+                        self._spool_locked([])
+            elif self._spooling and self._running:
+                if not self._replay_spool():
+                    self._backoff()
+            elif not self._running:
+                if self._spooling:
+                    self._drain_spool()
+                self._flush(True)
+                break
+            else:
+                self.spool.flush()
+                self._flush(False)
+
+    def _flush(self, force: bool):
+        if self.flush_func is None:
+            return
+        try:
+            self.flush_func(force)
+        except Exception as e:
+            logger.error(f"저장 스레드 flush 오류: {e}")
+
+    def _replay_spool(self) -> bool:
+        """스풀의 가장 오래된 세그먼트를 DB에 재저장 (실패하면 False)"""
+        segments = self.spool.sealed_segments()
+        if not segments:
+            with self._cond:
+                # 활성 세그먼트를 닫아 재저장 대상으로 만들고, 비어 있으면 메모리 큐로 복귀
+                if not self.spool.seal() and not self.spool.sealed_segments():
+                    self._spooling = False
+                    logger.info(f"스풀 재저장 완료 (누적: {self.stats['replayed_scans']}스캔)")
+            return True
+
+        path = segments[0]
+        scans = self.spool.read_segment(path)
+        for i in range(0, len(scans), self.replay_batch_scans):
+            batch = scans[i:i + self.replay_batch_scans]
+            done = self._write_batch(batch)
+            self.stats['replayed_scans'] += done
+            if done < len(batch):
+                # 저장(또는 격리)한 부분은 지우고 남은 스캔만 남겨 다음 기회에 재시도
+                self.spool.rewrite(path, scans[i + done:])
+                return False
+        self.spool.remove(path)
+        return True
+
+    def _drain_spool(self):
+        """종료 시 스풀을 한 번 더 재저장 (실패하면 다음 실행 때 재저장)"""
+        self.spool.seal()
+        while self.spool.sealed_segments():
+            if not self._replay_spool():
+                return
+        self._spooling = False
+
+
+class HistoryBuffer:
+    """plc_data_history 추가용 버퍼
+
+    저장에 성공한 스캔의 행을 모아 두었다가 flush_scans개 스캔 또는
+    flush_interval_ms가 지나면 한 번의 다중 행 INSERT로 저장하도록 알려줍니다.
+    """
+
+    def __init__(self, flush_scans: int = DEFAULT_HISTORY_FLUSH_SCANS,
+                 flush_interval_ms: int = DEFAULT_HISTORY_FLUSH_MS):
+        self.flush_scans = max(1, flush_scans)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.rows: List[tuple] = []
+        self.scans = 0
+        self.dropped_rows = 0
+        self._first_added: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, scans: List[Scan]):
+        """(스캔 시각, 행 목록) 목록을 (data_item_id, value, quality, timestamp) 행으로 추가"""
+        for scan_time, rows in scans:
+            timestamp = datetime.fromtimestamp(scan_time)
+            self.rows.extend((row['data_item_id'], row['value'], row['quality'], timestamp) for row in rows)
+            self.scans += 1
+        if len(self.rows) > HISTORY_MAX_ROWS:
+            overflow = len(self.rows) - HISTORY_MAX_ROWS
+            del self.rows[:overflow]
+            self.dropped_rows += overflow
+            logger.warning(f"이력 버퍼 초과로 오래된 행 {overflow}개 버림 (누적: {self.dropped_rows})")
+        if self._first_added is None and self.rows:
+            self._first_added = time.monotonic()
+
+    def due(self) -> bool:
+        """저장할 때가 되었는지 여부"""
+        if not self.rows:
+            return False
+        return (self.scans >= self.flush_scans
+                or time.monotonic() - self._first_added >= self.flush_interval)
+
+    def clear(self):
+        self.rows = []
+        self.scans = 0
+        self._first_added = None
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DB 장애 대비 로컬 디스크 스풀 - 세그먼트 파일에 스캔을 이진 레코드로 순차 기록
+"""
+
+import os
+import glob
+import time
+import struct
+import threading
+import logging
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 세그먼트 파일 헤더
+SEGMENT_MAGIC = b'PLCSPL01'
+SEGMENT_PREFIX = "spool-"
+SEGMENT_SUFFIX = ".seg"
+QUARANTINE_FILE = "quarantine.seg"  # DB가 거부한 스캔 (같은 레코드 형식, 재저장 대상 아님)
+
+# 레코드(스캔 1건) = 헤더 + 행 N개
+#   헤더: 행 수(uint32) | 행 데이터 CRC32(uint32) | 스캔 시각(float64, epoch 초)
+#   행:   data_item_id(uint32) | value(float64) | quality 코드(uint8)
+RECORD_HEADER = struct.Struct("<IId")
+ROW = struct.Struct("<IdB")
+
+QUALITY_CODES = {'good': 0, 'bad': 1, 'uncertain': 2}
+QUALITY_NAMES = {code: name for name, code in QUALITY_CODES.items()}
+
+DEFAULT_SPOOL_DIR = "spool"
+DEFAULT_SEGMENT_BYTES = 4 * 1024 * 1024
+DEFAULT_FSYNC_INTERVAL = 1.0   # 초
+DEFAULT_FSYNC_RECORDS = 100
+
+logger = logging.getLogger('XG5000Client.spool')
+
+Scan = Tuple[float, List[Dict]]
+
+
+def encode_scan(scan_time: float, rows: List[Dict]) -> bytes:
+    """스캔 1건을 이진 레코드로 변환"""
+    payload = bytearray(ROW.size * len(rows))
+    offset = 0
+    for row in rows:
+        ROW.pack_into(payload, offset, row['data_item_id'], float(row['value']),
+                      QUALITY_CODES.get(row['quality'], QUALITY_CODES['bad']))
+        offset += ROW.size
+    return RECORD_HEADER.pack(len(rows), zlib.crc32(payload), scan_time) + payload
+
+
+class DiskSpool:
+    """추가 전용 세그먼트 스풀
+
+    - append()는 활성 세그먼트 끝에 레코드를 쓰고, fsync는 fsync_interval초 또는
+      fsync_records건마다 한 번만 수행 (전원 차단 시 최대 그만큼만 유실)
+    - 세그먼트가 segment_bytes를 넘으면 새 세그먼트로 교체
+    - 재저장은 닫힌(seal) 세그먼트를 오래된 순서로 읽어 처리 후 삭제
+    - 기록 도중 중단된 마지막 레코드는 길이/CRC 검사로 걸러냄
+    """
+
+    def __init__(self, spool_dir: str = DEFAULT_SPOOL_DIR, segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+                 fsync_interval: float = DEFAULT_FSYNC_INTERVAL, fsync_records: int = DEFAULT_FSYNC_RECORDS):
+        self.spool_dir = spool_dir
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.fsync_records = max(1, fsync_records)
+        self._lock = threading.Lock()
+        self._file = None
+        self._active_path: Optional[str] = None
+        self._unsynced = 0
+        self._last_fsync = time.time()
+        self.stats = {
+            'appended_scans': 0,
+            'appended_bytes': 0,
+            'fsyncs': 0,
+            'segments_created': 0,
+            'segments_replayed': 0,
+            'corrupt_records': 0,
+            'quarantined_scans': 0
+        }
+
+    def _segment_paths(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.spool_dir, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")))
+
+    def _open_segment(self):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        paths = self._segment_paths()
+        seq = int(os.path.basename(paths[-1])[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1 if paths else 1
+        self._active_path = os.path.join(self.spool_dir, f"{SEGMENT_PREFIX}{seq:08d}{SEGMENT_SUFFIX}")
+        self._file = open(self._active_path, 'ab')
+        self._file.write(SEGMENT_MAGIC)
+        self.stats['segments_created'] += 1
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.time()
+        self.stats['fsyncs'] += 1
+
+    def _close_active(self):
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+            self._active_path = None
+
+    def append(self, scans: List[Scan]):
+        """스캔 목록을 활성 세그먼트에 추가"""
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            for scan_time, rows in scans:
+                record = encode_scan(scan_time, rows)
+                self._file.write(record)
+                self._unsynced += 1
+                self.stats['appended_scans'] += 1
+                self.stats['appended_bytes'] += len(record)
+            if (self._unsynced >= self.fsync_records
+                    or time.time() - self._last_fsync >= self.fsync_interval):
+                self._sync()
+            if self._file.tell() >= self.segment_bytes:
+                self._close_active()
+
+    def flush(self):
+        """기록 대기 중인 레코드를 디스크에 반영"""
+        with self._lock:
+            if self._file is not None and self._unsynced:
+                self._sync()
+
+    def seal(self) -> bool:
+        """활성 세그먼트를 닫아 재저장 대상으로 만듦 (닫을 세그먼트가 없으면 False)"""
+        with self._lock:
+            if self._file is None:
+                return False
+            self._close_active()
+            return True
+
+    def sealed_segments(self) -> List[str]:
+        """재저장 대상 세그먼트 목록 (오래된 순)"""
+        with self._lock:
+            return [path for path in self._segment_paths() if path != self._active_path]
+
+    def has_data(self) -> bool:
+        """스풀에 남은 세그먼트가 있는지 여부"""
+        return bool(self._segment_paths())
+
+    def read_segment(self, path: str) -> List[Scan]:
+        """세그먼트의 모든 스캔을 읽음 (손상/미완료 레코드 이후는 버림)"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        return list(self._iter_records(path, memoryview(data)))
+
+    def _iter_records(self, path: str, view: memoryview) -> Iterator[Scan]:
+        if bytes(view[:len(SEGMENT_MAGIC)]) != SEGMENT_MAGIC:
+            logger.error(f"스풀 세그먼트 형식 오류: {path}")
+            self.stats['corrupt_records'] += 1
+            return
+        offset = len(SEGMENT_MAGIC)
+        while offset < len(view):
+            if offset + RECORD_HEADER.size > len(view):
+                self.stats['corrupt_records'] += 1
+                logger.warning(f"스풀 레코드 헤더 불완전, 이후 무시: {path} @ {offset}")
+                return
+            count, crc, scan_time = RECORD_HEADER.unpack_from(view, offset)
+            start = offset + RECORD_HEADER.size
+            end = start + count * ROW.size
+            if end > len(view) or zlib.crc32(view[start:end]) != crc:
+                self.stats['corrupt_records'] += 1
+                logger.warning(f"스풀 레코드 손상, 이후 무시: {path} @ {offset}")
+                return
+            rows = [{'data_item_id': item_id, 'value': value, 'quality': QUALITY_NAMES.get(code, 'bad')}
+                    for item_id, value, code in ROW.iter_unpack(view[start:end])]
+            yield scan_time, rows
+            offset = end
+
+    def rewrite(self, path: str, scans: List[Scan]):
+        """세그먼트를 남은 스캔만으로 교체 (재저장 도중 실패 시 중복 저장 방지)"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(SEGMENT_MAGIC)
+            for scan_time, rows in scans:
+                f.write(encode_scan(scan_time, rows))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def quarantine(self, scans: List[Scan], reason: str) -> str:
+        """DB가 거부한 스캔을 격리 파일 끝에 추가 (재저장하지 않음, 확인 후 수동 처리)"""
+        path = os.path.join(self.spool_dir, QUARANTINE_FILE)
+        with self._lock:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            with open(path, 'ab') as f:
+                if f.tell() == 0:
+                    f.write(SEGMENT_MAGIC)
+                for scan_time, rows in scans:
+                    f.write(encode_scan(scan_time, rows))
+                f.flush()
+                os.fsync(f.fileno())
+            self.stats['quarantined_scans'] += len(scans)
+        logger.error(f"DB가 거부한 스캔 {len(scans)}건 격리: {path} ({reason})")
+        return path
+    
+    def remove(self, path: str):
+        """재저장을 마친 세그먼트 삭제"""
+        os.remove(path)
+        self.stats['segments_replayed'] += 1
+
+    def close(self):
+        """활성 세그먼트 fsync 후 닫기"""
+        with self._lock:
+            self._close_active()
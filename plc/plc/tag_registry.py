@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+수집 항목 레지스트리 - 항목 구성을 한 번 조회해 두고 버전이 바뀔 때만 다시 조회
+"""
+
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+# 버전 확인 간격 (초)
+DEFAULT_CHECK_INTERVAL = 10.0
+
+# 구성 버전 쿼리 (테이블별 행 수 + 마지막 수정 시각, MariaDB/SQLite 공용)
+TAG_VERSION_SQL = '''
+    SELECT (SELECT COUNT(*) FROM plc_data_items), (SELECT MAX(updated_at) FROM plc_data_items),
+           (SELECT COUNT(*) FROM plc_devices), (SELECT MAX(updated_at) FROM plc_devices)
+'''
+QUERY_MEMORY_VERSION_SQL = '''
+    SELECT (SELECT COUNT(*) FROM plc_query_memory), (SELECT MAX(updated_at) FROM plc_query_memory),
+           (SELECT COUNT(*) FROM plc_data_items), (SELECT MAX(updated_at) FROM plc_data_items),
+           (SELECT COUNT(*) FROM plc_devices), (SELECT MAX(updated_at) FROM plc_devices)
+'''
+
+Item = Mapping[str, Any]
+
+
+def freeze_items(rows) -> Tuple[Item, ...]:
+    """조회 결과 행을 읽기 전용 항목 튜플로 변환"""
+    return tuple(MappingProxyType(dict(row)) for row in rows)
+
+
+class TagRegistry:
+    """수집 항목 캐시
+
+    - load_func(): 항목 행 목록 조회 (실패 시 None)
+    - version_func(): 구성 버전 조회 (COUNT/MAX(updated_at) 등, 실패 시 None)
+    get()은 check_interval초마다 버전만 확인하고, 버전이 바뀌었을 때만
+    load_func로 다시 조회합니다. 반환하는 항목 튜플은 다시 조회하기 전까지
+    같은 객체이므로 읽기 계획/불감대 설정 등을 객체 비교만으로 재사용할 수 있습니다.
+    조회에 실패하면 마지막으로 조회한 항목을 그대로 사용합니다.
+    """
+
+    def __init__(self, load_func: Callable[[], Optional[list]], version_func: Callable[[], Optional[tuple]],
+                 check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.load_func = load_func
+        self.version_func = version_func
+        self.check_interval = check_interval
+        self.items: Tuple[Item, ...] = ()
+        self.by_device: Dict[Any, Tuple[Item, ...]] = {}
+        self.version = None
+        self.generation = 0  # 다시 조회할 때마다 증가
+        self.loaded = False
+        self._next_check = 0.0
+        self.stats = {
+            'loads': 0,
+            'version_checks': 0,
+            'load_failures': 0
+        }
+
+    def get(self, now: Optional[float] = None) -> Tuple[Item, ...]:
+        """현재 항목 튜플 반환 (필요할 때만 버전 확인/재조회)"""
+        now = now if now is not None else time.time()
+        if now < self._next_check:
+            return self.items
+        self._next_check = now + self.check_interval
+
+        self.stats['version_checks'] += 1
+        version = self.version_func()
+        if version is None:
+            self.stats['load_failures'] += 1
+            if self.loaded:
+                return self.items
+        elif self.loaded and version == self.version:
+            return self.items
+
+        rows = self.load_func()
+        if rows is None:
+            self.stats['load_failures'] += 1
+            return self.items
+
+        self.items = freeze_items(rows)
+        by_device: Dict[Any, list] = {}
+        for item in self.items:
+            by_device.setdefault(item.get('plc_device_id'), []).append(item)
+        self.by_device = {plc_id: tuple(items) for plc_id, items in by_device.items()}
+        self.version = version
+        self.generation += 1
+        self.loaded = True
+        self.stats['loads'] += 1
+        return self.items
+
+    def invalidate(self):
+        """다음 get()에서 버전과 관계없이 다시 조회"""
+        self.loaded = False
+        self._next_check = 0.0
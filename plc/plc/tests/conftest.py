@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""plc/plc 모듈은 스크립트처럼 같은 디렉토리에서 import하므로 상위 디렉토리를 경로에 추가"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
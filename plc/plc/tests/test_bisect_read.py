@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""오류 주소 나눠 읽기 + 음성 캐시 제외 테스트 (XGT 시뮬레이터 사용)"""
+
+import asyncio
+
+import pytest
+
+from xg5000_client import XG5000Client
+from xgt_session import close_all_sessions
+from xgt_simulator import XGTSimulator
+
+
+@pytest.fixture
+def simulator():
+    simulator = XGTSimulator()
+    simulator.start()
+    simulator.write_words('D', 100, range(1000, 1020))
+    yield simulator
+    close_all_sessions()
+    simulator.stop()
+
+
+def _items(addresses, plc_id=1):
+    return tuple({'id': address, 'item_name': f'D{address}', 'item_type': 'D', 'modbus_address': address,
+                  'plc_device_id': plc_id} for address in addresses)
+
+
+def _client(monkeypatch, tmp_path, simulator):
+    monkeypatch.chdir(tmp_path)
+    return XG5000Client(plc_ip=simulator.host, plc_port=simulator.port, history=False, rollup=False)
+
+
+def test_batch_read_bisects_down_to_the_error_address_and_excludes_it(monkeypatch, tmp_path, simulator):
+    client = _client(monkeypatch, tmp_path, simulator)
+    client.read_count_mode = "all"
+    simulator.fault_addresses.add(('D', 105))
+    items = _items(range(100, 110))
+
+    rows = client.batch_read_plc_data(items)
+    values = {row['data_item_id']: (row['value'], row['quality']) for row in rows}
+    assert values[105] == (0.0, 'bad')
+    assert values[104] == (1004.0, 'good') and values[106] == (1006.0, 'good')
+    assert sum(quality == 'good' for _, quality in values.values()) == 9
+    assert ('D', 105) in client.invalid_addresses
+    assert client.stats['bisect_requests'] > 0
+
+    # 다음 스캔은 오류 주소를 빼고 계획하므로 나눠 읽지 않고, 양쪽 범위는 각각 한 번에 읽음
+    bisect_requests = client.stats['bisect_requests']
+    rows = client.batch_read_plc_data(items)
+    assert client.stats['bisect_requests'] == bisect_requests
+    assert [item['id'] for item in client.planner.excluded] == [105]
+    assert sorted(row['data_item_id'] for row in rows if row['quality'] == 'good') == \
+        [address for address in range(100, 110) if address != 105]
+
+
+def test_bisect_stops_on_transport_error_and_keeps_values_read_so_far(monkeypatch, tmp_path, simulator):
+    client = _client(monkeypatch, tmp_path, simulator)
+    items = list(_items(range(100, 104)))
+
+    def read_func(batch):
+        if any(item['id'] == 101 for item in batch):
+            raise ValueError('PLC 오류 응답')
+        if any(item['id'] == 102 for item in batch):
+            raise ConnectionResetError('connection reset')
+        return [item['id'] * 10 for item in batch]
+
+    values = client._bisect_read(items, read_func, ValueError('PLC 오류 응답'))
+
+    assert values == {100: 1000}
+    assert ('D', 101) in client.invalid_addresses
+    # 통신 오류 주소는 데이터 오류가 아니므로 음성 캐시에 등록하지 않음
+    assert ('D', 102) not in client.invalid_addresses
+
+
+def test_concurrent_read_excludes_error_address_without_tripping_breaker(monkeypatch, tmp_path, simulator):
+    client = _client(monkeypatch, tmp_path, simulator)
+    simulator.fault_addresses.add(('D', 105))
+    device = client._default_device(1)
+    items = _items(range(100, 110))
+
+    async def scan():
+        try:
+            return await client._async_read_device(device, [(1000, items)])
+        finally:
+            for conn in client.async_connections.values():
+                await conn.close()
+
+    rows = asyncio.run(scan())
+    values = {row['data_item_id']: (row['value'], row['quality']) for row in rows}
+    assert values[105] == (0.0, 'bad')
+    assert values[104] == (1004.0, 'good') and values[106] == (1006.0, 'good')
+    assert ('D', 105) in client.device_invalid_addresses[1]
+    breaker = client._breaker(simulator.host, simulator.port)
+    assert breaker.stats['failures'] == 0
+
+    # 다음 스캔은 오류 주소를 빼고 계획하므로 나눠 읽지 않음
+    bisect_requests = client.stats['bisect_requests']
+    rows = asyncio.run(scan())
+    assert client.stats['bisect_requests'] == bisect_requests
+    assert sum(row['quality'] == 'good' for row in rows) == 9
+    assert breaker.stats['failures'] == 0
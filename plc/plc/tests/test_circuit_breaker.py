@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""CircuitBreaker 상태 전이 및 Backoff 테스트"""
+
+from circuit_breaker import (CircuitBreaker, Backoff,
+                             STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN)
+
+
+def test_opens_after_consecutive_failures_reach_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, backoff_min=1.0)
+
+    assert not breaker.record_failure(now=0.0)
+    assert not breaker.record_failure(now=0.0)
+    assert breaker.state == STATE_CLOSED and breaker.allow(now=0.0)
+
+    assert breaker.record_failure(now=10.0)
+    assert breaker.state == STATE_OPEN and breaker.is_open
+    assert breaker.retry_in(now=10.25) == 0.75
+    assert breaker.stats['opened'] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    breaker.record_failure(now=0.0)
+    assert not breaker.record_success()
+    assert not breaker.record_failure(now=0.0)
+    assert breaker.state == STATE_CLOSED
+
+
+def test_open_breaker_short_circuits_until_retry_time_then_allows_one_probe():
+    breaker = CircuitBreaker(failure_threshold=1, backoff_min=2.0)
+    breaker.record_failure(now=100.0)
+
+    assert not breaker.is_ready(now=101.0)
+    assert not breaker.allow(now=101.0)
+    assert breaker.stats['short_circuited'] == 1
+
+    assert breaker.is_ready(now=102.0)
+    assert breaker.allow(now=102.0)
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.allow(now=102.0)
+    assert breaker.stats['probes'] == 1
+
+
+def test_successful_probe_closes_and_resets_backoff():
+    breaker = CircuitBreaker(failure_threshold=1, backoff_min=1.0, backoff_max=8.0)
+    breaker.record_failure(now=0.0)
+    breaker.allow(now=1.0)
+    breaker.record_failure(now=1.0)
+    breaker.allow(now=3.0)
+
+    assert breaker.record_success()
+    assert breaker.state == STATE_CLOSED and breaker.failures == 0
+    assert breaker.backoff == 1.0 and breaker.retry_in() == 0.0
+
+    breaker.record_failure(now=10.0)
+    assert breaker.retry_in(now=10.0) == 1.0
+
+
+def test_failed_probe_reopens_with_doubled_backoff_up_to_max():
+    breaker = CircuitBreaker(failure_threshold=1, backoff_min=1.0, backoff_max=4.0)
+    breaker.record_failure(now=0.0)
+
+    now = 0.0
+    waits = []
+    for _ in range(4):
+        now += breaker.retry_in(now=now)
+        assert breaker.allow(now=now)
+        # 시험 요청 실패는 새로 차단된 것이 아님 (opened 통계 유지)
+        assert not breaker.record_failure(now=now)
+        assert breaker.state == STATE_OPEN
+        waits.append(breaker.retry_in(now=now))
+
+    assert waits == [2.0, 4.0, 4.0, 4.0]
+    assert breaker.stats['opened'] == 1 and breaker.stats['probes'] == 4
+
+
+def test_backoff_doubles_until_maximum_and_resets():
+    backoff = Backoff(minimum=0.5, maximum=3.0)
+
+    assert [backoff.next() for _ in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    backoff.reset()
+    assert backoff.next() == 0.5
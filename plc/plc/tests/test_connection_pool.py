@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""ConnectionPool 대여/반납/대기/재연결 테스트"""
+
+import threading
+
+from database_config import ConnectionPool
+
+
+class _Connection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise ConnectionError('MySQL server has gone away')
+
+    def close(self):
+        self.closed = True
+
+
+class _Connector:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.created = []
+
+    def __call__(self):
+        if self.fail:
+            return None
+        connection = _Connection(len(self.created))
+        self.created.append(connection)
+        return connection
+
+
+def test_fill_and_reuse_released_connection():
+    connect = _Connector()
+    pool = ConnectionPool(connect, min_size=2, max_size=4)
+    pool.fill()
+    assert pool.size == 2 and pool.in_use == 0
+
+    first = pool.acquire()
+    pool.release(first)
+
+    assert pool.acquire() is first
+    assert len(connect.created) == 2
+    assert pool.get_stats()['checkouts'] == 2
+
+
+def test_waits_for_release_when_max_size_is_in_use():
+    pool = ConnectionPool(_Connector(), min_size=0, max_size=1)
+    held = pool.acquire()
+
+    timer = threading.Timer(0.2, pool.release, (held,))
+    timer.start()
+    try:
+        assert pool.acquire(timeout=5) is held
+    finally:
+        timer.join()
+
+    stats = pool.get_stats()
+    assert stats['waits'] == 1 and stats['wait_time_max'] >= 0.1
+    assert stats['timeouts'] == 0
+
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool = ConnectionPool(_Connector(), min_size=0, max_size=1)
+    pool.acquire()
+
+    assert pool.acquire(timeout=0.1) is None
+    assert pool.get_stats()['timeouts'] == 1
+    assert pool.get_stats()['waiting'] == 0
+
+
+def test_dead_connection_is_replaced_on_acquire():
+    connect = _Connector()
+    pool = ConnectionPool(connect, min_size=1, max_size=1)
+    pool.fill()
+    dead, = connect.created
+    dead.alive = False
+
+    connection = pool.acquire()
+
+    assert connection is not dead and dead.closed
+    assert pool.size == 1
+    assert pool.get_stats()['ping_failures'] == 1
+
+
+def test_discarded_connection_frees_its_slot():
+    pool = ConnectionPool(_Connector(), min_size=0, max_size=1)
+    broken = pool.acquire()
+
+    pool.release(broken, discard=True)
+
+    assert broken.closed and pool.size == 0
+    assert pool.acquire() is not broken
+
+
+def test_connection_context_discards_on_error():
+    pool = ConnectionPool(_Connector(), min_size=0, max_size=1)
+
+    try:
+        with pool.connection() as connection:
+            raise RuntimeError('query failed')
+    except RuntimeError:
+        pass
+
+    assert connection.closed and pool.size == 0
+
+
+def test_connect_failure_returns_none_and_releases_reservation():
+    connect = _Connector(fail=True)
+    pool = ConnectionPool(connect, min_size=0, max_size=1)
+
+    assert pool.acquire() is None
+    assert pool.size == 0
+    assert pool.get_stats()['connect_failures'] == 1
+
+    connect.fail = False
+    assert pool.acquire() is not None
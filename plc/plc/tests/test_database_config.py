@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""DatabaseConfig 스키마 마이그레이션 테스트"""
+
+from database_config import DatabaseConfig
+
+
+class _Cursor:
+    """information_schema 조회에는 exists 값을, 나머지 문장은 기록만 하는 커서"""
+
+    def __init__(self, executed, exists):
+        self.executed = executed
+        self.exists = exists
+        self.last = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, args=None):
+        self.last = sql
+        if 'information_schema' not in sql:
+            self.executed.append(' '.join(sql.split()))
+
+    def fetchone(self):
+        return (1 if self.exists else 0,)
+
+
+class _Connection:
+    def __init__(self, exists):
+        self.executed = []
+        self.exists = exists
+
+    def cursor(self, *args):
+        return _Cursor(self.executed, self.exists)
+
+    def commit(self):
+        pass
+
+
+def test_migrate_schema_runs_every_step_after_a_failure(monkeypatch):
+    calls = []
+    steps = ['ensure_real_time_unique_key', 'ensure_history_index', 'ensure_rollup_tables',
+             'ensure_deadband_columns', 'ensure_scan_class_columns']
+    for name in steps:
+        def step(connection, name=name):
+            calls.append(name)
+            return name != 'ensure_history_index'
+        step.__name__ = name
+        monkeypatch.setattr(DatabaseConfig, name, step)
+
+    assert not DatabaseConfig.migrate_schema(object())
+    assert calls == steps
+
+
+def test_existing_columns_are_not_altered_again():
+    connection = _Connection(exists=True)
+    assert DatabaseConfig.ensure_deadband_columns(connection)
+    assert DatabaseConfig.ensure_scan_class_columns(connection)
+    assert DatabaseConfig.ensure_rollup_tables(connection)
+    assert connection.executed == []
+
+
+def test_missing_columns_are_added():
+    connection = _Connection(exists=False)
+    assert DatabaseConfig.ensure_deadband_columns(connection)
+    assert DatabaseConfig.ensure_scan_class_columns(connection)
+    assert len(connection.executed) == 2
+    assert all(sql.startswith('ALTER TABLE plc_data_items') for sql in connection.executed)
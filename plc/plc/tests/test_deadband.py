@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""불감대 필터와 저장 스레드(_write_scans)의 최신값/이력/집계 분리 테스트"""
+
+from deadband import DeadbandFilter
+from xg5000_client import XG5000Client
+
+MINUTE = 1_700_000_040  # 1분 경계에 맞춘 epoch 초
+
+
+def _row(value, quality='good'):
+    return [{'data_item_id': 1, 'value': value, 'quality': quality}]
+
+
+def _client(monkeypatch, tmp_path, save_results=None):
+    """DB 없이 _write_scans를 호출할 수 있는 클라이언트 (저장된 최신값 행을 saved에 기록)"""
+    monkeypatch.chdir(tmp_path)
+    client = XG5000Client(history=False)
+    saved = []
+    results = iter(save_results or [])
+
+    def save_real_time_data(data_list, connection=None):
+        ok = next(results, True)
+        if ok:
+            saved.extend(data_list)
+        return ok
+
+    monkeypatch.setattr(client, '_borrow_storage_connection', lambda: object())
+    monkeypatch.setattr(client, '_drop_storage_connection', lambda: None)
+    monkeypatch.setattr(client, '_flush_pending', lambda force=False: None)
+    monkeypatch.setattr(client, 'save_real_time_data', save_real_time_data)
+    return client, saved
+
+
+def test_constant_tag_still_produces_full_minute_rollup(monkeypatch, tmp_path):
+    client, saved = _client(monkeypatch, tmp_path)
+
+    for second in range(60):
+        assert client._write_scans([(MINUTE + second, _row(5.0))])
+
+    # 최신값은 처음 한 번만 저장 (값이 그대로)
+    assert len(saved) == 1
+    # 1분 집계는 60개 스캔 모두로 계산
+    minute_rollup = client.rollups[0]
+    assert minute_rollup.bucket_seconds == 60
+    rows = minute_rollup.take_closed(force=True)
+    assert len(rows) == 1
+    item_id, _, min_value, max_value, sum_value, count, last_value, _ = rows[0]
+    assert (item_id, min_value, max_value, sum_value, count, last_value) == (1, 5.0, 5.0, 300.0, 60, 5.0)
+
+
+def test_coalesced_scans_are_filtered_in_order(monkeypatch, tmp_path):
+    client, saved = _client(monkeypatch, tmp_path)
+
+    scans = [(MINUTE, _row(1.0)), (MINUTE + 1, _row(1.0)), (MINUTE + 2, _row(2.0))]
+    assert client._write_scans(scans)
+
+    # 최신값은 항목당 마지막으로 통과한 값 1행, 집계는 3개 스캔 모두
+    assert [row['value'] for row in saved] == [2.0]
+    assert client.rollups[0].take_closed(force=True)[0][5] == 3
+
+
+def test_failed_write_does_not_become_reference_value(monkeypatch, tmp_path):
+    client, saved = _client(monkeypatch, tmp_path, save_results=[True, False])
+
+    assert client._write_scans([(MINUTE, _row(1.0))])
+    assert not client._write_scans([(MINUTE + 1, _row(2.0))])
+    # 2.0은 저장되지 않았으므로 2.0이 다시 오면 저장해야 함
+    assert client._write_scans([(MINUTE + 2, _row(2.0))])
+    assert [row['value'] for row in saved] == [1.0, 2.0]
+
+
+def test_pending_values_are_committed_only_on_commit():
+    deadband = DeadbandFilter(default_deadband=0.5, max_silence=0)
+    deadband.filter(_row(1.0), MINUTE)
+
+    pending = {}
+    assert deadband.filter(_row(2.0), MINUTE + 1, pending) == _row(2.0)
+    # 같은 pending 안에서는 앞 스캔에서 통과한 값이 기준
+    assert deadband.filter(_row(2.2), MINUTE + 2, pending) == []
+    # commit 전에는 마지막 저장값(1.0)이 기준
+    assert deadband.filter(_row(2.0), MINUTE + 3, {}) == _row(2.0)
+
+    deadband.commit(pending)
+    assert deadband.filter(_row(2.2), MINUTE + 4) == []
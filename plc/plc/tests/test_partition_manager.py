@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""PartitionManager 일별 파티션 관리 테스트"""
+
+from datetime import date, datetime, timedelta
+
+from database_config import PartitionManager
+
+
+class _Cursor:
+    """information_schema.partitions 조회와 MIN(timestamp) 조회에 정해진 값을 돌려주는 커서"""
+
+    def __init__(self, partitions, oldest=None):
+        self.partitions = partitions
+        self.oldest = oldest
+        self.executed = []
+        self.last = ''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, args=None):
+        self.last = sql
+        self.executed.append(' '.join(sql.split()))
+
+    def fetchall(self):
+        return list(self.partitions)
+
+    def fetchone(self):
+        return (self.oldest,)
+
+
+class _Connection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self, *args):
+        return self._cursor
+
+
+def _day_partitions(*days):
+    return [(PartitionManager.partition_name(day), '0') for day in days] + [('pmax', 'MAXVALUE')]
+
+
+def _reorganized(cursor):
+    sql, = [sql for sql in cursor.executed if 'REORGANIZE' in sql]
+    return sql
+
+
+def test_future_partitions_start_after_last_day_partition_after_downtime():
+    today = date.today()
+    last_day = today - timedelta(days=5)  # 5일 동안 관리가 멈춰 지난 날짜 행이 pmax에 쌓임
+    cursor = _Cursor(_day_partitions(last_day - timedelta(days=1), last_day))
+    manager = PartitionManager(days_ahead=2)
+
+    created = manager.create_future_partitions(cursor, 'plc_data_history')
+
+    expected_days = [last_day + timedelta(days=i) for i in range(1, 5 + 2 + 1)]
+    assert created == [PartitionManager.partition_name(day) for day in expected_days]
+    assert PartitionManager.partition_name(last_day + timedelta(days=1)) in _reorganized(cursor)
+
+
+def test_future_partitions_without_day_partitions_start_from_oldest_pmax_row():
+    today = date.today()
+    oldest = datetime.combine(today - timedelta(days=3), datetime.min.time())
+    cursor = _Cursor(_day_partitions(), oldest=oldest)
+
+    created = PartitionManager(days_ahead=1).create_future_partitions(cursor, 'plc_data_rollup_1m')
+
+    assert created[0] == PartitionManager.partition_name(oldest.date())
+    assert created[-1] == PartitionManager.partition_name(today + timedelta(days=1))
+    assert len(created) == 5
+
+
+def test_future_partitions_up_to_date_does_nothing():
+    today = date.today()
+    cursor = _Cursor(_day_partitions(*[today + timedelta(days=i) for i in range(3)]))
+    assert PartitionManager(days_ahead=2).create_future_partitions(cursor, 'plc_data_history') == []
+    assert not any('REORGANIZE' in sql for sql in cursor.executed)
+
+
+def test_maintenance_skips_unpartitioned_tables_unless_converting():
+    cursor = _Cursor([])
+    manager = PartitionManager(retention={'plc_data_history': 90}, connection=_Connection(cursor))
+
+    summary = manager.run_maintenance()
+
+    assert summary == {'plc_data_history': {'created': [], 'dropped': []}}
+    assert not any(sql.startswith('ALTER') for sql in cursor.executed)
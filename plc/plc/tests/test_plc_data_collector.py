@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""SQLite 수집기 저장 경로 테스트 (수집 시각 보존, 장치 상태 갱신과 항목 캐시)"""
+
+import time
+from datetime import datetime
+
+from plc_data_collector import PLCDataCollector
+
+
+def _collector(tmp_path):
+    collector = PLCDataCollector(db_path=str(tmp_path / 'plc.db'))
+    collector.create_sample_data()
+    return collector
+
+
+def test_write_scans_keeps_scan_time(tmp_path):
+    collector = _collector(tmp_path)
+    scan_time = time.time() - 3600  # 한 시간 전에 수집되어 늦게 저장되는 스캔
+
+    batch = [
+        (scan_time, [{'data_item_id': 1, 'value': 1.0, 'quality': 'good'}]),
+        (scan_time + 1, [{'data_item_id': 1, 'value': 2.0, 'quality': 'good'},
+                         {'data_item_id': 2, 'value': 3.0, 'quality': 'good'}])
+    ]
+    assert collector._write_scans(batch)
+
+    with collector.storage.transaction() as conn:
+        rows = dict((row[0], row[1:]) for row in conn.execute(
+            'SELECT data_item_id, value, timestamp FROM plc_real_time_data WHERE data_item_id IN (1, 2)'))
+    expected = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(scan_time + 1))
+    assert rows[1] == (2.0, expected)
+    assert rows[2] == (3.0, expected)
+    collector.storage.close()
+
+
+def test_device_status_change_does_not_reload_tags(tmp_path):
+    collector = _collector(tmp_path)
+    with collector.storage.transaction() as conn:
+        conn.execute("UPDATE plc_devices SET updated_at = '2000-01-01 00:00:00'")
+    registry = collector.tag_registry
+    registry.get(now=0)
+    generation = registry.generation
+
+    collector._update_device_status(1, 'online', datetime.now())
+    collector._update_device_status(2, 'offline', None)
+    registry.get(now=registry.check_interval * 10)
+    assert registry.generation == generation
+
+    with collector.storage.transaction() as conn:
+        assert conn.execute('SELECT status FROM plc_devices WHERE id = 1').fetchone()[0] == 'online'
+        # 설정 변경은 그대로 감지
+        conn.execute("UPDATE plc_devices SET ip_address = '192.168.1.200' WHERE id = 1")
+    registry.get(now=registry.check_interval * 20)
+    assert registry.generation == generation + 1
+    collector.storage.close()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""MariaDB 수집기 저장 경로 테스트 (항목당 최신값, 수집 시각 보존)"""
+
+import time
+from datetime import datetime
+
+import plc_data_collector_mariadb
+from plc_data_collector_mariadb import PLCDataCollector
+
+
+class _Cursor:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def executemany(self, sql, args):
+        self.calls.append((sql, list(args)))
+
+
+class _Connection:
+    def __init__(self):
+        self.calls = []
+
+    def cursor(self, *args):
+        return _Cursor(self.calls)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def test_write_scans_keeps_newest_value_and_scan_time(monkeypatch):
+    connection = _Connection()
+    monkeypatch.setattr(plc_data_collector_mariadb.DatabaseConfig, 'acquire_connection', lambda: connection)
+    monkeypatch.setattr(plc_data_collector_mariadb.DatabaseConfig, 'release_connection',
+                        lambda conn, discard=False: None)
+    scan_time = time.time() - 3600  # 한 시간 전에 수집되어 스풀에서 재저장되는 스캔
+
+    batch = [
+        (scan_time, [{'data_item_id': 1, 'value': 1.0, 'quality': 'good'}]),
+        (scan_time + 1, [{'data_item_id': 1, 'value': 2.0, 'quality': 'good'},
+                         {'data_item_id': 2, 'value': 3.0, 'quality': 'good'}])
+    ]
+    assert PLCDataCollector()._write_scans(batch)
+
+    (sql, args), = connection.calls
+    assert 'timestamp = VALUES(timestamp)' in sql
+    expected = datetime.fromtimestamp(scan_time + 1)
+    assert args == [(1, 2.0, 'good', expected), (2, 3.0, 'good', expected)]
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""ReadPlanner 영역 분리/갭 병합/최대 WORD 분할 및 음성 캐시 제외 테스트"""
+
+from read_planner import InvalidAddressCache, ReadPlanner
+
+
+def _item(item_id, item_type, address):
+    return {'id': item_id, 'item_type': item_type, 'modbus_address': address}
+
+
+def _ranges(plan):
+    return [(batch[0]['item_type'], [item['modbus_address'] for item in batch]) for batch in plan]
+
+
+def test_items_within_gap_budget_are_merged_and_areas_are_kept_apart():
+    planner = ReadPlanner(gap_budget=4)
+    items = [_item(1, 'D', 10), _item(2, 'D', 15), _item(3, 'M', 11), _item(4, 'D', 12)]
+
+    assert _ranges(planner.plan(items)) == [('D', [10, 12, 15]), ('M', [11])]
+
+
+def test_gap_larger_than_budget_starts_a_new_batch():
+    planner = ReadPlanner(gap_budget=4)
+    items = [_item(1, 'D', 0), _item(2, 'D', 5), _item(3, 'D', 11)]
+
+    # 0→5: 빈 WORD 4개 (병합), 5→11: 빈 WORD 5개 (분리)
+    assert _ranges(planner.plan(items)) == [('D', [0, 5]), ('D', [11])]
+
+
+def test_batch_span_never_exceeds_max_words():
+    planner = ReadPlanner(gap_budget=16, max_words=20)
+    items = [_item(i, 'D', i * 10) for i in range(6)]
+
+    plan = planner.plan(items)
+
+    assert _ranges(plan) == [('D', [0, 10]), ('D', [20, 30]), ('D', [40, 50])]
+    for batch in plan:
+        assert batch[-1]['modbus_address'] - batch[0]['modbus_address'] + 1 <= 20
+
+
+def test_items_without_address_or_type_are_read_alone():
+    planner = ReadPlanner()
+    no_address = _item(1, 'D', None)
+    no_type = _item(2, None, 3)
+
+    plan = planner.plan([no_address, _item(3, 'D', 1), no_type, _item(4, 'D', 2)])
+
+    assert [no_address] in plan and [no_type] in plan
+    assert _ranges([batch for batch in plan if len(batch) > 1]) == [('D', [1, 2])]
+
+
+def test_plan_is_cached_until_tag_configuration_changes():
+    planner = ReadPlanner()
+    items = (_item(1, 'D', 0), _item(2, 'D', 1))
+
+    first = planner.plan(items)
+    assert planner.plan(items) is first
+    assert planner.plan(list(items)) is first
+    assert planner.stats == {'plans_built': 1, 'cache_hits': 2}
+
+    planner.plan([_item(1, 'D', 0), _item(2, 'D', 40)])
+    assert planner.stats['plans_built'] == 2
+
+
+def test_invalid_addresses_are_excluded_and_split_the_batch():
+    invalid = InvalidAddressCache(ttl=60)
+    planner = ReadPlanner(gap_budget=4, invalid=invalid)
+    items = (_item(1, 'D', 0), _item(2, 'D', 1), _item(3, 'D', 2), _item(4, 'M', 1))
+
+    assert _ranges(planner.plan(items)) == [('D', [0, 1, 2]), ('M', [1])]
+    assert planner.excluded == []
+
+    # 캐시가 바뀌면 같은 목록이라도 계획을 다시 만듦 (다른 영역의 같은 주소는 영향 없음)
+    invalid.add('D', 1)
+    assert _ranges(planner.plan(items)) == [('D', [0]), ('D', [2]), ('M', [1])]
+    assert [item['id'] for item in planner.excluded] == [2]
+
+
+def test_invalid_addresses_expire_after_ttl():
+    invalid = InvalidAddressCache(ttl=10)
+
+    assert invalid.add('D', 5, now=100.0)
+    assert not invalid.add('D', 5, now=101.0)
+    version = invalid.version
+
+    assert not invalid.expire(now=109.0)
+    assert ('D', 5) in invalid
+
+    assert invalid.expire(now=110.0)
+    assert ('D', 5) not in invalid and len(invalid) == 0
+    assert invalid.version > version
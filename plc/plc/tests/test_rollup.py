@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""RollupAggregator 구간 누적/병합 테스트"""
+
+from datetime import datetime
+
+from rollup import RollupAggregator, UPSERT_SQL, select_source_table
+
+BASE = 1700000040.0  # 1분/1시간 구간 경계가 아닌 시각 (분 경계)
+
+
+def _rows(item_id, value, quality='good'):
+    return [{'data_item_id': item_id, 'value': value, 'quality': quality}]
+
+
+def test_scans_in_one_bucket_merge_into_one_row():
+    aggregator = RollupAggregator(60)
+    for offset, value in [(0, 3.0), (10, 1.0), (20, 5.0), (30, 2.0)]:
+        aggregator.add(BASE + offset, _rows(1, value))
+    aggregator.add(BASE + 40, _rows(1, 100.0, 'bad'))  # good만 집계
+
+    row, = aggregator.take_closed(force=True)
+    assert row[:7] == (1, datetime.fromtimestamp(BASE), 1.0, 5.0, 11.0, 4, 2.0)
+    assert row[7] == datetime.fromtimestamp(BASE + 30)
+    assert len(aggregator) == 0
+
+
+def test_buckets_split_by_item_and_period():
+    aggregator = RollupAggregator(60)
+    aggregator.add(BASE, _rows(1, 1.0) + _rows(2, 2.0))
+    aggregator.add(BASE + 60, _rows(1, 3.0))
+
+    # 닫힌 구간만 꺼냄 (구간 끝 + close_delay 이후)
+    closed = aggregator.take_closed(now=BASE + 60 + aggregator.close_delay)
+    assert sorted((row[0], row[1]) for row in closed) == [(1, datetime.fromtimestamp(BASE)),
+                                                          (2, datetime.fromtimestamp(BASE))]
+    assert len(aggregator) == 1
+
+
+def test_out_of_order_scan_does_not_replace_last_value():
+    aggregator = RollupAggregator(60)
+    aggregator.add(BASE + 30, _rows(1, 7.0))
+    aggregator.add(BASE + 10, _rows(1, 4.0))  # 스풀에서 늦게 재저장된 오래된 스캔
+
+    row, = aggregator.take_closed(force=True)
+    assert (row[6], row[7]) == (7.0, datetime.fromtimestamp(BASE + 30))
+
+
+def test_restore_merges_failed_rows_and_keeps_newest_last_value():
+    aggregator = RollupAggregator(60)
+    aggregator.add(BASE + 10, _rows(1, 4.0))
+    failed = aggregator.take_closed(force=True)
+    aggregator.add(BASE + 20, _rows(1, 6.0))
+
+    aggregator.restore(failed)
+
+    row, = aggregator.take_closed(force=True)
+    assert row[2:7] == (4.0, 6.0, 10.0, 2, 6.0)
+
+    older = RollupAggregator(60)
+    older.add(BASE + 5, _rows(1, 1.0))
+    aggregator.add(BASE + 30, _rows(1, 9.0))
+    aggregator.restore(older.take_closed(force=True))
+    row, = aggregator.take_closed(force=True)
+    assert (row[5], row[6]) == (2, 9.0)
+
+
+def test_upsert_keeps_newer_last_value():
+    assert 'IF(last_ts IS NULL OR VALUES(last_ts) >= last_ts, VALUES(last_value), last_value)' in UPSERT_SQL
+    # last_value를 last_ts보다 먼저 갱신해야 비교가 기존 last_ts 기준이 됨
+    assert UPSERT_SQL.index('last_value = IF') < UPSERT_SQL.index('last_ts = IF')
+
+
+def test_select_source_table_by_resolution():
+    assert select_source_table(10) == ('plc_data_history', 0)
+    assert select_source_table(300) == ('plc_data_rollup_1m', 60)
+    assert select_source_table(7200) == ('plc_data_rollup_1h', 3600)
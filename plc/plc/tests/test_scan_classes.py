@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""ScanClassSchedule 등급 구성/교차 실행 테스트"""
+
+import logging
+
+from scan_classes import ScanClassSchedule
+
+
+def _items(*periods):
+    return tuple({'id': i, 'plc_device_id': 1 + i % 2, 'scan_class_ms': period}
+                 for i, period in enumerate(periods))
+
+
+def test_base_is_gcd_of_class_periods_and_default_interval():
+    schedule = ScanClassSchedule(1000)
+    schedule.configure(_items(100, 10000, 60000, None))
+
+    assert list(schedule.classes) == [100, 1000, 10000, 60000]
+    assert schedule.base_ms == 100
+    assert schedule._slots == {100: (1, 0), 1000: (10, 1), 10000: (100, 2), 60000: (600, 3)}
+
+
+def test_slow_classes_are_phase_shifted_so_they_do_not_share_a_scan():
+    schedule = ScanClassSchedule(100)
+    schedule.configure(_items(100, 1000, 10000))
+
+    due_ticks = {period: [] for period in schedule.classes}
+    for tick in range(200):
+        for period, _ in schedule.due(tick * 0.1):
+            due_ticks[period].append(tick)
+
+    assert len(due_ticks[100]) == 200
+    assert due_ticks[1000] == list(range(1, 200, 10))
+    assert due_ticks[10000] == [2, 102]
+    assert not set(due_ticks[1000]) & set(due_ticks[10000])
+
+
+def test_nearby_periods_are_rounded_to_a_minimum_base(caplog):
+    schedule = ScanClassSchedule(1000)
+    with caplog.at_level(logging.WARNING, logger='XG5000Client.scan_classes'):
+        schedule.configure(_items(1000, 1001, 1004))
+
+    assert list(schedule.classes) == [1000]
+    assert len(schedule.classes[1000]) == 3
+    assert schedule.base_ms == 1000
+    assert '1001ms → 1000ms' in caplog.text
+
+
+def test_base_never_drops_below_minimum():
+    schedule = ScanClassSchedule(3)
+    schedule.configure(_items(None, 25, 1))
+    assert schedule.base_ms >= 10
+    assert all(period % 10 == 0 for period in schedule.classes)
+
+
+def test_items_split_by_device_and_reused_for_the_same_tuple():
+    schedule = ScanClassSchedule(1000)
+    items = _items(1000, 1000, 5000)
+    assert schedule.configure(items)
+    assert not schedule.configure(items)
+
+    assert {plc_id: len(group) for plc_id, group in schedule.by_device[1000].items()} == {1: 1, 2: 1}
+    assert list(schedule.by_device[5000]) == [1]
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""WriteBehindQueue 넘침 정책/스풀 재저장/격리 테스트"""
+
+import os
+import threading
+
+from storage_queue import (WriteBehindQueue, RejectedBatchError,
+                           POLICY_DROP_OLDEST, POLICY_BLOCK, POLICY_SPILL)
+from storage_spool import QUARANTINE_FILE
+
+
+class _Database:
+    """item 99가 들어 있는 배치는 거부하고, down이면 연결 오류(False)를 내는 가짜 DB"""
+
+    def __init__(self):
+        self.down = False
+        self.written = []
+
+    def write(self, batch):
+        if self.down:
+            return False
+        if any(row['data_item_id'] == 99 for _, rows in batch for row in rows):
+            raise RejectedBatchError('foreign key constraint fails')
+        self.written.extend(scan_time for scan_time, _ in batch)
+        return True
+
+
+def _scans(times, bad=()):
+    return [(float(t), [{'data_item_id': 99 if t in bad else 1, 'value': float(t), 'quality': 'good'}])
+            for t in times]
+
+
+def _queued_times(queue):
+    return [scan_time for scan_time, _ in queue._queue]
+
+
+def test_drop_oldest_policy_discards_the_oldest_scan(tmp_path):
+    queue = WriteBehindQueue(lambda batch: True, maxsize=2, policy=POLICY_DROP_OLDEST, spool_dir=str(tmp_path))
+
+    for scan_time, rows in _scans(range(4)):
+        assert queue.put(rows, scan_time)
+
+    assert _queued_times(queue) == [2.0, 3.0]
+    assert queue.stats['dropped_scans'] == 2
+    assert not queue.spooling
+
+
+def test_spill_policy_moves_queue_and_overflow_to_spool_in_order(tmp_path):
+    queue = WriteBehindQueue(lambda batch: True, maxsize=2, policy=POLICY_SPILL, spool_dir=str(tmp_path))
+
+    for scan_time, rows in _scans(range(4)):
+        assert queue.put(rows, scan_time)
+
+    # 넘친 시점의 큐 내용이 먼저 기록되고, 이후 스캔도 순서를 지키려고 스풀로 감
+    assert queue.depth == 0 and queue.spooling
+    assert queue.stats['spooled_scans'] == 4 and queue.stats['dropped_scans'] == 0
+    queue.spool.seal()
+    path, = queue.spool.sealed_segments()
+    assert [scan_time for scan_time, _ in queue.spool.read_segment(path)] == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_block_policy_waits_for_the_writer_to_make_room(tmp_path):
+    queue = WriteBehindQueue(lambda batch: True, maxsize=2, policy=POLICY_BLOCK,
+                             max_batch_scans=1, spool_dir=str(tmp_path))
+    queue._running = True
+    scans = _scans(range(3))
+    for scan_time, rows in scans[:2]:
+        queue.put(rows, scan_time)
+
+    taken = []
+    timer = threading.Timer(0.2, lambda: taken.extend(queue._take_batch()))
+    timer.start()
+    try:
+        assert queue.put(scans[2][1], scans[2][0])
+    finally:
+        timer.join()
+
+    assert [scan_time for scan_time, _ in taken] == [0.0]
+    assert _queued_times(queue) == [1.0, 2.0]
+    assert queue.stats['blocked_time'] >= 0.1
+    assert queue.stats['dropped_scans'] == 0
+
+
+def test_block_policy_drops_when_writer_is_not_running(tmp_path):
+    queue = WriteBehindQueue(lambda batch: True, maxsize=1, policy=POLICY_BLOCK, spool_dir=str(tmp_path))
+
+    scans = _scans(range(2))
+    assert queue.put(scans[0][1], scans[0][0])
+    assert not queue.put(scans[1][1], scans[1][0])
+
+    assert _queued_times(queue) == [0.0]
+    assert queue.stats['dropped_scans'] == 1
+
+
+def test_rejected_scan_is_quarantined_and_the_rest_written(tmp_path):
+    db = _Database()
+    queue = WriteBehindQueue(db.write, spool_dir=str(tmp_path))
+
+    assert queue._write_batch(_scans(range(8), bad={5})) == 8
+
+    assert db.written == [0, 1, 2, 3, 4, 6, 7]
+    assert queue.stats['quarantined_scans'] == 1
+    quarantined = queue.spool.read_segment(os.path.join(str(tmp_path), QUARANTINE_FILE))
+    assert [scan_time for scan_time, _ in quarantined] == [5.0]
+
+
+def test_replay_moves_past_a_rejected_scan(tmp_path):
+    db = _Database()
+    queue = WriteBehindQueue(db.write, spool_dir=str(tmp_path), replay_batch_scans=4)
+    queue.spool.append(_scans(range(10), bad={2}))
+    queue.spool.seal()
+    queue._spooling = True
+
+    assert queue._replay_spool()
+    assert queue._replay_spool()  # 남은 세그먼트가 없으면 메모리 큐로 복귀
+
+    assert not queue.spooling
+    assert not queue.spool.has_data()
+    assert db.written == [0, 1, 3, 4, 5, 6, 7, 8, 9]
+    assert queue.stats['replayed_scans'] == 10
+
+
+def test_transient_failure_keeps_unwritten_scans_in_spool(tmp_path):
+    db = _Database()
+    queue = WriteBehindQueue(db.write, spool_dir=str(tmp_path), replay_batch_scans=4)
+    queue.spool.append(_scans(range(6)))
+    queue.spool.seal()
+    path, = queue.spool.sealed_segments()
+
+    written = []
+
+    def write(batch):
+        # 첫 묶음 저장 후 DB 장애
+        db.down = bool(written)
+        written.append(batch)
+        return db.write(batch)
+    queue.write_func = write
+
+    assert not queue._replay_spool()
+    assert [scan_time for scan_time, _ in queue.spool.read_segment(path)] == [4.0, 5.0]
+    assert queue.stats['quarantined_scans'] == 0
+    assert not os.path.exists(os.path.join(str(tmp_path), QUARANTINE_FILE))
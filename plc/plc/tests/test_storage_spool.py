@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""DiskSpool 세그먼트 기록/읽기 및 손상 레코드 처리 테스트"""
+
+from storage_spool import DiskSpool, SEGMENT_MAGIC, RECORD_HEADER, ROW
+
+
+def _scans():
+    return [
+        (1000.25, [{'data_item_id': 1, 'value': 1.5, 'quality': 'good'},
+                   {'data_item_id': 2, 'value': -3.0, 'quality': 'bad'}]),
+        (1001.5, [{'data_item_id': 3, 'value': 42.0, 'quality': 'uncertain'}]),
+        (1002.75, [{'data_item_id': 1, 'value': 2.5, 'quality': 'good'}])
+    ]
+
+
+def _sealed_segment(spool, scans):
+    spool.append(scans)
+    spool.seal()
+    path, = spool.sealed_segments()
+    return path
+
+
+def test_round_trip_preserves_scan_times_and_rows(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    path = _sealed_segment(spool, _scans())
+
+    assert spool.read_segment(path) == _scans()
+    assert spool.stats['appended_scans'] == 3
+    assert spool.stats['corrupt_records'] == 0
+
+
+def test_active_segment_is_not_offered_for_replay(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    spool.append(_scans()[:1])
+
+    assert spool.has_data()
+    assert spool.sealed_segments() == []
+    assert spool.seal()
+    assert not spool.seal()
+    assert len(spool.sealed_segments()) == 1
+
+
+def test_truncated_tail_record_is_dropped(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    path = _sealed_segment(spool, _scans())
+
+    # 마지막 레코드 기록 도중 중단 (행 데이터 일부만 남음)
+    with open(path, 'r+b') as f:
+        f.truncate(len(SEGMENT_MAGIC) + 3 * RECORD_HEADER.size + 4 * ROW.size - 5)
+
+    assert spool.read_segment(path) == _scans()[:2]
+    assert spool.stats['corrupt_records'] == 1
+
+
+def test_truncated_header_is_dropped(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    path = _sealed_segment(spool, _scans()[:1])
+
+    with open(path, 'ab') as f:
+        f.write(b'\x01\x00\x00')
+
+    assert spool.read_segment(path) == _scans()[:1]
+    assert spool.stats['corrupt_records'] == 1
+
+
+def test_crc_mismatch_stops_reading_at_the_damaged_record(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    path = _sealed_segment(spool, _scans())
+
+    # 두 번째 레코드의 값 1바이트 손상
+    offset = len(SEGMENT_MAGIC) + RECORD_HEADER.size + 2 * ROW.size + RECORD_HEADER.size + 6
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+    assert spool.read_segment(path) == _scans()[:1]
+    assert spool.stats['corrupt_records'] == 1
+
+
+def test_bad_magic_yields_nothing(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    path = _sealed_segment(spool, _scans())
+    with open(path, 'r+b') as f:
+        f.write(b'XXXXXXXX')
+
+    assert spool.read_segment(path) == []
+    assert spool.stats['corrupt_records'] == 1
+
+
+def test_rewrite_keeps_only_remaining_scans(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    path = _sealed_segment(spool, _scans())
+
+    spool.rewrite(path, _scans()[1:])
+
+    assert spool.read_segment(path) == _scans()[1:]
+    spool.remove(path)
+    assert not spool.has_data()
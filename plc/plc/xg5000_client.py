@@ -7,17 +7,38 @@ XG5000 PLC 클라이언트 - 배치 통신 및 MariaDB 연동 (상세 로깅)
 import socket
 import struct
 import time
+import asyncio
 import threading
 import logging
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
-from database_config import DatabaseConfig
+from database_config import DatabaseConfig, PartitionManager, DATA_ERRORS
+from xgt_session import get_session, close_all_sessions
+from read_planner import ReadPlanner, InvalidAddressCache, xgt_area, DEFAULT_GAP_BUDGET
+from xgt_async import AsyncXGTConnection, TRANSPORT_ERRORS
+from xgt_codec import decode_words
+from storage_queue import (
+    WriteBehindQueue, HistoryBuffer, DEFAULT_QUEUE_SIZE, DEFAULT_MAX_BATCH_SCANS, POLICY_DROP_OLDEST,
+    QUEUE_POLICIES, DEFAULT_HISTORY_FLUSH_SCANS, DEFAULT_HISTORY_FLUSH_MS, RejectedBatchError
+)
+from rollup import RollupAggregator, ROLLUP_TABLES, UPSERT_SQL as ROLLUP_UPSERT_SQL
+from deadband import DeadbandFilter, DEFAULT_DEADBAND, DEFAULT_MAX_SILENCE
+from tag_registry import TagRegistry, QUERY_MEMORY_VERSION_SQL
+from scan_scheduler import ScanScheduler, OVERRUN_SKIP, OVERRUN_POLICIES
+from scan_classes import ScanClassSchedule
+from circuit_breaker import (
+    CircuitBreaker, CircuitOpenError, Backoff, STATE_OPEN, STATE_HALF_OPEN,
+    DEFAULT_FAILURE_THRESHOLD, DEFAULT_BACKOFF_MAX
+)
 import pymysql
 
 # PLC 연결 설정
 PLC_IP = "192.168.1.2"
 PLC_PORT = 2004  # XGT Dedicated
+DB_RETRY_INTERVAL = 10.0  # DB 장애 시 수집 스레드의 재연결 시도 간격 (초)
+PARTITION_MAINTENANCE_INTERVAL = 3600.0  # 이력/집계 테이블 파티션 관리 주기 (초)
+PARTITION_RETRY_INTERVAL = 60.0  # 파티션 관리를 하지 못했을 때 (DB 장애 등) 재시도 간격 (초)
 
 class XG5000Logger:
     """XG5000 PLC 클라이언트 전용 로거 클래스"""
@@ -139,29 +160,71 @@ class XG5000Logger:
 class XG5000Client:
     """XG5000 PLC 클라이언트 클래스"""
     
-    def __init__(self, read_count_mode: str = "1"):
+    def __init__(self, read_count_mode: str = "1", plc_ip: str = PLC_IP, plc_port: int = PLC_PORT,
+                 gap_budget: int = DEFAULT_GAP_BUDGET, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 queue_policy: str = POLICY_DROP_OLDEST, coalesce_scans: int = DEFAULT_MAX_BATCH_SCANS,
+                 history: bool = True, history_scans: int = DEFAULT_HISTORY_FLUSH_SCANS,
+                 history_ms: int = DEFAULT_HISTORY_FLUSH_MS, rollup: bool = True,
+                 report_by_exception: bool = True, deadband: float = DEFAULT_DEADBAND,
+                 max_silence: float = DEFAULT_MAX_SILENCE, overrun_policy: str = OVERRUN_SKIP,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, backoff_max: float = DEFAULT_BACKOFF_MAX):
+        self.plc_ip = plc_ip
+        self.plc_port = plc_port
         self.connection = None
+        self.storage_connection = None  # 저장 스레드가 저장할 때마다 연결 풀에서 빌리는 연결 (pymysql 연결은 스레드 간 공유 불가)
+        self.history_buffer = HistoryBuffer(history_scans, history_ms) if history else None
+        self.rollups = [RollupAggregator(bucket) for bucket in sorted(ROLLUP_TABLES)] if rollup else []
+        self.partition_thread = None  # 이력/집계 테이블 파티션 관리 스레드 (저장 스레드와 별도 연결 사용)
+        self.partition_stop = threading.Event()
+        self.deadband_filter = DeadbandFilter(deadband, max_silence) if report_by_exception else None
+        self.storage_queue = WriteBehindQueue(self._write_scans, maxsize=queue_size,
+                                              policy=queue_policy, max_batch_scans=coalesce_scans,
+                                              flush_func=self._flush_pending)
         self.running = False
         self.collection_thread = None
         self.collection_interval = 1000  # 밀리초
+        self.overrun_policy = overrun_policy
+        self.scan_scheduler = None  # 수집 시작 시 collection_interval로 생성
+        self.scan_classes = None    # 수집 시작 시 생성 (scan_class_ms가 없는 항목은 collection_interval 등급)
         self.read_count_mode = read_count_mode  # "1" or "all"
+        self.invalid_addresses = InvalidAddressCache()  # 기본 PLC에서 오류로 응답한 주소 (배치 읽기 계획에서 제외)
+        self.planner = ReadPlanner(gap_budget=gap_budget, max_words=MAX_BLOCK_READ_BYTES // 2,
+                                   invalid=self.invalid_addresses)
+        self.class_planners = {}  # 스캔 등급별 읽기 계획기
+        self.device_planners = {}  # 동시 수집 모드: (PLC 장치, 스캔 등급)별 읽기 계획기
+        self.device_invalid_addresses = {}  # 동시 수집 모드: PLC 장치별 음성 캐시 (장치의 계획기들이 공유)
+        self.async_connections = {}  # 동시 수집 모드: PLC 장치별 비동기 연결
+        self.failure_threshold = failure_threshold
+        self.backoff_max = backoff_max
+        self.breakers = {}  # PLC 주소 (ip, port) -> 연결 차단기 (응답 없는 PLC는 백오프 후 시험 요청만)
+        self.error_backoff = Backoff(maximum=backoff_max)  # 수집 루프 오류 시 재시도 대기
+        self.tag_registry = TagRegistry(self._query_tag_items, self._query_tag_version)
+        self.cached_devices = []
+        self.device_map = {}  # 동시 수집 모드: 장치 ID -> 장치 정보 (항목 재조회 시 갱신)
+        self.device_map_generation = -1
+        self.db_retry_at = 0.0
+        self.schema_migrated = None  # 스키마 마이그레이션 결과 (None: 아직 DB에 연결하지 못함)
         self.logger = XG5000Logger()
         self.stats = {
             'total_requests': 0,
             'successful_requests': 0,
             'failed_requests': 0,
             'total_collection_time': 0.0,
-            'collection_count': 0
+            'collection_count': 0,
+            'short_circuited_scans': 0,
+            'bisect_requests': 0
         }
         
     def connect_database(self) -> bool:
         """MariaDB 연결"""
         start_time = time.time()
         try:
-            self.connection = DatabaseConfig.create_connection()
+            self.connection = DatabaseConfig.acquire_connection()
             success = self.connection is not None
             duration = time.time() - start_time
             
+            if success and not self.schema_migrated:
+                success = self._migrate_schema()
             if success:
                 self.logger.log_database_operation("연결", "MariaDB", 0, True, f"연결 시간: {duration:.3f}초")
             else:
@@ -174,10 +237,19 @@ class XG5000Client:
             self.logger.log_database_operation("연결", "MariaDB", 0, False, f"연결 시간: {duration:.3f}초, 오류: {e}")
             return False
     
+    def _migrate_schema(self) -> bool:
+        """처음 연결했을 때 한 번만 스키마 마이그레이션 (실패하면 연결을 반납하고 항목을 조회하지 않음)"""
+        self.schema_migrated = DatabaseConfig.migrate_schema(self.connection)
+        if not self.schema_migrated:
+            self.logger.log_error("스키마 마이그레이션", "실패한 단계가 있어 수집 항목을 조회하지 않습니다")
+            DatabaseConfig.release_connection(self.connection)
+            self.connection = None
+        return self.schema_migrated
+    
     def disconnect_database(self):
         """데이터베이스 연결 해제"""
         if self.connection:
-            self.connection.close()
+            DatabaseConfig.release_connection(self.connection)
             self.connection = None
             self.logger.log_database_operation("연결 해제", "MariaDB", 0, True)
     
@@ -195,12 +267,19 @@ class XG5000Client:
                 cursor.execute('''
                     SELECT
                         pdi.id,
+                        pdi.plc_device_id,
                         pdi.item_name,
                         pdi.item_type,
                         pdi.address,
                         pdi.modbus_address,
                         pdi.modbus_function,
                         pdi.description,
+                        pdi.unit,
+                        pdi.min_value,
+                        pdi.max_value,
+                        pdi.deadband,
+                        pdi.deadband_type,
+                        COALESCE(pqm.scan_class_ms, pdi.scan_class_ms) AS scan_class_ms,
                         pqm.id as query_memory_id,
                         pqm.item_name as query_item_name,
                         pqm.memory_address
@@ -222,22 +301,81 @@ class XG5000Client:
             duration = time.time() - start_time
             self.logger.log_error("조회 메모리 항목 조회", str(e))
             self.logger.log_database_operation("조회", "plc_query_memory + plc_data_items", 0, False, f"조회 시간: {duration:.3f}초, 오류: {e}")
+            self._drop_connection()
             return []
     
-    def batch_read_plc_data(self, data_items: List[Dict]) -> List[Dict]:
+    def _drop_connection(self):
+        """조회 실패한 연결을 버리고 다음 회차에 재연결"""
+        if self.connection is not None:
+            DatabaseConfig.release_connection(self.connection, discard=True)
+            self.connection = None
+    
+    def _load_data_items(self, plc_device_id: int = 1) -> tuple:
+        """수집 대상 항목 (레지스트리 캐시)
+        
+        매 스캔 조회하지 않고 구성 버전(행 수/마지막 수정 시각)이 바뀔 때만 다시 조회하며,
+        DB 장애 중에는 마지막으로 조회한 항목으로 계속 수집합니다.
+        """
+        if self.connection is None and time.time() >= self.db_retry_at:
+            if not self.connect_database():
+                self.db_retry_at = time.time() + DB_RETRY_INTERVAL
+        return self.tag_registry.get()
+    
+    def _query_tag_version(self) -> Optional[tuple]:
+        """수집 항목 구성 버전 조회 (실패 시 None)"""
+        if self.connection is None:
+            return None
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(QUERY_MEMORY_VERSION_SQL)
+                return tuple(cursor.fetchone())
+        except Exception as e:
+            self.logger.log_error("수집 항목 버전 조회", str(e))
+            self._drop_connection()
+            return None
+    
+    def _query_tag_items(self) -> Optional[List[Dict]]:
+        """수집 항목 전체 조회 (실패 시 None)"""
+        if self.connection is None:
+            return None
+        items = self.get_query_memory_items()
+        return items if self.connection is not None else None
+    
+    def get_plc_devices(self) -> List[Dict]:
+        """plc_devices 테이블에서 PLC 장치 목록 조회 (DB 장애 시 마지막 조회 결과)"""
+        if self.connection is None:
+            return self.cached_devices
+        try:
+            with self.connection.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute('''
+                    SELECT id, name, ip_address, port, protocol
+                    FROM plc_devices
+                    ORDER BY id
+                ''')
+                self.cached_devices = cursor.fetchall()
+                return self.cached_devices
+        except Exception as e:
+            self.logger.log_error("PLC 장치 조회", str(e))
+            return self.cached_devices
+    
+    def batch_read_plc_data(self, data_items: List[Dict], planner: Optional[ReadPlanner] = None) -> List[Dict]:
         """PLC 데이터 항목들을 읽기
         
         read_count_mode에 따라:
         - "1": 각 항목을 개별적으로 읽기
-        - "all": 연속된 주소들을 배치로 묶어서 한 번에 읽기
+        - "all": 연속된 주소들을 배치로 묶어서 한 번에 읽기 (planner: 사용할 읽기 계획기, 기본 self.planner)
         """
         if self.read_count_mode == "all":
-            return self._batch_read_all(data_items)
+            return self._batch_read_all(data_items, planner)
         else:
             return self._read_one_by_one(data_items)
     
     def _read_one_by_one(self, data_items: List[Dict]) -> List[Dict]:
-        """PLC 데이터 항목들을 개별적으로 읽기"""
+        """PLC 데이터 항목들을 개별적으로 읽기
+
+        항목별 요청 프레임을 하나의 세션으로 파이프라이닝하여 전송하고,
+        세션 오류 시에는 항목별 개별 읽기로 폴백합니다.
+        """
         start_time = time.time()
         collected_data = []
         success_count = 0
@@ -245,11 +383,35 @@ class XG5000Client:
         
         self.logger.logger.info(f"데이터 읽기 시작 (개별 읽기): 총 {len(data_items)}개 항목")
         
-        # 각 항목을 개별적으로 읽기
+        # 주소 정보가 있는 항목만 파이프라이닝 대상
+        readable = [item for item in data_items
+                    if item.get('modbus_address') is not None and item.get('item_type') is not None]
+        responses = {}
+        if readable:
+            try:
+                frames = [frame_cache.read_word(self._convert_to_xgt_address(item['item_type'], item['modbus_address']), 1)
+                          for item in readable]
+                session = get_session(self.plc_ip, self.plc_port)
+                for item, resp in zip(readable, self._plc_io(session.transact_many, frames)):
+                    responses[item['id']] = resp
+            except Exception as e:
+                self.logger.logger.warning(f"파이프라인 읽기 실패, 개별 읽기로 전환: {e}")
+                responses = {}
+        
+        # 각 항목 결과 처리
         for item in data_items:
             try:
                 item_start_time = time.time()
-                value = self._read_single_item_from_plc(item)
+                resp = responses.get(item['id'])
+                if resp is not None:
+                    try:
+                        values = parse_read_word_response(resp)["values"]
+                        value = values[0] if values else None
+                    except Exception as e:
+                        self.logger.log_error("PLC 항목 읽기", f"{item.get('item_name', 'unknown')} 응답 오류: {e}")
+                        value = None
+                else:
+                    value = self._read_single_item_from_plc(item)
                 item_duration = time.time() - item_start_time
                 
                 if value is not None:
@@ -284,7 +446,7 @@ class XG5000Client:
         
         return collected_data
     
-    def _batch_read_all(self, data_items: List[Dict]) -> List[Dict]:
+    def _batch_read_all(self, data_items: List[Dict], planner: Optional[ReadPlanner] = None) -> List[Dict]:
         """PLC 데이터 항목들을 배치로 묶어서 한 번에 읽기"""
         start_time = time.time()
         collected_data = []
@@ -294,9 +456,49 @@ class XG5000Client:
         self.logger.logger.info(f"데이터 읽기 시작 (배치 읽기): 총 {len(data_items)}개 항목")
         
         # 연속된 주소들을 배치 그룹으로 생성
-        batches = self._create_batch_groups(data_items)
+        planner = planner or self.planner
+        batches = self._create_batch_groups(data_items, planner)
         self.logger.logger.info(f"배치 그룹 생성 완료: {len(batches)}개 배치")
         
+        # 음성 캐시에 있는 주소(이전에 PLC가 오류로 응답)는 읽지 않고 bad 품질로 기록
+        if planner.excluded:
+            self._append_results(collected_data, planner.excluded, {})
+            error_count += len(planner.excluded)
+        
+        # 단독 항목(비연속 주소)은 16개씩 다중 블록 요청으로 묶어서 읽기
+        scattered = []
+        contiguous = []
+        for batch in batches:
+            if (len(batch) == 1 and batch[0].get('modbus_address') is not None
+                    and batch[0].get('item_type') is not None):
+                scattered.append(batch[0])
+            else:
+                contiguous.append(batch)
+        batches = contiguous
+        if scattered:
+            try:
+                multi_start_time = time.time()
+                addr_list = [self._convert_to_xgt_address(item['item_type'], item['modbus_address'])
+                             for item in scattered]
+                values = self._plc_io(xgt_read_multi, addr_list, self.plc_ip, self.plc_port)
+                for item, value in zip(scattered, values):
+                    collected_data.append({
+                        'data_item_id': item['id'],
+                        'value': float(value),
+                        'quality': 'good'
+                    })
+                    success_count += 1
+                multi_duration = time.time() - multi_start_time
+                self.logger.logger.info(f"다중 블록 읽기 성공: {len(scattered)}개 항목, "
+                                        f"{(len(scattered) + MAX_READ_BLOCKS - 1) // MAX_READ_BLOCKS}회 요청, {multi_duration:.3f}초")
+            except Exception as e:
+                # 다중 블록 읽기 실패: 오류 응답이면 나눠 다시 읽어 오류 주소만 찾아냄 (통신 오류면 모두 bad)
+                self.logger.logger.warning(f"다중 블록 읽기 실패: {e}")
+                values = {} if isinstance(e, OSError) else self._bisect_read(scattered, self._read_scattered, e)
+                ok = self._append_results(collected_data, scattered, values)
+                success_count += ok
+                error_count += len(scattered) - ok
+        
         # 각 배치를 한 번에 읽기
         for batch in batches:
             try:
@@ -306,7 +508,8 @@ class XG5000Client:
                 first_item = batch[0]
                 address = first_item.get('modbus_address')
                 item_type = first_item.get('item_type')
-                count = len(batch)
+                # 배치가 차지하는 WORD 범위 (첫 주소 ~ 마지막 주소)
+                count = (batch[-1].get('modbus_address') - address + 1) if address is not None else len(batch)
                 
                 if address is None or item_type is None:
                     self.logger.log_error("배치 읽기", f"배치 첫 항목에 주소 또는 타입 정보가 없습니다")
@@ -332,14 +535,19 @@ class XG5000Client:
                 # XGT 주소 형식으로 변환
                 addr_str = self._convert_to_xgt_address(item_type, address)
                 
-                # 배치로 한 번에 읽기
-                values = xgt_read_dw(addr_str, count)
+                # 배치로 한 번에 읽기 (연속 배치는 연속 읽기, 단독 항목은 개별 읽기)
+                if count > 1:
+                    values = self._plc_io(xgt_read_block, self._convert_to_xgt_area(item_type), address, count,
+                                          self.plc_ip, self.plc_port)
+                else:
+                    values = self._plc_io(xgt_read_dw, addr_str, count, self.plc_ip, self.plc_port)
                 batch_duration = time.time() - batch_start_time
                 
                 if values and len(values) == count:
-                    # 읽은 값들을 각 항목에 매핑
-                    for idx, item in enumerate(batch):
-                        if idx < len(values):
+                    # 읽은 버퍼를 각 항목의 주소 오프셋으로 잘라서 매핑
+                    for item in batch:
+                        idx = item['modbus_address'] - address
+                        if 0 <= idx < len(values):
                             collected_data.append({
                                 'data_item_id': item['id'],
                                 'value': float(values[idx]),
@@ -356,53 +564,21 @@ class XG5000Client:
                             error_count += 1
                     self.logger.logger.info(f"배치 읽기 성공: {addr_str} x{count}, {batch_duration:.3f}초")
                 else:
-                    # 읽기 실패 시 개별 읽기로 폴백
-                    self.logger.logger.warning(f"배치 읽기 실패, 개별 읽기로 전환: {addr_str} x{count}")
-                    for item in batch:
-                        value = self._read_single_item_from_plc(item)
-                        if value is not None:
-                            collected_data.append({
-                                'data_item_id': item['id'],
-                                'value': float(value),
-                                'quality': 'good'
-                            })
-                            success_count += 1
-                        else:
-                            collected_data.append({
-                                'data_item_id': item['id'],
-                                'value': 0.0,
-                                'quality': 'bad'
-                            })
-                            error_count += 1
+                    # 응답 WORD 수가 맞지 않음: 범위를 나눠 다시 읽기
+                    self.logger.logger.warning(f"배치 읽기 실패, 범위를 나눠 다시 읽기: {addr_str} x{count}")
+                    ok = self._append_results(collected_data, batch, self._bisect_read(batch, self._read_range))
+                    success_count += ok
+                    error_count += len(batch) - ok
                             
             except Exception as e:
                 self.logger.log_error("배치 읽기", f"배치 처리 오류: {e}")
-                # 오류 발생 시 개별 읽기로 폴백
-                for item in batch:
-                    try:
-                        value = self._read_single_item_from_plc(item)
-                        if value is not None:
-                            collected_data.append({
-                                'data_item_id': item['id'],
-                                'value': float(value),
-                                'quality': 'good'
-                            })
-                            success_count += 1
-                        else:
-                            collected_data.append({
-                                'data_item_id': item['id'],
-                                'value': 0.0,
-                                'quality': 'bad'
-                            })
-                            error_count += 1
-                    except Exception as item_error:
-                        self.logger.log_error("항목 읽기", f"항목 {item.get('item_name', 'unknown')} 처리 오류: {item_error}")
-                        collected_data.append({
-                            'data_item_id': item['id'],
-                            'value': 0.0,
-                            'quality': 'bad'
-                        })
-                        error_count += 1
+                # 오류 응답이면 범위를 반씩 나눠 다시 읽어 오류 주소만 찾아냄
+                # (항목별 개별 읽기는 항목 수만큼 요청, 나눠 읽기는 오류 주소 수 × log2(항목 수) 정도)
+                # 연결/타임아웃 오류는 주소 문제가 아니므로 다시 읽지 않음 (차단기가 처리)
+                values = {} if isinstance(e, OSError) else self._bisect_read(batch, self._read_range, e)
+                ok = self._append_results(collected_data, batch, values)
+                success_count += ok
+                error_count += len(batch) - ok
         
         total_duration = time.time() - start_time
         self.logger.log_data_collection(len(data_items), success_count, error_count, total_duration)
@@ -410,37 +586,90 @@ class XG5000Client:
         
         return collected_data
     
-    def _create_batch_groups(self, items: List[Dict]) -> List[List[Dict]]:
-        """연속된 주소들을 배치 그룹으로 생성"""
+    def _append_results(self, collected_data: List[Dict], items, values: Dict) -> int:
+        """항목별 읽은 값(없으면 bad 품질)을 수집 결과에 추가하고 읽은 항목 수 반환"""
+        success_count = 0
+        for item in items:
+            value = values.get(item['id'])
+            if value is not None:
+                collected_data.append({'data_item_id': item['id'], 'value': float(value), 'quality': 'good'})
+                success_count += 1
+            else:
+                collected_data.append({'data_item_id': item['id'], 'value': 0.0, 'quality': 'bad'})
+        return success_count
+    
+    def _read_range(self, items: List[Dict]) -> List[int]:
+        """주소 순 항목들을 첫 주소 ~ 마지막 주소 연속 읽기로 읽어 항목 순서대로 값 반환"""
+        start = items[0]['modbus_address']
+        count = items[-1]['modbus_address'] - start + 1
+        words = self._plc_io(xgt_read_block, self._convert_to_xgt_area(items[0]['item_type']), start, count,
+                             self.plc_ip, self.plc_port)
+        if len(words) != count:
+            raise RuntimeError(f"연속 읽기 WORD 수 불일치: 요청 {count}개, 응답 {len(words)}개")
+        return [words[item['modbus_address'] - start] for item in items]
+    
+    def _read_scattered(self, items: List[Dict]) -> List[int]:
+        """비연속 항목들을 다중 블록 읽기로 읽어 항목 순서대로 값 반환"""
+        addr_list = [self._convert_to_xgt_address(item['item_type'], item['modbus_address']) for item in items]
+        return self._plc_io(xgt_read_multi, addr_list, self.plc_ip, self.plc_port)
+    
+    def _bisect_read(self, items: List[Dict], read_func, error: Optional[Exception] = None) -> Dict[int, int]:
+        """읽기에 실패한 항목들을 반씩 나눠 다시 읽어 {항목 ID: 값} 반환
+        
+        read_func(항목 목록)은 항목 순서대로 값 목록을 반환하고, PLC가 오류로 응답하면 예외를 발생시킵니다.
+        항목 1개까지 좁혀도 실패하는 주소는 음성 캐시에 등록해 다음 스캔의 읽기 계획에서 제외합니다.
+        도중에 연결/타임아웃 오류가 나면 그때까지 읽은 값만 반환합니다.
+        """
+        values = {}
+        try:
+            self._bisect(items, read_func, values, error)
+        except OSError as e:
+            self.logger.logger.warning(f"범위 나눠 읽기 중단 (PLC 통신 오류): {e!r}")
+        return values
+    
+    def _bisect(self, items: List[Dict], read_func, values: Dict, error: Optional[Exception]):
+        if len(items) == 1:
+            self._mark_invalid(items[0], error)
+            return
+        mid = len(items) // 2
+        for half in (items[:mid], items[mid:]):
+            self.stats['bisect_requests'] += 1
+            try:
+                result = read_func(half)
+            except OSError:
+                raise
+            except Exception as e:
+                self._bisect(half, read_func, values, e)
+                continue
+            for item, value in zip(half, result):
+                values[item['id']] = value
+    
+    def _mark_invalid(self, item: Dict, error: Optional[Exception],
+                      invalid: Optional[InvalidAddressCache] = None):
+        """PLC가 오류로 응답한 주소를 음성 캐시(기본: 기본 PLC의 캐시)에 등록"""
+        invalid = invalid if invalid is not None else self.invalid_addresses
+        if invalid.add(xgt_area(item['item_type']), item['modbus_address']):
+            addr_str = self._convert_to_xgt_address(item['item_type'], item['modbus_address'])
+            self.logger.logger.warning(f"읽을 수 없는 주소: {addr_str} ({item.get('item_name', 'unknown')}, {error}) "
+                                       f"- {invalid.ttl:g}초 동안 읽기 계획에서 제외")
+    
+    def _create_batch_groups(self, items: List[Dict], planner: Optional[ReadPlanner] = None) -> List[List[Dict]]:
+        """읽기 계획기로 배치 그룹 생성 (메모리 영역별, 갭 허용 병합, 계획 캐시)"""
         if not items:
             return []
         
-        # 주소별로 정렬
-        sorted_items = sorted(items, key=lambda x: x['modbus_address'])
-        
-        batches = []
-        current_batch = []
-        last_address = -1
+        planner = planner or self.planner
+        plans_built = planner.stats['plans_built']
+        batches = planner.plan(items)
         
-        for item in sorted_items:
-            current_address = item['modbus_address']
-            
-            # 연속된 주소이거나 첫 번째 항목이면 현재 배치에 추가
-            if not current_batch or current_address == last_address + 1:
-                current_batch.append(item)
-                last_address = current_address
-            else:
-                # 연속되지 않으면 새 배치 시작
-                if current_batch:
-                    batches.append(current_batch)
-                current_batch = [item]
-                last_address = current_address
-        
-        # 마지막 배치 추가
-        if current_batch:
-            batches.append(current_batch)
-        
-        self.logger.logger.debug(f"배치 그룹 생성: {len(items)}개 항목 → {len(batches)}개 배치")
+        if planner.stats['plans_built'] != plans_built:
+            self.logger.log_batch_processing({
+                'type': 'XGT',
+                'batch_count': len(batches),
+                'batches': batches
+            })
+            self.logger.logger.debug(f"배치 그룹 생성: {len(items)}개 항목 → {len(batches)}개 배치 "
+                                     f"(갭 허용: {planner.gap_budget} WORD)")
         return batches
     
     def _read_single_item_from_plc(self, item: Dict) -> Optional[int]:
@@ -461,15 +690,61 @@ class XG5000Client:
         
         try:
             # XGT 통신으로 개별 항목 읽기 (count=1)
-            values = xgt_read_dw(addr_str, 1)
+            values = self._plc_io(xgt_read_dw, addr_str, 1, self.plc_ip, self.plc_port)
             if values and len(values) > 0:
                 return values[0]
             else:
                 return None
+        except CircuitOpenError:
+            # 이번 스캔에서 PLC가 차단됨: 나머지 항목은 타임아웃을 기다리지 않고 바로 실패 처리
+            return None
         except Exception as e:
             self.logger.log_error("PLC 항목 읽기", f"{addr_str} 읽기 오류: {e}")
             return None
     
+    def _breaker(self, ip: str, port: int) -> CircuitBreaker:
+        """PLC 주소별 연결 차단기"""
+        breaker = self.breakers.get((ip, port))
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, backoff_max=self.backoff_max)
+            self.breakers[(ip, port)] = breaker
+        return breaker
+    
+    def _plc_io(self, func, *args):
+        """기본 PLC(plc_ip)와의 통신 1회를 차단기를 거쳐 실행
+        
+        차단(open) 중이면 통신 없이 CircuitOpenError를 발생시키고, 연결/타임아웃 오류는 실패로,
+        응답을 받았으면(응답 내용 오류 포함) 성공으로 기록합니다.
+        """
+        breaker = self._breaker(self.plc_ip, self.plc_port)
+        if breaker.state == STATE_OPEN:
+            raise CircuitOpenError(f"PLC 연결 차단 중: {self.plc_ip}:{self.plc_port}")
+        try:
+            result = func(*args)
+        except OSError as e:
+            self._record_plc_failure(breaker, self.plc_ip, self.plc_port, e)
+            raise
+        except Exception:
+            self._record_plc_success(breaker, self.plc_ip, self.plc_port)
+            raise
+        self._record_plc_success(breaker, self.plc_ip, self.plc_port)
+        return result
+    
+    def _record_plc_failure(self, breaker: CircuitBreaker, ip: str, port: int, error: Exception):
+        """PLC 통신 실패 기록 (차단되거나 시험 요청이 실패했을 때만 로그)"""
+        probing = breaker.state == STATE_HALF_OPEN
+        if breaker.record_failure() or probing:
+            self.logger.log_plc_connection(ip, port, False, f"{error!r} - {breaker.retry_in():.1f}초 동안 읽기 차단")
+    
+    def _record_plc_success(self, breaker: CircuitBreaker, ip: str, port: int):
+        """PLC 통신 성공 기록 (차단 상태에서 복구되었으면 로그)"""
+        if breaker.record_success():
+            self.logger.logger.info(f"PLC 연결 복구: {ip}:{port}")
+    
+    def _offline_data(self, items) -> List[Dict]:
+        """차단 중인 PLC 항목을 통신 없이 bad 품질로 기록"""
+        return [{'data_item_id': item['id'], 'value': 0.0, 'quality': 'bad'} for item in items]
+    
     def _convert_to_xgt_address(self, item_type: str, address: int) -> str:
         """PLC 데이터 타입을 XGT 주소 형식으로 변환"""
         if item_type == 'M':
@@ -487,73 +762,284 @@ class XG5000Client:
         else:
             return f"%DW{address}"  # 기본값
     
-    def save_real_time_data(self, data_list: List[Dict]):
-        """실시간 데이터를 데이터베이스에 저장"""
+    def _convert_to_xgt_area(self, item_type: str) -> str:
+        """PLC 데이터 타입을 XGT 메모리 영역 문자로 변환 (연속 읽기용)"""
+        return xgt_area(item_type)
+    
+    def save_real_time_data(self, data_list: List[Dict], connection=None) -> bool:
+        """실시간 데이터를 데이터베이스에 저장
+        
+        data_item_id 유니크 키에 대한 다중 행 INSERT ... ON DUPLICATE KEY UPDATE
+        한 문장으로 스캔 전체를 업서트합니다. (pymysql executemany가 다중 행 INSERT로 변환)
+        connection을 지정하지 않으면 self.connection을 사용하고,
+        행에 timestamp(수집 시각)가 없으면 현재 시각으로 저장합니다.
+        데이터 오류(외래키 위반 등)는 RejectedBatchError로 알리고, 연결 오류 등은 False를 반환합니다.
+        """
         if not data_list:
-            return
+            return True
         
+        connection = connection or self.connection
         start_time = time.time()
         try:
-            with self.connection.cursor() as cursor:
-                # 기존 실시간 데이터 삭제 (최신 데이터만 유지)
-                delete_count = 0
-                for data in data_list:
-                    cursor.execute('''
-                        DELETE FROM plc_real_time_data 
-                        WHERE data_item_id = %s
-                    ''', (data['data_item_id'],))
-                    delete_count += cursor.rowcount
-                
-                # 새 데이터 삽입
-                insert_count = 0
-                for data in data_list:
-                    cursor.execute('''
-                        INSERT INTO plc_real_time_data (data_item_id, value, quality)
-                        VALUES (%s, %s, %s)
-                    ''', (data['data_item_id'], data['value'], data['quality']))
-                    insert_count += 1
+            with connection.cursor() as cursor:
+                now = datetime.now()
+                cursor.executemany('''
+                    INSERT INTO plc_real_time_data (data_item_id, value, quality, timestamp)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        value = VALUES(value),
+                        quality = VALUES(quality),
+                        timestamp = VALUES(timestamp)
+                ''', [(data['data_item_id'], data['value'], data['quality'], data.get('timestamp') or now)
+                      for data in data_list])
                 
-                self.connection.commit()
+                connection.commit()
                 duration = time.time() - start_time
                 
-                self.logger.log_database_operation("저장", "plc_real_time_data", insert_count, True, 
-                                                 f"삭제: {delete_count}개, 삽입: {insert_count}개, 시간: {duration:.3f}초")
-                self.logger.log_performance("실시간 데이터 저장", duration, f"삭제: {delete_count}, 삽입: {insert_count}")
+                self.logger.log_database_operation("저장", "plc_real_time_data", len(data_list), True, 
+                                                 f"업서트: {len(data_list)}개, 시간: {duration:.3f}초")
+                self.logger.log_performance("실시간 데이터 저장", duration, f"업서트: {len(data_list)}")
+                return True
                 
         except Exception as e:
             duration = time.time() - start_time
             self.logger.log_error("실시간 데이터 저장", str(e))
             self.logger.log_database_operation("저장", "plc_real_time_data", 0, False, f"저장 시간: {duration:.3f}초, 오류: {e}")
-            if self.connection:
-                self.connection.rollback()
+            if connection:
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass
+            if isinstance(e, DATA_ERRORS):
+                raise RejectedBatchError(str(e)) from e
+            return False
+    
+    def _write_scans(self, scans: List[tuple]) -> bool:
+        """저장 스레드: 여러 스캔((스캔 시각, 행 목록))을 한 트랜잭션으로 저장
+        
+        plc_real_time_data는 항목당 최신값만 유지하므로 스캔들을 합칠 때
+        같은 항목은 마지막 스캔의 값과 수집 시각만 남깁니다.
+        (스풀에서 재저장하는 스캔도 실제 수집 시각으로 저장됨)
+        큐에는 거르지 않은 스캔이 들어오며, 불감대 필터는 최신값/이력 저장에만 적용하고
+        집계는 모든 스캔 값으로 계산합니다 (값이 그대로인 항목도 집계 구간마다 행이 생김).
+        """
+        if self._borrow_storage_connection() is None:
+            return False
+        
+        stored_scans = scans
+        pending = None
+        if self.deadband_filter is not None:
+            pending = {}
+            stored_scans = [(scan_time, self.deadband_filter.filter(scan, scan_time, pending))
+                            for scan_time, scan in scans]
+        
+        latest = {}
+        for scan_time, scan in stored_scans:
+            timestamp = datetime.fromtimestamp(scan_time)
+            for data in scan:
+                latest[data['data_item_id']] = dict(data, timestamp=timestamp)
+        
+        if self.save_real_time_data(list(latest.values()), self.storage_connection):
+            if pending is not None:
+                self.deadband_filter.commit(pending)
+            if self.history_buffer is not None:
+                self.history_buffer.add(stored_scans)
+            for aggregator in self.rollups:
+                for scan_time, scan in scans:
+                    aggregator.add(scan_time, scan)
+            self._flush_pending(False)
+            return True
+        
+        self._drop_storage_connection()
+        return False
+    
+    def _borrow_storage_connection(self):
+        """저장 스레드: 연결 풀에서 연결 빌리기 (이미 빌린 연결이 있으면 그대로 사용)"""
+        if self.storage_connection is None:
+            self.storage_connection = DatabaseConfig.acquire_connection()
+        return self.storage_connection
+    
+    def _release_storage_connection(self):
+        """저장을 마친 연결을 풀에 반납"""
+        if self.storage_connection is not None:
+            DatabaseConfig.release_connection(self.storage_connection)
+            self.storage_connection = None
+    
+    def _drop_storage_connection(self):
+        """오류가 난 연결은 풀에 돌려놓지 않고 버림 (다음 저장 시 새 연결)"""
+        if self.storage_connection is not None:
+            DatabaseConfig.release_connection(self.storage_connection, discard=True)
+            self.storage_connection = None
+    
+    def _flush_pending(self, force: bool = False):
+        """저장 스레드: 모아 둔 이력 행과 닫힌 집계 구간 저장 후 연결 반납"""
+        self._flush_history(force)
+        self._flush_rollups(force)
+        self._release_storage_connection()
+    
+    def _partition_worker(self):
+        """파티션 관리 스레드: PARTITION_MAINTENANCE_INTERVAL마다 이력/집계 테이블의 앞으로의 일별 파티션 생성,
+        보존 기간이 지난 파티션 삭제 (수집 중에는 pmax에 행이 쌓이지 않도록 계속 실행)
+        
+        저장 스레드가 쓰기 큐를 비우는 동안 ALTER를 기다리지 않도록 별도 스레드/연결에서 실행하며,
+        파티션 없는 테이블의 변환(테이블 재작성)은 하지 않습니다. (database_config.py --partition으로 수집 중지 후 실행)
+        """
+        manager = PartitionManager()
+        while not self.partition_stop.is_set():
+            try:
+                summary = manager.run_maintenance()
+            except Exception as e:
+                self.logger.log_error("파티션 관리", str(e))
+                summary = {}
+            self.partition_stop.wait(PARTITION_MAINTENANCE_INTERVAL if summary else PARTITION_RETRY_INTERVAL)
+    
+    def _flush_history(self, force: bool = False):
+        """저장 스레드: 모아 둔 이력 행을 plc_data_history에 추가 (N스캔/T밀리초 도달 또는 강제)"""
+        buffer = self.history_buffer
+        if buffer is None or not len(buffer) or not (force or buffer.due()):
+            return
+        if self._borrow_storage_connection() is None:
+            return
+        if self.save_history_data(buffer.rows, self.storage_connection):
+            buffer.clear()
+        else:
+            # 실패한 행은 버퍼에 남겨 두고 다음 저장 때 다시 시도
+            self._drop_storage_connection()
+    
+    def _flush_rollups(self, force: bool = False):
+        """저장 스레드: 닫힌 집계 구간(force=True면 진행 중인 구간 포함)을 집계 테이블에 병합"""
+        now = time.time()
+        for aggregator in self.rollups:
+            rows = aggregator.take_closed(now, force)
+            if not rows:
+                continue
+            if self._borrow_storage_connection() is None or not self.save_rollup_data(aggregator.table, rows, self.storage_connection):
+                # 실패한 구간은 누적기로 되돌려 다음 저장 때 다시 시도
+                aggregator.restore(rows)
+                self._drop_storage_connection()
+                return
+    
+    def save_rollup_data(self, table: str, rows: List[tuple], connection=None) -> bool:
+        """집계 행을 집계 테이블에 병합 (같은 구간이 이미 있으면 min/max/합계/개수를 누적)
+        
+        rows: (data_item_id, 구간 시작 시각, min, max, sum, count, last, last의 수집 시각) 목록
+        """
+        if not rows:
+            return True
+        
+        connection = connection or self.connection
+        start_time = time.time()
+        try:
+            with connection.cursor() as cursor:
+                cursor.executemany(ROLLUP_UPSERT_SQL.format(table=table), rows)
+                connection.commit()
+            
+            duration = time.time() - start_time
+            self.logger.log_database_operation("병합", table, len(rows), True, f"저장 시간: {duration:.3f}초")
+            return True
+            
+        except Exception as e:
+            duration = time.time() - start_time
+            self.logger.log_error("집계 데이터 저장", str(e))
+            self.logger.log_database_operation("병합", table, 0, False, f"저장 시간: {duration:.3f}초, 오류: {e}")
+            if connection:
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass
+            return False
     
-    def start_data_collection(self, plc_device_id: int = 1):
-        """데이터 수집 시작"""
+    def save_history_data(self, rows: List[tuple], connection=None) -> bool:
+        """이력 데이터를 plc_data_history에 추가 (다중 행 INSERT, 1트랜잭션)
+        
+        rows: (data_item_id, value, quality, timestamp) 목록
+        """
+        if not rows:
+            return True
+        
+        connection = connection or self.connection
+        start_time = time.time()
+        try:
+            with connection.cursor() as cursor:
+                cursor.executemany('''
+                    INSERT INTO plc_data_history (data_item_id, value, quality, timestamp)
+                    VALUES (%s, %s, %s, %s)
+                ''', rows)
+                connection.commit()
+            
+            duration = time.time() - start_time
+            self.logger.log_database_operation("추가", "plc_data_history", len(rows), True, f"저장 시간: {duration:.3f}초")
+            return True
+            
+        except Exception as e:
+            duration = time.time() - start_time
+            self.logger.log_error("이력 데이터 저장", str(e))
+            self.logger.log_database_operation("추가", "plc_data_history", 0, False, f"저장 시간: {duration:.3f}초, 오류: {e}")
+            if connection:
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass
+            return False
+    
+    def start_data_collection(self, plc_device_id: int = 1, concurrent: bool = False):
+        """데이터 수집 시작
+
+        concurrent=True이면 plc_devices의 모든 PLC를 asyncio로 동시에 폴링합니다.
+        """
         if self.running:
             self.logger.logger.warning("데이터 수집이 이미 실행 중입니다.")
             return
         
-        # 데이터베이스 연결
+        # 데이터베이스 연결 (실패해도 수집은 시작하고, 저장할 스캔은 DB가 돌아올 때까지 스풀에 기록)
         if not self.connect_database():
-            self.logger.logger.error("데이터베이스 연결 실패")
-            return
+            if self.schema_migrated is False:
+                self.logger.logger.error("데이터베이스 스키마 마이그레이션 실패 - 데이터 수집을 시작하지 않습니다")
+                return
+            self.logger.logger.error("데이터베이스 연결 실패 - 재연결될 때까지 수집 데이터를 스풀에 기록합니다")
+            self.db_retry_at = time.time() + DB_RETRY_INTERVAL
         
         self.running = True
-        self.collection_thread = threading.Thread(
-            target=self._collection_worker,
-            args=(plc_device_id,),
-            daemon=True
-        )
+        self.scan_scheduler = ScanScheduler(self.collection_interval, self.overrun_policy)
+        self.scan_classes = ScanClassSchedule(self.collection_interval)
+        self.storage_queue.start()
+        if self.history_buffer is not None or self.rollups:
+            self.partition_stop.clear()
+            self.partition_thread = threading.Thread(target=self._partition_worker, daemon=True)
+            self.partition_thread.start()
+        if concurrent:
+            self.collection_thread = threading.Thread(
+                target=self._concurrent_collection_worker,
+                daemon=True
+            )
+        else:
+            self.collection_thread = threading.Thread(
+                target=self._collection_worker,
+                args=(plc_device_id,),
+                daemon=True
+            )
         self.collection_thread.start()
         
-        self.logger.logger.info(f"XG5000 PLC 데이터 수집 시작 (장치 ID: {plc_device_id}, 주기: {self.collection_interval}ms)")
+        if concurrent:
+            self.logger.logger.info(f"XG5000 PLC 데이터 동시 수집 시작 (모든 장치, 주기: {self.collection_interval}ms)")
+        else:
+            self.logger.logger.info(f"XG5000 PLC 데이터 수집 시작 (장치 ID: {plc_device_id}, 주기: {self.collection_interval}ms)")
     
     def stop_data_collection(self):
         """데이터 수집 중지"""
         self.running = False
+        if self.scan_scheduler:
+            self.scan_scheduler.stop()
         if self.collection_thread:
             self.collection_thread.join()
+        self.storage_queue.stop()
+        if self.partition_thread:
+            self.partition_stop.set()
+            self.partition_thread.join()
+            self.partition_thread = None
+        self._release_storage_connection()
         self.disconnect_database()
+        close_all_sessions()
         
         # 통계 출력
         self.logger.logger.info("=" * 50)
@@ -564,6 +1050,36 @@ class XG5000Client:
         if self.stats['collection_count'] > 0:
             avg_time = self.stats['total_collection_time'] / self.stats['collection_count']
             self.logger.logger.info(f"평균 수집 시간: {avg_time:.3f}초")
+        queue_stats = self.storage_queue.stats
+        self.logger.logger.info(f"저장 큐: 최대 대기 {queue_stats['max_depth']}스캔, "
+                                f"저장 {queue_stats['written_scans']}스캔/{queue_stats['written_batches']}회, "
+                                f"버림 {queue_stats['dropped_scans']}, 스풀 기록 {queue_stats['spooled_scans']}, "
+                                f"스풀 재저장 {queue_stats['replayed_scans']}, "
+                                f"저장 실패 {queue_stats['write_failures']}회")
+        pool_stats = DatabaseConfig.get_pool().get_stats()
+        self.logger.logger.info(f"DB 연결 풀: 연결 생성 {pool_stats['created']}개, 대여 {pool_stats['checkouts']}회, "
+                                f"대기 {pool_stats['waits']}회 (평균 {pool_stats['wait_time_avg'] * 1000:.1f}ms, "
+                                f"최대 {pool_stats['wait_time_max'] * 1000:.1f}ms), "
+                                f"끊긴 연결 {pool_stats['ping_failures']}개")
+        if self.scan_scheduler:
+            self.logger.logger.info(f"스캔 주기: {self.scan_scheduler.summary()}")
+        if self.scan_classes and self.scan_classes.summary():
+            self.logger.logger.info(f"스캔 등급: {self.scan_classes.summary()}")
+        if self.stats['bisect_requests'] or len(self.invalid_addresses):
+            self.logger.logger.info(f"나눠 읽기: {self.stats['bisect_requests']}회 요청, 읽을 수 없는 주소 "
+                                    f"{len(self.invalid_addresses)}개 {self.invalid_addresses.addresses()}")
+        for plc_id, invalid in self.device_invalid_addresses.items():
+            if len(invalid):
+                self.logger.logger.info(f"PLC 장치 {plc_id} 읽을 수 없는 주소 {len(invalid)}개 {invalid.addresses()}")
+        for (ip, port), breaker in self.breakers.items():
+            breaker_stats = breaker.stats
+            self.logger.logger.info(f"PLC 차단기 {ip}:{port}: 상태 {breaker.state}, 실패 {breaker_stats['failures']}회, "
+                                    f"차단 {breaker_stats['opened']}회, 시험 요청 {breaker_stats['probes']}회, "
+                                    f"건너뜀 {breaker_stats['short_circuited']}회")
+        if self.deadband_filter is not None:
+            filter_stats = self.deadband_filter.stats
+            self.logger.logger.info(f"예외 보고: 수집 {filter_stats['received_rows']}행 중 "
+                                    f"{filter_stats['passed_rows']}행 저장")
         self.logger.logger.info("=" * 50)
         
         self.logger.logger.info("XG5000 PLC 데이터 수집 중지")
@@ -574,38 +1090,303 @@ class XG5000Client:
         
         while self.running:
             try:
-                collection_start_time = time.time()
-                collection_count += 1
-                
-                self.logger.logger.debug(f"데이터 수집 시작 (회차: {collection_count})")
+                # 다음 주기 경계까지 대기 (수집 시각 = 예정 시각, 소요 시간이 주기에 누적되지 않음)
+                collection_start_time = self.scan_scheduler.wait()
+                if collection_start_time is None:
+                    break
                 
                 # plc_query_memory 테이블 기반 데이터 항목 조회
-                data_items = self.get_query_memory_items(plc_device_id)
+                data_items = self._load_data_items(plc_device_id)
                 if not data_items:
-                    self.logger.logger.warning(f"plc_query_memory에 활성화된 항목이 없습니다")
-                    time.sleep(5)
+                    # 항목이 생길 때까지 재시도 대기를 늘려 가며 다시 조회 (중지 시 바로 깨어남)
+                    delay = self.error_backoff.next()
+                    self.logger.logger.warning(f"plc_query_memory에 활성화된 항목이 없습니다 ({delay:g}초 후 재조회)")
+                    if self.scan_scheduler.sleep(delay):
+                        break
                     continue
                 
-                # 배치로 PLC 데이터 읽기
-                collected_data = self.batch_read_plc_data(data_items)
+                # 이번 스캔에서 읽을 스캔 등급 (등급별 주기가 돌아온 등급만)
+                due_classes = self._due_scan_classes(data_items, collection_start_time)
+                if not due_classes:
+                    continue
+                collection_count += 1
                 
-                # 데이터베이스에 저장
+                self.logger.logger.debug(f"데이터 수집 시작 (회차: {collection_count}, "
+                                         f"등급: {', '.join(f'{scan_class}ms' for scan_class, _ in due_classes)})")
+                
+                # 등급별 읽기 계획으로 PLC 데이터 읽기
+                # (차단 중이면 통신 없이 bad 품질, 재시도 시각이 된 스캔은 시험 요청으로 읽기)
+                collected_data = []
+                if self._breaker(self.plc_ip, self.plc_port).allow():
+                    for scan_class, items in due_classes:
+                        collected_data.extend(self.batch_read_plc_data(items, self._class_planner(scan_class)))
+                else:
+                    self.stats['short_circuited_scans'] += 1
+                    for _, items in due_classes:
+                        collected_data.extend(self._offline_data(items))
+                self._configure_deadbands(data_items)
+                
+                # 저장 큐에 넣고 바로 다음 스캔 진행 (저장은 저장 스레드가 처리)
                 if collected_data:
-                    self.save_real_time_data(collected_data)
+                    self.storage_queue.put(collected_data, collection_start_time)
                 
                 # 통계 업데이트
                 collection_duration = time.time() - collection_start_time
                 self.stats['total_collection_time'] += collection_duration
                 self.stats['collection_count'] = collection_count
                 
-                self.logger.logger.debug(f"데이터 수집 완료 (회차: {collection_count}, 시간: {collection_duration:.3f}초)")
+                self.logger.logger.debug(f"데이터 수집 완료 (회차: {collection_count}, 시간: {collection_duration:.3f}초, "
+                                         f"저장 큐: {self.storage_queue.depth}스캔)")
+                self.error_backoff.reset()
+                
+            except Exception as e:
+                # 오류가 이어질수록 재시도 대기를 늘림 (중지 시 바로 깨어남)
+                delay = self.error_backoff.next()
+                self.logger.log_error("데이터 수집", f"{e} ({delay:g}초 후 재시도)")
+                if self.scan_scheduler.sleep(delay):
+                    break
+
+    def _due_scan_classes(self, data_items, scan_time: float) -> List[Tuple[int, tuple]]:
+        """이번 스캔에서 읽을 스캔 등급 목록 [(등급 주기 ms, 항목 튜플)]
+        
+        항목을 다시 조회해 등급 구성이 바뀌면 스케줄러 주기를 등급 주기들의 최대공약수로 맞춥니다.
+        """
+        if self.scan_classes.configure(data_items):
+            self.logger.logger.info(f"스캔 등급 구성: {self.scan_classes.summary()} (기본 주기 {self.scan_classes.base_ms}ms)")
+            # --interval도 등급 단위로 반올림되므로 처음 구성할 때도 스케줄러 주기와 비교
+            if round(self.scan_scheduler.interval * 1000.0) != self.scan_classes.base_ms:
+                self.scan_scheduler.set_interval(self.scan_classes.base_ms)
+        return self.scan_classes.due(scan_time)
+    
+    def _class_planner(self, scan_class: int) -> ReadPlanner:
+        """스캔 등급별 읽기 계획기 (등급마다 계획을 따로 캐시)"""
+        planner = self.class_planners.get(scan_class)
+        if planner is None:
+            planner = ReadPlanner(gap_budget=self.planner.gap_budget, max_words=self.planner.max_words,
+                                  invalid=self.invalid_addresses)
+            self.class_planners[scan_class] = planner
+        return planner
+    
+    def _configure_deadbands(self, data_items):
+        """항목별 불감대 설정 갱신 (필터는 저장 스레드가 저장 직전에 적용)"""
+        if self.deadband_filter is not None:
+            self.deadband_filter.configure(data_items)
+
+    def _concurrent_collection_worker(self):
+        """동시 수집 워커 스레드 (asyncio 이벤트 루프 실행)"""
+        asyncio.run(self._async_collection_loop())
+    
+    async def _async_collection_loop(self):
+        """모든 PLC 장치를 동시에 폴링하는 수집 루프
+        
+        한 회차의 소요 시간은 모든 PLC 응답 시간의 합이 아니라
+        가장 느린 PLC의 응답 시간에 맞춰집니다.
+        """
+        collection_count = 0
+        
+        while self.running:
+            try:
+                collection_start_time = await self.scan_scheduler.wait_async()
+                if collection_start_time is None:
+                    break
+                
+                data_items = self._load_data_items()
+                if not data_items:
+                    delay = self.error_backoff.next()
+                    self.logger.logger.warning(f"plc_query_memory에 활성화된 항목이 없습니다 ({delay:g}초 후 재조회)")
+                    if await self.scan_scheduler.sleep_async(delay):
+                        break
+                    continue
+                
+                due_classes = self._due_scan_classes(data_items, collection_start_time)
+                if not due_classes:
+                    continue
+                collection_count += 1
+                
+                # PLC 장치별 항목/장치 정보는 항목을 다시 조회했을 때만 갱신
+                if self.device_map_generation != self.tag_registry.generation:
+                    self.device_map = {device['id']: device for device in self.get_plc_devices()}
+                    self.device_map_generation = self.tag_registry.generation
+                devices = self.device_map
                 
-                # 대기
-                time.sleep(self.collection_interval / 1000.0)
+                # 이번 스캔 등급의 항목을 PLC 장치별로 모음
+                plc_groups: Dict[int, list] = {}
+                for scan_class, _ in due_classes:
+                    for plc_id, items in self.scan_classes.by_device[scan_class].items():
+                        plc_groups.setdefault(plc_id, []).append((scan_class, items))
                 
+                # 장치별 읽기를 동시에 실행
+                results = await asyncio.gather(*[
+                    self._async_read_device(devices.get(plc_id) or self._default_device(plc_id), class_items)
+                    for plc_id, class_items in plc_groups.items()
+                ])
+                collected_data = [data for result in results for data in result]
+                self._configure_deadbands(data_items)
+                
+                if collected_data:
+                    self.storage_queue.put(collected_data, collection_start_time)
+                
+                collection_duration = time.time() - collection_start_time
+                self.stats['total_collection_time'] += collection_duration
+                self.stats['collection_count'] = collection_count
+                self.logger.log_performance("동시 수집", collection_duration,
+                                            f"장치: {len(plc_groups)}개, 항목: {len(collected_data)}개, "
+                                            f"저장 큐: {self.storage_queue.depth}스캔")
+                self.error_backoff.reset()
+                
+            except Exception as e:
+                delay = self.error_backoff.next()
+                self.logger.log_error("동시 데이터 수집", f"{e} ({delay:g}초 후 재시도)")
+                if await self.scan_scheduler.sleep_async(delay):
+                    break
+        
+        for conn in self.async_connections.values():
+            await conn.close()
+        self.async_connections.clear()
+    
+    def _default_device(self, plc_id) -> Dict:
+        """plc_devices에 없는 장치는 기본 PLC 주소로 접속"""
+        return {'id': plc_id, 'name': 'default', 'ip_address': self.plc_ip, 'port': self.plc_port}
+    
+    async def _async_read_device(self, device: Dict, class_items: List[Tuple[int, tuple]]) -> List[Dict]:
+        """PLC 1대의 이번 스캔 항목들을 비동기로 읽기 (class_items: [(스캔 등급, 항목 튜플)])
+        
+        스캔 등급별 읽기 계획의 연속 배치는 연속 읽기, 단독 항목은 16개 블록 다중 읽기로
+        요청을 만들고 하나의 연결에서 파이프라이닝으로 전송합니다.
+        """
+        start_time = time.time()
+        plc_id = device['id']
+        
+        # 차단 중인 PLC는 연결/요청 없이 bad 품질로 기록 (다른 장치의 스캔 시간에 영향 없음)
+        breaker = self._breaker(device['ip_address'], device['port'])
+        if not breaker.allow():
+            return [row for _, items in class_items for row in self._offline_data(items)]
+        
+        conn = self.async_connections.get(plc_id)
+        if conn is None:
+            conn = AsyncXGTConnection(device['ip_address'], device['port'])
+            self.async_connections[plc_id] = conn
+        
+        invalid = self.device_invalid_addresses.get(plc_id)
+        if invalid is None:
+            invalid = InvalidAddressCache(self.invalid_addresses.ttl)
+            self.device_invalid_addresses[plc_id] = invalid
+        
+        # (항목 목록, 시작 주소, WORD 수, 요청 프레임) 목록 구성 (음성 캐시의 주소는 계획에서 제외)
+        requests = []
+        scattered = []
+        values = {}
+        for scan_class, items in class_items:
+            planner = self.device_planners.get((plc_id, scan_class))
+            if planner is None:
+                planner = ReadPlanner(gap_budget=self.planner.gap_budget, max_words=self.planner.max_words,
+                                      invalid=invalid)
+                self.device_planners[(plc_id, scan_class)] = planner
+            for batch in planner.plan(items):
+                first = batch[0]
+                if first.get('modbus_address') is None or first.get('item_type') is None:
+                    continue
+                if len(batch) == 1:
+                    scattered.append(first)
+                    continue
+                start = first['modbus_address']
+                count = batch[-1]['modbus_address'] - start + 1
+                frame = frame_cache.read_block(xgt_area(first['item_type']), start, count)
+                requests.append((batch, start, count, frame))
+        for i in range(0, len(scattered), MAX_READ_BLOCKS):
+            chunk = scattered[i:i + MAX_READ_BLOCKS]
+            addr_list = [self._convert_to_xgt_address(item['item_type'], item['modbus_address']) for item in chunk]
+            requests.append((chunk, None, len(chunk), frame_cache.read_multi(addr_list)))
+        
+        # 연결/타임아웃 오류만 차단기 실패로 기록 (응답을 받았으면 응답 내용 오류여도 성공, 단일 PLC 경로와 같음)
+        try:
+            responses = await conn.transact_many([request[3] for request in requests])
+        except TRANSPORT_ERRORS as e:
+            self.logger.log_error("비동기 PLC 읽기", f"{device.get('name')} ({device['ip_address']}:{device['port']}): {e!r}")
+            self._record_plc_failure(breaker, device['ip_address'], device['port'], e)
+            responses = []
+        except Exception as e:
+            self.logger.log_error("비동기 PLC 읽기", f"{device.get('name')} 응답 오류: {e!r}")
+            self._record_plc_success(breaker, device['ip_address'], device['port'])
+            responses = []
+        else:
+            self._record_plc_success(breaker, device['ip_address'], device['port'])
+        
+        failed = []
+        for (batch, start, count, _), resp in zip(requests, responses):
+            try:
+                if start is None:
+                    chunk_values = parse_read_multi_word_response(resp)
+                    if len(chunk_values) != len(batch):
+                        raise RuntimeError(f"블록 수 불일치: 요청 {len(batch)}개, 응답 {len(chunk_values)}개")
+                    for item, value in zip(batch, chunk_values):
+                        values[item['id']] = value
+                else:
+                    words = decode_words(parse_read_block_response(resp), 0, count)
+                    for item in batch:
+                        values[item['id']] = words[item['modbus_address'] - start]
             except Exception as e:
-                self.logger.log_error("데이터 수집", str(e))
-                time.sleep(5)  # 오류 시 5초 대기
+                failed.append((batch, start, e))
+        
+        # 오류 응답을 받은 요청은 범위를 반씩 나눠 다시 읽어 오류 주소만 음성 캐시에 등록
+        for batch, start, error in failed:
+            self.logger.logger.warning(f"{device.get('name')} 읽기 오류, 범위를 나눠 다시 읽기: {error}")
+            read_func = self._async_read_range if start is not None else self._async_read_scattered
+            try:
+                await self._async_bisect(conn, batch, read_func, values, error, invalid)
+            except TRANSPORT_ERRORS as e:
+                self.logger.logger.warning(f"범위 나눠 읽기 중단 (PLC 통신 오류): {e!r}")
+                self._record_plc_failure(breaker, device['ip_address'], device['port'], e)
+                break
+        
+        collected_data = []
+        for _, items in class_items:
+            for item in items:
+                value = values.get(item['id'])
+                collected_data.append({
+                    'data_item_id': item['id'],
+                    'value': float(value) if value is not None else 0.0,
+                    'quality': 'good' if value is not None else 'bad'
+                })
+        
+        self.logger.log_performance(f"장치 읽기 ({device.get('name')})", time.time() - start_time,
+                                    f"요청: {len(requests)}회, 성공: {len(values)}/{len(collected_data)}")
+        return collected_data
+
+    async def _async_read_range(self, conn: AsyncXGTConnection, items: List[Dict]) -> List[int]:
+        """주소 순 항목들을 첫 주소 ~ 마지막 주소 연속 읽기로 읽어 항목 순서대로 값 반환 (비동기)"""
+        start = items[0]['modbus_address']
+        count = items[-1]['modbus_address'] - start + 1
+        resp = await conn.transact(frame_cache.read_block(xgt_area(items[0]['item_type']), start, count))
+        words = decode_words(parse_read_block_response(resp), 0, count)
+        return [words[item['modbus_address'] - start] for item in items]
+    
+    async def _async_read_scattered(self, conn: AsyncXGTConnection, items: List[Dict]) -> List[int]:
+        """비연속 항목들을 다중 블록 읽기 1회로 읽어 항목 순서대로 값 반환 (비동기)"""
+        addr_list = [self._convert_to_xgt_address(item['item_type'], item['modbus_address']) for item in items]
+        values = parse_read_multi_word_response(await conn.transact(frame_cache.read_multi(addr_list)))
+        if len(values) != len(items):
+            raise RuntimeError(f"블록 수 불일치: 요청 {len(items)}개, 응답 {len(values)}개")
+        return values
+    
+    async def _async_bisect(self, conn: AsyncXGTConnection, items: List[Dict], read_func, values: Dict,
+                            error: Exception, invalid: InvalidAddressCache):
+        """_bisect의 동시 수집 모드 버전 (연결/타임아웃 오류는 호출한 쪽으로 전달)"""
+        if len(items) == 1:
+            self._mark_invalid(items[0], error, invalid)
+            return
+        mid = len(items) // 2
+        for half in (items[:mid], items[mid:]):
+            self.stats['bisect_requests'] += 1
+            try:
+                result = await read_func(conn, half)
+            except TRANSPORT_ERRORS:
+                raise
+            except Exception as e:
+                await self._async_bisect(conn, half, read_func, values, e, invalid)
+                continue
+            for item, value in zip(half, result):
+                values[item['id']] = value
 
 def bcc_sum(data: bytes) -> int:
     """Application Header의 바이트 합(모듈러 256). BCC 자기 자신은 제외."""
@@ -683,11 +1464,8 @@ def parse_read_word_response(resp: bytes):
     var_len = int.from_bytes(resp[i:i+2], "little"); i += 2
     data_cnt = int.from_bytes(resp[i:i+2], "little"); i += 2
 
-    # WORD 데이터: 각 값은 LE 2바이트
-    values = []
-    for _ in range(data_cnt):
-        v = int.from_bytes(resp[i:i+2], "little"); i += 2
-        values.append(v)
+    # WORD 데이터: 각 값은 LE 2바이트, 수신된 길이를 넘지 않도록 일괄 변환
+    values = decode_words(resp, i, min(data_cnt, (len(resp) - i) // 2))
     return {
         "length_field": length,
         "cmd": cmd,
@@ -696,38 +1474,228 @@ def parse_read_word_response(resp: bytes):
         "values": values,
     }
 
-def xgt_read_dw(addr_str="%DW4010", count=1):
-    """XGT 통신으로 WORD 데이터 읽기"""
-    req = build_read_word(addr_str, count)
+# 개별 읽기 요청 1개에 담을 수 있는 최대 변수 블록 수
+MAX_READ_BLOCKS = 16
+
+def build_read_multi_word(addr_list, invoke_id=0x0010, slot_base=0x00):
+    """
+    XGT Dedicated - Individual Read(WORD) 다중 블록 요청 프레임 구성
+    addr_list 예: ["%MW100", "%DW4010", "%IW0"] (최대 16개, 비연속 주소 가능)
+    """
+    if not addr_list or len(addr_list) > MAX_READ_BLOCKS:
+        raise ValueError(f"블록 수는 1~{MAX_READ_BLOCKS}개여야 합니다: {len(addr_list)}")
+
+    company = b"LSIS-XGT" + b"\x00\x00"
+    plc_info   = b"\x00\x00"
+    cpu_info   = b"\xB0"
+    src_frame  = b"\x33"
+    inv_id     = struct.pack("<H", invoke_id)
+    position   = struct.pack("B", slot_base)
+
+    # Command | DataType | Reserved | BlockCount | (VarLen | VarName) * N
+    blocks = []
+    for addr_str in addr_list:
+        addr = addr_str.encode("ascii")
+        blocks.append(struct.pack("<H", len(addr)) + addr)
+    payload = b"\x54\x00" + b"\x02\x00" + b"\x00\x00" + struct.pack("<H", len(addr_list)) + b"".join(blocks)
+    length  = struct.pack("<H", len(payload))
+
+    app_hdr_wo_bcc = plc_info + cpu_info + src_frame + inv_id + length + position
+    bcc = struct.pack("B", bcc_sum(app_hdr_wo_bcc))
+
+    return company + app_hdr_wo_bcc + bcc + payload
+
+def parse_read_multi_word_response(resp: bytes):
+    """
+    0x5500(READ RESP) 다중 블록 개별 WORD 응답 파서
+    구조:
+      Header(20) | Cmd(2=0x5500) | DataType(2) | Reserved(2) | Error(2) | BlockCnt(2)
+      (DataSize(2) | Data(DataSize)) * BlockCnt
+    블록 순서대로 WORD 값 리스트를 반환합니다.
+    """
+    i = 20
+    cmd = resp[i:i+2]; i += 2
+    if cmd != b"\x55\x00":
+        raise RuntimeError(f"Unexpected Command in response: {cmd.hex()}")
+    i += 2   # data type
+    i += 2   # reserved
+    err = int.from_bytes(resp[i:i+2], "little"); i += 2
+    if err != 0:
+        code = int.from_bytes(resp[i:i+2], "little")
+        raise RuntimeError(f"PLC Error: 0x{err:04X} (code 0x{code:04X})")
+
+    block_cnt = int.from_bytes(resp[i:i+2], "little"); i += 2
+    view = memoryview(resp)
+    values = []
+    for _ in range(block_cnt):
+        size = struct.unpack_from("<H", view, i)[0]; i += 2
+        values.append(struct.unpack_from("<H", view, i)[0] if size == 2 else int.from_bytes(view[i:i+size], "little"))
+        i += size
+    return values
+
+# 연속 읽기 1프레임 최대 바이트 수 (약 1400 bytes = 700 WORD)
+MAX_BLOCK_READ_BYTES = 1400
+
+def build_read_block(addr_str="%DB8020", byte_count=2, invoke_id=0x0010, slot_base=0x00):
+    """
+    XGT Dedicated - Continuous Read(BYTE 블록) 요청 프레임 구성
+    addr_str 예: "%DB8020" (D영역 바이트 주소 = WORD 주소 * 2)
+    """
+    if byte_count <= 0 or byte_count > MAX_BLOCK_READ_BYTES:
+        raise ValueError(f"연속 읽기 크기는 1~{MAX_BLOCK_READ_BYTES} bytes여야 합니다: {byte_count}")
+
+    company = b"LSIS-XGT" + b"\x00\x00"
+    plc_info   = b"\x00\x00"
+    cpu_info   = b"\xB0"
+    src_frame  = b"\x33"
+    inv_id     = struct.pack("<H", invoke_id)
+    position   = struct.pack("B", slot_base)
+
+    # Read Request: 0x5400, DataType 연속(Block): 0x1400
+    addr     = addr_str.encode("ascii")
+    payload  = (b"\x54\x00" + b"\x14\x00" + b"\x00\x00" + b"\x01\x00"
+                + struct.pack("<H", len(addr)) + addr + struct.pack("<H", byte_count))
+    length   = struct.pack("<H", len(payload))
+
+    app_hdr_wo_bcc = plc_info + cpu_info + src_frame + inv_id + length + position
+    bcc = struct.pack("B", bcc_sum(app_hdr_wo_bcc))
+
+    return company + app_hdr_wo_bcc + bcc + payload
+
+def parse_read_block_response(resp: bytes) -> memoryview:
+    """
+    0x5500(READ RESP) 연속 읽기 응답 파서
+    구조:
+      Header(20) | Cmd(2=0x5500) | DataType(2=0x1400) | Reserved(2) | Error(2) | BlockCnt(2=1)
+      DataSize(2) | Data(DataSize)
+    데이터 영역을 복사하지 않고 memoryview로 반환합니다.
+    """
+    i = 20
+    cmd = resp[i:i+2]; i += 2
+    if cmd != b"\x55\x00":
+        raise RuntimeError(f"Unexpected Command in response: {cmd.hex()}")
+    i += 2   # data type
+    i += 2   # reserved
+    err = int.from_bytes(resp[i:i+2], "little"); i += 2
+    if err != 0:
+        code = int.from_bytes(resp[i:i+2], "little")
+        raise RuntimeError(f"PLC Error: 0x{err:04X} (code 0x{code:04X})")
+    i += 2   # block count (=1)
+    size = int.from_bytes(resp[i:i+2], "little"); i += 2
+    data = memoryview(resp)[i:i+size]
+    if len(data) != size:
+        raise RuntimeError(f"연속 읽기 데이터 길이 불일치: {len(data)}/{size} bytes")
+    return data
+
+class XGTFrameCache:
+    """읽기 계획별 요청 프레임 템플릿 캐시
+
+    (데이터 타입, 영역, 시작 주소, 개수) 조합마다 요청 프레임을 한 번만 만들어
+    변경할 수 없는 bytes로 보관합니다. 여러 PLC 세션이 같은 템플릿을 동시에 쓰므로
+    세션은 전송할 때마다 복사본을 만들어 Invoke ID와 BCC만 교체합니다
+    (프레임 생성 대신 프레임 크기만큼의 복사만 발생).
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._frames: Dict[tuple, bytes] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0
+        }
+
+    def _get(self, key: tuple, builder, *args) -> bytes:
+        frame = self._frames.get(key)
+        if frame is not None:
+            self.stats['hits'] += 1
+            return frame
+        with self._lock:
+            if len(self._frames) >= self.max_size:
+                # 태그 구성이 크게 바뀐 경우 오래된 템플릿 정리
+                self._frames.clear()
+            frame = bytes(builder(*args))
+            self._frames[key] = frame
+            self.stats['misses'] += 1
+        return frame
+
+    def read_word(self, addr_str: str, count: int = 1) -> bytes:
+        """개별 읽기(WORD) 요청 프레임"""
+        return self._get(('word', addr_str, count), build_read_word, addr_str, count)
+
+    def read_multi(self, addr_list) -> bytes:
+        """다중 블록 개별 읽기(WORD) 요청 프레임"""
+        return self._get(('multi', tuple(addr_list)), build_read_multi_word, list(addr_list))
+
+    def read_block(self, area: str, start_word: int, word_count: int) -> bytes:
+        """연속 읽기 요청 프레임 (WORD 범위)"""
+        return self._get(('block', area, start_word, word_count), build_read_block,
+                         f"%{area}B{start_word * 2}", word_count * 2)
+
+    def clear(self):
+        """캐시 비우기"""
+        with self._lock:
+            self._frames.clear()
+
+# 프로세스 전역 요청 프레임 캐시
+frame_cache = XGTFrameCache()
+
+# 단건 읽기 송수신 덤프 로그 (--log-level DEBUG일 때만 출력)
+xgt_logger = logging.getLogger('XG5000Client.xgt')
+
+def xgt_read_dw(addr_str="%DW4010", count=1, ip=PLC_IP, port=PLC_PORT):
+    """XGT 통신으로 WORD 데이터 읽기 (PLC별 공유 세션 사용)
     
-    # 전송 로그
-    print(f"[SEND] {addr_str} x{count}:", " ".join(f"{b:02X}" for b in req))
+    매 스캔 호출되므로 송수신 프레임/값 덤프는 DEBUG 로그가 켜졌을 때만 만듭니다.
+    """
+    req = frame_cache.read_word(addr_str, count)
+    debug = xgt_logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        xgt_logger.debug("[SEND] %s x%d: %s", addr_str, count, req.hex(' ').upper())
     
-    start_time = time.time()
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(3.0)
-            s.connect((PLC_IP, PLC_PORT))
-            s.sendall(req)
-            resp = s.recv(2048)
-        
-        response_time = time.time() - start_time
-        
-        # 수신 로그
-        print(f"[RECV] {addr_str} x{count}:", " ".join(f"{b:02X}" for b in resp))
-        parsed = parse_read_word_response(resp)
-        vals = parsed["values"]
-        
+    resp = get_session(ip, port).transact(req)
+    vals = parse_read_word_response(resp)["values"]
+    
+    if debug:
+        xgt_logger.debug("[RECV] %s x%d: %s", addr_str, count, resp.hex(' ').upper())
         # 보기 좋게 10진/16진 동시 출력
         for idx, v in enumerate(vals):
-            print(f"{addr_str}+{idx}: dec={v}  hex=0x{v:04X}")
-        
-        return vals
-        
-    except Exception as e:
-        response_time = time.time() - start_time
-        print(f"XGT 통신 오류: {e}")
-        raise
+            xgt_logger.debug("%s+%d: dec=%d  hex=0x%04X", addr_str, idx, v, v)
+    
+    return vals
+
+def xgt_read_multi(addr_list, ip=PLC_IP, port=PLC_PORT):
+    """비연속 주소들을 16개 블록 단위 다중 읽기로 읽기 (요청들은 파이프라이닝)"""
+    chunks = [addr_list[i:i + MAX_READ_BLOCKS] for i in range(0, len(addr_list), MAX_READ_BLOCKS)]
+    frames = [frame_cache.read_multi(chunk) for chunk in chunks]
+    responses = get_session(ip, port).transact_many(frames)
+
+    values = []
+    for chunk, resp in zip(chunks, responses):
+        chunk_values = parse_read_multi_word_response(resp)
+        if len(chunk_values) != len(chunk):
+            raise RuntimeError(f"블록 수 불일치: 요청 {len(chunk)}개, 응답 {len(chunk_values)}개")
+        values.extend(chunk_values)
+    return values
+
+def xgt_read_block(area="D", start_word=0, word_count=1, ip=PLC_IP, port=PLC_PORT):
+    """연속 읽기로 WORD 범위 읽기
+
+    1프레임 한도(MAX_BLOCK_READ_BYTES)를 넘는 범위는 여러 프레임으로 나누어
+    파이프라이닝으로 요청하고, 결과를 이어붙여 WORD 리스트로 반환합니다.
+    """
+    max_words = MAX_BLOCK_READ_BYTES // 2
+    chunks = []
+    for offset in range(0, word_count, max_words):
+        chunks.append((start_word + offset, min(max_words, word_count - offset)))
+
+    frames = [frame_cache.read_block(area, word, count) for word, count in chunks]
+    responses = get_session(ip, port).transact_many(frames)
+
+    values = []
+    for (_, count), resp in zip(chunks, responses):
+        values.extend(decode_words(parse_read_block_response(resp), 0, count))
+    return values
 
 def main():
     """메인 함수"""
@@ -737,10 +1705,39 @@ def main():
     parser.add_argument('--start', action='store_true', help='데이터 수집 시작')
     parser.add_argument('--stop', action='store_true', help='데이터 수집 중지')
     parser.add_argument('--test', action='store_true', help='PLC 연결 테스트')
+    parser.add_argument('--plc-ip', default=PLC_IP, help=f'PLC IP 주소 (기본값: {PLC_IP})')
+    parser.add_argument('--plc-port', type=int, default=PLC_PORT, help=f'PLC XGT 포트 (기본값: {PLC_PORT})')
     parser.add_argument('--plc-id', type=int, default=1, help='PLC 장치 ID (기본값: 1)')
     parser.add_argument('--interval', type=int, default=1000, help='수집 주기 (밀리초, 기본값: 1000)')
     parser.add_argument('--count', type=str, default='1', choices=['1', 'all'], 
                        help='PLC 데이터 읽기 모드: 1=개별 읽기 (기본값), all=배치 읽기')
+    parser.add_argument('--concurrent', action='store_true',
+                       help='plc_devices의 모든 PLC를 asyncio로 동시에 폴링 (--plc-id 무시)')
+    parser.add_argument('--gap-budget', type=int, default=DEFAULT_GAP_BUDGET,
+                       help=f'배치 읽기 시 함께 읽을 수 있는 최대 빈 WORD 수 (기본값: {DEFAULT_GAP_BUDGET})')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                       help=f'수집/저장 사이 저장 큐 크기 (스캔 수, 기본값: {DEFAULT_QUEUE_SIZE})')
+    parser.add_argument('--queue-policy', choices=QUEUE_POLICIES, default=POLICY_DROP_OLDEST,
+                       help=f'저장 큐가 가득 찼을 때 정책 (기본값: {POLICY_DROP_OLDEST})')
+    parser.add_argument('--coalesce', type=int, default=DEFAULT_MAX_BATCH_SCANS,
+                       help=f'한 트랜잭션으로 묶어 저장할 최대 스캔 수 (기본값: {DEFAULT_MAX_BATCH_SCANS})')
+    parser.add_argument('--history-scans', type=int, default=DEFAULT_HISTORY_FLUSH_SCANS,
+                       help=f'plc_data_history에 한 번에 추가할 스캔 수 (기본값: {DEFAULT_HISTORY_FLUSH_SCANS})')
+    parser.add_argument('--history-ms', type=int, default=DEFAULT_HISTORY_FLUSH_MS,
+                       help=f'plc_data_history 추가 최대 대기 시간 (밀리초, 기본값: {DEFAULT_HISTORY_FLUSH_MS})')
+    parser.add_argument('--no-history', action='store_true', help='plc_data_history에 이력을 저장하지 않음')
+    parser.add_argument('--no-rollup', action='store_true', help='1분/1시간 집계 테이블을 갱신하지 않음')
+    parser.add_argument('--deadband', type=float, default=DEFAULT_DEADBAND,
+                       help=f'plc_data_items.deadband가 없는 항목의 불감대 (절대값, 기본값: {DEFAULT_DEADBAND})')
+    parser.add_argument('--max-silence', type=float, default=DEFAULT_MAX_SILENCE,
+                       help=f'값이 그대로여도 다시 저장하는 간격 (초, 0이면 사용 안 함, 기본값: {DEFAULT_MAX_SILENCE:g})')
+    parser.add_argument('--no-deadband', action='store_true', help='값 변화와 관계없이 모든 스캔을 저장')
+    parser.add_argument('--overrun-policy', choices=OVERRUN_POLICIES, default=OVERRUN_SKIP,
+                       help='스캔이 주기를 넘겼을 때: skip=놓친 주기 건너뜀, catch_up=연달아 실행해 따라잡음 (기본값: skip)')
+    parser.add_argument('--failure-threshold', type=int, default=DEFAULT_FAILURE_THRESHOLD,
+                       help=f'연속 실패가 이 횟수에 도달하면 PLC 읽기 차단 (기본값: {DEFAULT_FAILURE_THRESHOLD})')
+    parser.add_argument('--backoff-max', type=float, default=DEFAULT_BACKOFF_MAX,
+                       help=f'차단된 PLC 재시도/오류 재시도 최대 대기 (초, 기본값: {DEFAULT_BACKOFF_MAX:g})')
     parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], 
                        default='INFO', help='로그 레벨 (기본값: INFO)')
     
@@ -760,7 +1757,14 @@ def main():
         logging.getLogger('XG5000Client').setLevel(logging.ERROR)
         print(f"로그 레벨을 {args.log_level}로 설정했습니다.")
     
-    client = XG5000Client(read_count_mode=args.count)
+    client = XG5000Client(read_count_mode=args.count, plc_ip=args.plc_ip, plc_port=args.plc_port,
+                          gap_budget=args.gap_budget, queue_size=args.queue_size,
+                          queue_policy=args.queue_policy, coalesce_scans=args.coalesce,
+                          history=not args.no_history, history_scans=args.history_scans,
+                          history_ms=args.history_ms, rollup=not args.no_rollup,
+                          report_by_exception=not args.no_deadband, deadband=args.deadband,
+                          max_silence=args.max_silence, overrun_policy=args.overrun_policy,
+                          failure_threshold=args.failure_threshold, backoff_max=args.backoff_max)
     client.collection_interval = args.interval
     
     if args.count == 'all':
@@ -772,14 +1776,14 @@ def main():
         print("=== PLC 연결 테스트 ===")
         try:
             # 간단한 읽기 테스트
-            values = xgt_read_dw("%DW4010", 1)
+            values = xgt_read_dw("%DW4010", 1, args.plc_ip, args.plc_port)
             print(f"✅ PLC 연결 성공: {values}")
         except Exception as e:
             print(f"❌ PLC 연결 실패: {e}")
     
     elif args.start:
         print("XG5000 PLC 데이터 수집을 시작합니다...")
-        client.start_data_collection(args.plc_id)
+        client.start_data_collection(args.plc_id, concurrent=args.concurrent)
         
         try:
             # 메인 스레드에서 대기
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XGT Dedicated 프로토콜 asyncio 전송 계층 - 여러 PLC 동시 폴링용
+"""
+
+import asyncio
+import struct
+import logging
+from typing import Dict, List, Optional
+
+from xgt_session import (
+    XGT_HEADER_SIZE, INVOKE_ID_OFFSET, LENGTH_OFFSET,
+    DEFAULT_TIMEOUT, DEFAULT_MAX_OUTSTANDING, patch_invoke_id
+)
+
+logger = logging.getLogger('XG5000Client.async')
+
+# 연결/타임아웃 오류 (연결을 닫고 다시 연결) - PLC의 오류 응답(주소 오류 등)과 구분
+TRANSPORT_ERRORS = (OSError, ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError)
+
+
+class AsyncXGTConnection:
+    """asyncio 기반 XGT 연결 (PLC 1대당 하나)
+
+    XGTSession과 같은 방식으로 동작합니다.
+    - 헤더(20B)를 먼저 읽고 Length 필드만큼 명령부를 읽는 프레임 단위 수신
+    - 최대 max_outstanding개 요청을 파이프라이닝하고 Invoke ID로 응답 매칭
+    - 전체 요청에 timeout을 적용하며, 시간 초과/소켓 오류 시 연결을 닫음
+    """
+
+    def __init__(self, ip: str, port: int, timeout: float = DEFAULT_TIMEOUT,
+                 max_outstanding: int = DEFAULT_MAX_OUTSTANDING):
+        self.ip = ip
+        self.port = port
+        self.timeout = timeout
+        self.max_outstanding = max(1, max_outstanding)
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+        self._invoke_id = 0
+
+    @property
+    def is_connected(self) -> bool:
+        return self.writer is not None
+
+    async def connect(self):
+        """PLC 연결 (이미 연결되어 있으면 무시)"""
+        if self.writer is not None:
+            return
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.ip, self.port), timeout=self.timeout)
+        logger.info(f"XGT 비동기 연결: {self.ip}:{self.port}")
+
+    async def close(self):
+        """PLC 연결 해제"""
+        if self.writer is not None:
+            writer = self.writer
+            self.reader = None
+            self.writer = None
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+            logger.info(f"XGT 비동기 연결 종료: {self.ip}:{self.port}")
+
+    def _next_invoke_id(self) -> int:
+        self._invoke_id = (self._invoke_id + 1) & 0xFFFF
+        return self._invoke_id
+
+    async def _recv_frame(self) -> bytes:
+        header = await self.reader.readexactly(XGT_HEADER_SIZE)
+        length = struct.unpack_from("<H", header, LENGTH_OFFSET)[0]
+        return header + await self.reader.readexactly(length)
+
+    async def transact(self, frame: bytes) -> bytes:
+        """요청 프레임 1개를 전송하고 응답 프레임을 반환"""
+        return (await self.transact_many([frame]))[0]
+
+    async def transact_many(self, frames: List[bytes]) -> List[bytes]:
+        """여러 요청 프레임을 파이프라이닝으로 전송하고 요청 순서대로 응답을 반환"""
+        if not frames:
+            return []
+
+        async with self._lock:
+            try:
+                return await asyncio.wait_for(self._transact_locked(frames), timeout=self.timeout)
+            except TRANSPORT_ERRORS:
+                await self.close()
+                raise
+
+    async def _transact_locked(self, frames: List[bytes]) -> List[bytes]:
+        await self.connect()
+
+        responses: List[Optional[bytes]] = [None] * len(frames)
+        pending: Dict[int, int] = {}  # invoke_id -> 요청 인덱스
+        next_index = 0
+        received = 0
+
+        while received < len(frames):
+            # 윈도우가 허용하는 만큼 요청 전송
+            while next_index < len(frames) and len(pending) < self.max_outstanding:
+                req = bytearray(frames[next_index])
+                invoke_id = self._next_invoke_id()
+                patch_invoke_id(req, invoke_id)
+                pending[invoke_id] = next_index
+                self.writer.write(req)
+                next_index += 1
+            await self.writer.drain()
+
+            resp = await self._recv_frame()
+            invoke_id = struct.unpack_from("<H", resp, INVOKE_ID_OFFSET)[0]
+            index = pending.pop(invoke_id, None)
+            if index is None:
+                logger.debug(f"매칭되지 않는 응답 무시: invoke_id=0x{invoke_id:04X}")
+                continue
+            responses[index] = resp
+            received += 1
+
+        return responses
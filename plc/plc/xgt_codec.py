@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XGT 응답 데이터 디코더 - memoryview + struct.unpack_from 기반 일괄 변환
+"""
+
+import struct
+from functools import lru_cache
+from typing import List, Union
+
+# 단위 크기(bytes) → struct 포맷 문자
+_UNSIGNED_FORMATS = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+_SIGNED_FORMATS = {1: 'b', 2: 'h', 4: 'i', 8: 'q'}
+_FLOAT_FORMATS = {4: 'f', 8: 'd'}
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+@lru_cache(maxsize=256)
+def _get_struct(count: int, code: str) -> struct.Struct:
+    return struct.Struct(f"<{count}{code}")
+
+
+def _format_code(unit: int, signed: bool, as_float: bool) -> str:
+    if as_float:
+        if unit not in _FLOAT_FORMATS:
+            raise ValueError(f"실수 변환은 DWORD/LWORD만 지원합니다: {unit} bytes")
+        return _FLOAT_FORMATS[unit]
+    formats = _SIGNED_FORMATS if signed else _UNSIGNED_FORMATS
+    if unit not in formats:
+        raise ValueError(f"지원하지 않는 데이터 크기: {unit} bytes")
+    return formats[unit]
+
+
+def decode_values(buf: Buffer, offset: int = 0, count: int = None, unit: int = 2,
+                  signed: bool = False, as_float: bool = False) -> List:
+    """버퍼의 데이터 영역을 한 번에 리틀엔디언 값 리스트로 변환
+
+    Args:
+        buf: 응답 프레임 (bytes/bytearray/memoryview, 복사하지 않음)
+        offset: 데이터 시작 위치
+        count: 값 개수 (None이면 버퍼 끝까지)
+        unit: 값 하나의 크기 (1=BYTE, 2=WORD, 4=DWORD, 8=LWORD)
+        signed: 부호 있는 정수로 해석
+        as_float: IEEE754 실수로 해석 (DWORD=float, LWORD=double)
+    """
+    view = memoryview(buf)
+    available = (len(view) - offset) // unit
+    if count is None:
+        count = available
+    elif count > available:
+        raise ValueError(f"데이터 길이 부족: {available}/{count}개")
+    if count <= 0:
+        return []
+    return list(_get_struct(count, _format_code(unit, signed, as_float)).unpack_from(view, offset))
+
+
+def decode_words(buf: Buffer, offset: int = 0, count: int = None) -> List[int]:
+    """WORD(부호 없음) 데이터 일괄 변환"""
+    return decode_values(buf, offset, count, unit=2)
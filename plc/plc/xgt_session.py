@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XGT Dedicated 프로토콜 세션 - PLC별 상시 연결 및 Invoke ID 기반 파이프라이닝
+"""
+
+import socket
+import struct
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+# XGT 프레임 헤더 구조 (build_read_word 기준)
+# Company(10) | PLC(2) | CPU(1) | Src(1) | Invoke(2) | Len(2) | Pos(1) | BCC(1)
+XGT_HEADER_SIZE = 20
+INVOKE_ID_OFFSET = 14
+LENGTH_OFFSET = 16
+BCC_OFFSET = 19
+
+# 수신 버퍼 초기 크기 (연속 읽기 1400B 응답 + 헤더를 여유 있게 수용)
+DEFAULT_RECV_BUFFER_SIZE = 2048
+
+DEFAULT_TIMEOUT = 3.0
+DEFAULT_MAX_OUTSTANDING = 8
+
+logger = logging.getLogger('XG5000Client.session')
+
+
+def patch_invoke_id(frame: bytearray, invoke_id: int):
+    """요청 프레임의 Invoke ID를 교체하고 BCC를 다시 계산 (in-place)"""
+    struct.pack_into("<H", frame, INVOKE_ID_OFFSET, invoke_id)
+    frame[BCC_OFFSET] = sum(frame[10:BCC_OFFSET]) & 0xFF
+
+
+class XGTFrameReader:
+    """XGT 응답 프레임 리더
+
+    헤더(20B)를 먼저 받고 Length 필드만큼 명령부를 정확히 수신합니다.
+    TCP 스트림이 어떻게 나뉘어 도착하더라도 프레임 하나를 온전히 반환하며,
+    미리 할당한 수신 버퍼에 recv_into로 받아 수신마다 버퍼를 새로 만들지 않습니다.
+    """
+
+    def __init__(self, sock: socket.socket, buffer_size: int = DEFAULT_RECV_BUFFER_SIZE):
+        self.sock = sock
+        self._buf = bytearray(max(buffer_size, XGT_HEADER_SIZE))
+        self._view = memoryview(self._buf)
+
+    def _recv_into(self, start: int, n: int):
+        while n > 0:
+            received = self.sock.recv_into(self._view[start:start + n], n)
+            if not received:
+                raise ConnectionError("socket closed while receiving")
+            start += received
+            n -= received
+
+    def read_frame(self) -> bytes:
+        """응답 프레임 1개(헤더 + 명령부)를 수신하여 반환"""
+        self._recv_into(0, XGT_HEADER_SIZE)
+        length = struct.unpack_from("<H", self._buf, LENGTH_OFFSET)[0]
+        total = XGT_HEADER_SIZE + length
+        if total > len(self._buf):
+            # 큰 응답이면 버퍼를 키워서 이후에도 재사용
+            self._view.release()
+            self._buf.extend(bytes(total - len(self._buf)))
+            self._view = memoryview(self._buf)
+        self._recv_into(XGT_HEADER_SIZE, length)
+        return bytes(self._view[:total])
+
+
+class XGTSession:
+    """PLC 1대당 하나의 TCP 소켓을 유지하는 XGT 세션
+
+    - 첫 요청 시 연결하고 이후 요청에서 소켓을 재사용
+    - 소켓 오류 시 연결을 닫고 한 번 재연결하여 재시도 (읽기 요청은 멱등)
+    - 여러 요청을 응답을 기다리지 않고 연속 전송한 뒤 Invoke ID로 응답을 매칭
+    """
+
+    def __init__(self, ip: str, port: int, timeout: float = DEFAULT_TIMEOUT,
+                 max_outstanding: int = DEFAULT_MAX_OUTSTANDING):
+        self.ip = ip
+        self.port = port
+        self.timeout = timeout
+        self.max_outstanding = max(1, max_outstanding)
+        self.sock: Optional[socket.socket] = None
+        self.reader: Optional[XGTFrameReader] = None
+        self._lock = threading.Lock()
+        self._invoke_id = 0
+        self.stats = {
+            'connects': 0,
+            'reconnects': 0,
+            'requests': 0,
+            'stale_responses': 0
+        }
+
+    @property
+    def is_connected(self) -> bool:
+        return self.sock is not None
+
+    def connect(self):
+        """PLC 소켓 연결 (이미 연결되어 있으면 무시)"""
+        if self.sock is not None:
+            return
+        sock = socket.create_connection((self.ip, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock
+        self.reader = XGTFrameReader(sock)
+        self.stats['connects'] += 1
+        logger.info(f"XGT 세션 연결: {self.ip}:{self.port}")
+
+    def close(self):
+        """PLC 소켓 연결 해제"""
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+            self.reader = None
+            logger.info(f"XGT 세션 종료: {self.ip}:{self.port}")
+
+    def _next_invoke_id(self) -> int:
+        self._invoke_id = (self._invoke_id + 1) & 0xFFFF
+        return self._invoke_id
+
+    def transact(self, frame: bytes) -> bytes:
+        """요청 프레임 1개를 전송하고 응답 프레임을 반환"""
+        return self.transact_many([frame])[0]
+
+    def transact_many(self, frames: List[bytes]) -> List[bytes]:
+        """여러 요청 프레임을 파이프라이닝으로 전송하고 요청 순서대로 응답을 반환
+
+        최대 max_outstanding개의 요청을 응답 대기 없이 전송하며,
+        응답은 Invoke ID로 원래 요청에 매칭합니다.
+        프레임 캐시 템플릿은 여러 PLC 세션(장치별 스레드)이 함께 쓰므로 전송할 때마다 복사하여
+        복사본의 Invoke ID/BCC만 교체합니다.
+        """
+        if not frames:
+            return []
+
+        with self._lock:
+            try:
+                return self._transact_locked(frames)
+            except (OSError, ConnectionError) as e:
+                # 소켓 오류 시 재연결 후 한 번 재시도
+                logger.warning(f"XGT 세션 오류, 재연결 시도: {self.ip}:{self.port} ({e})")
+                self.close()
+                self.stats['reconnects'] += 1
+                try:
+                    return self._transact_locked(frames)
+                except (OSError, ConnectionError):
+                    self.close()
+                    raise
+
+    def _transact_locked(self, frames: List[bytes]) -> List[bytes]:
+        self.connect()
+
+        responses: List[Optional[bytes]] = [None] * len(frames)
+        pending: Dict[int, int] = {}  # invoke_id -> 요청 인덱스
+        next_index = 0
+        received = 0
+
+        while received < len(frames):
+            # 윈도우가 허용하는 만큼 요청 전송
+            while next_index < len(frames) and len(pending) < self.max_outstanding:
+                req = bytearray(frames[next_index])
+                invoke_id = self._next_invoke_id()
+                patch_invoke_id(req, invoke_id)
+                pending[invoke_id] = next_index
+                self.sock.sendall(req)
+                self.stats['requests'] += 1
+                next_index += 1
+
+            resp = self.reader.read_frame()
+            invoke_id = struct.unpack_from("<H", resp, INVOKE_ID_OFFSET)[0]
+            index = pending.pop(invoke_id, None)
+            if index is None:
+                # 이전 타임아웃 요청에 대한 늦은 응답 등은 버림
+                self.stats['stale_responses'] += 1
+                logger.debug(f"매칭되지 않는 응답 무시: invoke_id=0x{invoke_id:04X}")
+                continue
+            responses[index] = resp
+            received += 1
+
+        return responses
+
+
+# 프로세스 전역 세션 레지스트리 (PLC ip:port 당 하나)
+_sessions: Dict[Tuple[str, int], XGTSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(ip: str, port: int, timeout: float = DEFAULT_TIMEOUT) -> XGTSession:
+    """PLC별 공유 세션 반환 (없으면 생성)"""
+    key = (ip, port)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = XGTSession(ip, port, timeout=timeout)
+            _sessions[key] = session
+        return session
+
+
+def close_all_sessions():
+    """모든 공유 세션 종료"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XGT Dedicated 프로토콜 PLC 시뮬레이터 - 로컬 테스트 및 성능 측정용
+"""
+
+import random
+import re
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from xgt_session import XGT_HEADER_SIZE, LENGTH_OFFSET
+
+# 명령어 코드 (리틀엔디언 값)
+CMD_READ_REQ = 0x0054
+CMD_READ_RSP = 0x0055
+CMD_WRITE_REQ = 0x0058
+CMD_WRITE_RSP = 0x0059
+
+# 데이터 타입
+DT_BIT = 0x0000
+DT_BYTE = 0x0001
+DT_WORD = 0x0002
+DT_DWORD = 0x0003
+DT_LWORD = 0x0004
+DT_CONTINUOUS = 0x0014
+
+# 에러 코드 (Error 상태 0xFFFF 뒤에 전달)
+ERR_BLOCK_COUNT = 0x0001     # 블록 수가 16 초과
+ERR_DATA_TYPE = 0x0002       # 지원하지 않는 데이터 타입
+ERR_DEVICE = 0x0003          # 지원하지 않는 디바이스
+ERR_AREA = 0x0004            # 디바이스 영역 초과
+ERR_DATA_SIZE = 0x0005       # 1회 최대 크기(1400 bytes) 초과
+
+MAX_BLOCKS = 16
+MAX_DATA_BYTES = 1400
+
+# 디바이스별 메모리 크기 (WORD)
+DEFAULT_AREA_WORDS = {
+    'M': 8192,
+    'D': 32768,
+    'I': 4096,
+    'Q': 4096,
+    'T': 2048,
+    'C': 2048
+}
+
+_SIZE_BYTES = {'X': 1, 'B': 1, 'W': 2, 'D': 4, 'L': 8}
+_ADDRESS_RE = re.compile(r'^%([A-Z])([XBWDL])(\d+)$')
+
+
+class XGTProtocolError(Exception):
+    """시뮬레이터가 에러 응답으로 돌려줄 프로토콜 오류"""
+
+    def __init__(self, code: int):
+        super().__init__(f"XGT error 0x{code:04X}")
+        self.code = code
+
+
+class XGTSimulator:
+    """XGT Dedicated 프로토콜 PLC 시뮬레이터
+
+    - M/D/I/Q/T/C 메모리 이미지를 메모리에 보관
+    - 개별 읽기/쓰기(최대 16블록), 연속 읽기/쓰기(최대 1400 bytes) 지원
+    - build_read_word 형식(단일 블록 + 개수)의 요청도 처리
+    - 응답 지연(latency/jitter), 에러 응답 비율, 연결 끊김 비율 설정 가능
+    - fault_addresses에 등록된 (영역, WORD 주소)를 읽으면 영역 초과 에러 응답
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_code: int = ERR_AREA,
+                 drop_rate: float = 0.0, area_words: Dict[str, int] = None,
+                 seed: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.drop_rate = drop_rate
+        self.fault_addresses: Set[Tuple[str, int]] = set()
+        self.memory = {area: bytearray(words * 2) for area, words in (area_words or DEFAULT_AREA_WORDS).items()}
+        self._memory_lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            'connections': 0,
+            'requests': 0,
+            'errors': 0,
+            'drops': 0
+        }
+
+    # ------------------------------------------------------------------
+    # 메모리 이미지
+
+    def write_words(self, area: str, start_word: int, values: Iterable[int]):
+        """메모리 이미지에 WORD 값 쓰기"""
+        values = list(values)
+        with self._memory_lock:
+            struct.pack_into(f"<{len(values)}H", self.memory[area], start_word * 2,
+                             *(v & 0xFFFF for v in values))
+
+    def read_words(self, area: str, start_word: int, count: int) -> List[int]:
+        """메모리 이미지에서 WORD 값 읽기"""
+        with self._memory_lock:
+            return list(struct.unpack_from(f"<{count}H", self.memory[area], start_word * 2))
+
+    def fill_random(self):
+        """모든 영역을 임의 값으로 채우기"""
+        with self._memory_lock:
+            for area, mem in self.memory.items():
+                mem[:] = self._random.randbytes(len(mem))
+
+    # ------------------------------------------------------------------
+    # 서버 실행
+
+    def start(self) -> int:
+        """백그라운드 스레드에서 서버 시작, 실제 바인딩된 포트 반환"""
+        simulator = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                simulator._serve_connection(self.request)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.port
+
+    def serve_forever(self):
+        """포그라운드에서 서버 실행"""
+        self.start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """서버 중지"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _serve_connection(self, sock: socket.socket):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stats['connections'] += 1
+        try:
+            while True:
+                header = self._recv_exact(sock, XGT_HEADER_SIZE)
+                if header is None:
+                    return
+                length = struct.unpack_from("<H", header, LENGTH_OFFSET)[0]
+                payload = self._recv_exact(sock, length)
+                if payload is None:
+                    return
+                self.stats['requests'] += 1
+
+                if self.latency or self.jitter:
+                    time.sleep(max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter)))
+                if self.drop_rate and self._random.random() < self.drop_rate:
+                    self.stats['drops'] += 1
+                    return
+
+                sock.sendall(self.handle_frame(header, payload))
+        except OSError:
+            return
+        finally:
+            sock.close()
+
+    @staticmethod
+    def _recv_exact(sock: socket.socket, n: int) -> Optional[bytes]:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = sock.recv(n - len(buf))
+            if not chunk:
+                return None
+            buf += chunk
+        return bytes(buf)
+
+    # ------------------------------------------------------------------
+    # 프레임 처리
+
+    def handle_frame(self, header: bytes, payload: bytes) -> bytes:
+        """요청 프레임 1개를 처리하여 응답 프레임 반환"""
+        cmd, dtype = struct.unpack_from("<HH", payload, 0)
+        rsp_cmd = CMD_WRITE_RSP if cmd == CMD_WRITE_REQ else CMD_READ_RSP
+        try:
+            if self.error_rate and self._random.random() < self.error_rate:
+                raise XGTProtocolError(self.error_code)
+            if cmd == CMD_READ_REQ:
+                body = self._handle_read(dtype, payload)
+            elif cmd == CMD_WRITE_REQ:
+                body = self._handle_write(dtype, payload)
+            else:
+                raise XGTProtocolError(ERR_DATA_TYPE)
+            body = struct.pack("<HHHH", rsp_cmd, dtype, 0, 0) + body
+        except XGTProtocolError as e:
+            self.stats['errors'] += 1
+            body = struct.pack("<HHHHH", rsp_cmd, dtype, 0, 0xFFFF, e.code)
+        except (struct.error, IndexError, UnicodeDecodeError):
+            self.stats['errors'] += 1
+            body = struct.pack("<HHHHH", rsp_cmd, dtype, 0, 0xFFFF, ERR_DATA_TYPE)
+        return self._build_response_header(header, len(body)) + body
+
+    @staticmethod
+    def _build_response_header(request_header: bytes, length: int) -> bytes:
+        company = b"LSIS-XGT" + b"\x00\x00"
+        app = b"\x00\x00" + b"\xB0" + b"\x11" + request_header[14:16] + struct.pack("<H", length) + b"\x00"
+        return company + app + struct.pack("B", sum(app) & 0xFF)
+
+    @staticmethod
+    def _parse_names(payload: bytes, offset: int, block_count: int) -> Tuple[List[str], int]:
+        names = []
+        for _ in range(block_count):
+            var_len = struct.unpack_from("<H", payload, offset)[0]; offset += 2
+            names.append(payload[offset:offset + var_len].decode("ascii").rstrip("\x00")); offset += var_len
+        return names, offset
+
+    def _resolve(self, name: str, size: int = None) -> Tuple[str, int, int, Optional[int]]:
+        """주소 문자열 → (영역, 바이트 오프셋, 바이트 크기, 비트 번호)"""
+        match = _ADDRESS_RE.match(name)
+        if not match:
+            raise XGTProtocolError(ERR_DATA_TYPE)
+        area, kind, index = match.group(1), match.group(2), int(match.group(3))
+        if area not in self.memory:
+            raise XGTProtocolError(ERR_DEVICE)
+
+        bit = None
+        if kind == 'X':
+            byte_offset, bit = divmod(index, 8)
+        elif kind == 'B':
+            byte_offset = index
+        else:
+            byte_offset = index * _SIZE_BYTES[kind]
+        nbytes = size if size is not None else _SIZE_BYTES[kind]
+
+        if byte_offset + nbytes > len(self.memory[area]):
+            raise XGTProtocolError(ERR_AREA)
+        for word in range(byte_offset // 2, (byte_offset + nbytes + 1) // 2):
+            if (area, word) in self.fault_addresses:
+                raise XGTProtocolError(ERR_AREA)
+        return area, byte_offset, nbytes, bit
+
+    def _handle_read(self, dtype: int, payload: bytes) -> bytes:
+        block_count = struct.unpack_from("<H", payload, 6)[0]
+        if block_count < 1 or block_count > MAX_BLOCKS:
+            raise XGTProtocolError(ERR_BLOCK_COUNT)
+        names, offset = self._parse_names(payload, 8, block_count)
+
+        if dtype == DT_CONTINUOUS:
+            byte_count = struct.unpack_from("<H", payload, offset)[0]
+            if byte_count > MAX_DATA_BYTES:
+                raise XGTProtocolError(ERR_DATA_SIZE)
+            area, start, nbytes, _ = self._resolve(names[0], byte_count)
+            with self._memory_lock:
+                data = bytes(self.memory[area][start:start + nbytes])
+            return struct.pack("<HH", 1, len(data)) + data
+
+        if dtype not in (DT_BIT, DT_BYTE, DT_WORD, DT_DWORD, DT_LWORD):
+            raise XGTProtocolError(ERR_DATA_TYPE)
+
+        # build_read_word 형식: 단일 블록 뒤에 WORD 개수가 붙은 요청
+        count = 1
+        if block_count == 1 and len(payload) - offset == 2 and dtype == DT_WORD:
+            count = max(1, struct.unpack_from("<H", payload, offset)[0])
+            if count * 2 > MAX_DATA_BYTES:
+                raise XGTProtocolError(ERR_DATA_SIZE)
+
+        blocks = []
+        with self._memory_lock:
+            for name in names:
+                area, start, nbytes, bit = self._resolve(name, count * 2 if count > 1 else None)
+                if bit is not None:
+                    data = bytes([(self.memory[area][start] >> bit) & 1])
+                else:
+                    data = bytes(self.memory[area][start:start + nbytes])
+                blocks.append(struct.pack("<H", len(data)) + data)
+        return struct.pack("<H", block_count) + b"".join(blocks)
+
+    def _handle_write(self, dtype: int, payload: bytes) -> bytes:
+        block_count = struct.unpack_from("<H", payload, 6)[0]
+        if block_count < 1 or block_count > MAX_BLOCKS:
+            raise XGTProtocolError(ERR_BLOCK_COUNT)
+        names, offset = self._parse_names(payload, 8, block_count)
+
+        writes = []
+        for name in names:
+            size = struct.unpack_from("<H", payload, offset)[0]; offset += 2
+            data = payload[offset:offset + size]; offset += size
+            if dtype == DT_CONTINUOUS and size > MAX_DATA_BYTES:
+                raise XGTProtocolError(ERR_DATA_SIZE)
+            area, start, nbytes, bit = self._resolve(name, size if dtype == DT_CONTINUOUS else None)
+            writes.append((area, start, bit, data[:nbytes]))
+
+        with self._memory_lock:
+            for area, start, bit, data in writes:
+                if bit is not None:
+                    mask = 1 << bit
+                    if data and data[0] & 1:
+                        self.memory[area][start] |= mask
+                    else:
+                        self.memory[area][start] &= ~mask & 0xFF
+                else:
+                    self.memory[area][start:start + len(data)] = data
+        return struct.pack("<H", block_count)
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='XGT Dedicated 프로토콜 PLC 시뮬레이터')
+    parser.add_argument('--host', default='127.0.0.1', help='바인딩 주소 (기본값: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=2004, help='포트 (기본값: 2004)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='응답 지연 (밀리초)')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='응답 지연 편차 (밀리초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='에러 응답 비율 (0~1)')
+    parser.add_argument('--error-code', type=lambda v: int(v, 0), default=ERR_AREA,
+                        help=f'에러 응답 코드 (기본값: 0x{ERR_AREA:04X})')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='응답 없이 연결을 끊는 비율 (0~1)')
+    parser.add_argument('--fill-random', action='store_true', help='메모리를 임의 값으로 채우기')
+    parser.add_argument('--seed', type=int, help='난수 시드')
+
+    args = parser.parse_args()
+
+    simulator = XGTSimulator(
+        host=args.host,
+        port=args.port,
+        latency=args.latency_ms / 1000.0,
+        jitter=args.jitter_ms / 1000.0,
+        error_rate=args.error_rate,
+        error_code=args.error_code,
+        drop_rate=args.drop_rate,
+        seed=args.seed
+    )
+    if args.fill_random:
+        simulator.fill_random()
+
+    print(f"XGT 시뮬레이터 시작: {args.host}:{args.port} (Ctrl+C로 종료)")
+    simulator.serve_forever()
+    print(f"XGT 시뮬레이터 종료: {simulator.stats}")
+
+
+if __name__ == "__main__":
+    main()